@@ -0,0 +1,106 @@
+"""
+MarkdownV2 escaping: bot.services.markdown_v2 (precomputed escape tables) vs the previous implementations
+(character loop for the alerts, regex for the notification lines).
+
+Before timing, the escaping is checked against Telegram's MarkdownV2 rules: every special
+character and the backslash are preceded by a backslash, nothing else is changed, and the
+results are identical to the previous implementations. The script exits with an error if a
+check fails.
+
+Usage (from the project root):
+    python -m benchmarks.markdown_escape_benchmark [--number 20000]
+"""
+from __future__ import annotations
+import argparse
+import re
+import sys
+import timeit
+
+from bot.services.markdown_v2 import MARKDOWN_V2_SPECIAL_CHARS, escape_markdown_punctuation, escape_markdown_v2
+
+# Telegram Bot API, "MarkdownV2 style"
+TELEGRAM_SPECIAL_CHARS = set("_*[]()~`>#+-=|{}.!")
+
+SAMPLES = (
+    "",
+    "plain text without special characters",
+    "Realtoken update alert bot: Realtoken uuid not found: 0xAbC123 in API",
+    "Unexpected error (KeyError): 'netRentYear' at 2025-01-01 12:00:00.123!",
+    "a_b*c[d]e(f)g~h`i>j#k+l-m=n|o{p}q.r!s\\t",
+    "📈 *Token price*:\n$52.50 → *$55.13* (▲ *5.00*%)",
+    "🔔🆕 __Update for *[15-17 Main St](https://realt.co/product/15-17-Main-St-Detroit-MI-48200)*__",
+    "ÀÉÎõü ß 漢字 \\\\ already\\.escaped",
+)
+
+
+def escape_markdown_v2_loop(text: str) -> str:
+    """Previous implementation (send_telegram_alert)."""
+    special = r'_\*\[\]\(\)~`>#+\-=|{}.!'
+    out = []
+    for ch in str(text):
+        if ch in special:
+            out.append("\\" + ch)
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def escape_markdown_punctuation_regex(text: str) -> str:
+    """Previous implementation (build_lines_messages)."""
+    return re.sub(r'([().])', r'\\\1', text)
+
+
+def unescape(text: str) -> str:
+    return re.sub(r"\\(.)", r"\1", text, flags=re.DOTALL)
+
+
+def check() -> None:
+    assert set(MARKDOWN_V2_SPECIAL_CHARS) == TELEGRAM_SPECIAL_CHARS
+    all_chars = "".join(chr(c) for c in range(0x20, 0x7f)) + "\\\n€→▲"
+    for text in SAMPLES + (all_chars,):
+        escaped = escape_markdown_v2(text)
+        # Each special character (and backslash) is escaped, nothing else is added or removed
+        i = 0
+        for ch in text:
+            if ch in TELEGRAM_SPECIAL_CHARS or ch == "\\":
+                assert escaped[i:i + 2] == "\\" + ch, (text, escaped)
+                i += 2
+            else:
+                assert escaped[i] == ch, (text, escaped)
+                i += 1
+        assert i == len(escaped), (text, escaped)
+        assert unescape(escaped) == text
+        assert escaped == escape_markdown_v2_loop(text)
+
+        punctuation = escape_markdown_punctuation(text)
+        assert punctuation == escape_markdown_punctuation_regex(text)
+        assert punctuation.replace("\\(", "(").replace("\\)", ")").replace("\\.", ".") == text
+    assert escape_markdown_v2(12.5) == "12\\.5"  # non-str values, as before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="calls per sample and implementation")
+    args = parser.parse_args()
+
+    try:
+        check()
+    except AssertionError as e:
+        print(f"escaping check FAILED: {e!r}")
+        sys.exit(1)
+    print("escaping check: ok")
+
+    cases = (
+        ("escape_markdown_v2", escape_markdown_v2_loop, escape_markdown_v2),
+        ("escape_markdown_punctuation", escape_markdown_punctuation_regex, escape_markdown_punctuation),
+    )
+    for name, before, after in cases:
+        t_before = timeit.timeit(lambda: [before(s) for s in SAMPLES], number=args.number)
+        t_after = timeit.timeit(lambda: [after(s) for s in SAMPLES], number=args.number)
+        per_call = args.number * len(SAMPLES)
+        print(f"{name:28}  before={t_before / per_call * 1e9:7.0f} ns/call  after={t_after / per_call * 1e9:7.0f} ns/call"
+              f"  speedup={t_before / t_after:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
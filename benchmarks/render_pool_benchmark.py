@@ -0,0 +1,114 @@
+"""
+Rendering of a cycle's notifications: in the event loop vs in the process pool.
+
+A synthetic cycle (--tokens updated realtokens, every field changed) is rendered for
+growing numbers of recipients (mixed languages and notification settings), with the
+in-loop path and with the render pool (--workers spawned processes, already started:
+the pool is kept between cycles). The crossover is the smallest recipient count from
+which the pool is faster; RENDER_POOL_MIN_RECIPIENTS should be set around it.
+The pool can only win with several CPU cores.
+
+Usage (from the project root):
+    python -m benchmarks.render_pool_benchmark [--tokens 20] [--workers 4] [--runs 3]
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+os.environ.setdefault("BOT_REALTOKENS_UPDATE_ALERTS_TOKEN", "0:benchmark")
+
+import multiprocessing
+
+from bot.core.render_pool import _init_worker, render_in_pool
+from bot.core.sub.render_user_notification import RenderContext, render_user_notification
+from bot.services.i18n import I18n
+from bot.services.logging_config import CHILD_PROCESS_ENV
+from bot.services.token_catalogue import build_token_catalogue
+from bot.services.user_preferences import UserPreferences
+
+USER_COUNTS = (100, 300, 1000, 3000, 10000)
+LANGUAGES = ("English", "Français", "Español")
+
+
+def synthetic_context(n_tokens: int) -> RenderContext:
+    tokens, history_last, new_items = [], {}, {}
+    for i in range(n_tokens):
+        uuid = f"0x{i:040x}"
+        tokens.append({"uuid": uuid, "shortName": f"{i} Main St", "fullName": f"{i} Main St, Detroit, MI 48200"})
+        history_last[uuid] = {"uuid": uuid, "history": [{"date": "20240101", "values": {
+            "tokenPrice": 50.0, "netRentYear": 1000.0, "totalInvestment": 20000.0, "underlyingAssetPrice": 15000.0,
+            "initialMaintenanceReserve": 500.0, "renovationReserve": 300.0, "rentedUnits": 2,
+        }}]}
+        new_items[uuid] = [{"date": "20250101", "values": {
+            "tokenPrice": 52.5, "netRentYear": 1100.0, "totalInvestment": 21000.0, "underlyingAssetPrice": 16000.0,
+            "initialMaintenanceReserve": 450.0, "renovationReserve": 250.0, "rentedUnits": 1,
+        }}]
+    return RenderContext(new_items, build_token_catalogue(tokens), history_last, with_digests=True)
+
+
+def synthetic_users(n_users: int) -> List[UserPreferences]:
+    users = []
+    for user_id in range(1, n_users + 1):
+        users.append(UserPreferences(
+            user_id,
+            language=LANGUAGES[user_id % len(LANGUAGES)],
+            notification_types={"income_updates": True, "price_token_updates": user_id % 2 == 0, "other_updates": user_id % 3 == 0},
+        ))
+    return users
+
+
+def render_in_loop(context: RenderContext, users: List[UserPreferences], i18n: I18n) -> float:
+    started = time.perf_counter()
+    lines_by_language = {}
+    for prefs in users:
+        render_user_notification(context, prefs, i18n, lines_by_language)
+    return time.perf_counter() - started
+
+
+async def render_with_pool(pool: ProcessPoolExecutor, context: RenderContext, users: List[UserPreferences]) -> float:
+    started = time.perf_counter()
+    count = 0
+    async for _ in render_in_pool(pool, context, users):
+        count += 1
+    assert count == len(users)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=20, help="updated realtokens in the cycle")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="render pool processes")
+    parser.add_argument("--runs", type=int, default=3, help="runs per measurement (median reported)")
+    args = parser.parse_args()
+
+    context = synthetic_context(args.tokens)
+    i18n = I18n()
+    os.environ[CHILD_PROCESS_ENV] = "1"  # as get_render_pool(): the pool processes do not write the log file
+    pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker)
+    asyncio.run(render_with_pool(pool, context, synthetic_users(args.workers)))  # start the processes
+
+    print(f"{args.tokens} updated tokens, {args.workers} pool processes, {os.cpu_count()} CPU(s)")
+    pool_faster = []
+    for n_users in USER_COUNTS:
+        users = synthetic_users(n_users)
+        in_loop = statistics.median(render_in_loop(context, users, i18n) for _ in range(args.runs))
+        pooled = statistics.median(asyncio.run(render_with_pool(pool, context, users)) for _ in range(args.runs))
+        pool_faster.append(pooled < in_loop)
+        print(f"users={n_users:6}  in-loop={in_loop * 1000:8.1f} ms  pool={pooled * 1000:8.1f} ms  speedup={in_loop / pooled:5.2f}x")
+    pool.shutdown()
+
+    # Smallest count from which the pool stays faster (a single noisy win does not count)
+    crossover = next((n for i, n in enumerate(USER_COUNTS) if all(pool_faster[i:])), None)
+    if crossover is None:
+        print(f"crossover: none up to {USER_COUNTS[-1]} users (keep the render pool disabled on this machine)")
+    else:
+        print(f"crossover: the pool is faster from ~{crossover} users")
+
+
+if __name__ == "__main__":
+    main()
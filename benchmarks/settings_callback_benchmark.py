@@ -0,0 +1,141 @@
+"""
+Latency of the notification settings callbacks under a burst of clicks.
+
+--clicks button presses from --users users (mixed languages, notification types, token
+scopes, wallets and delivery modes) are dispatched at once to the callback handler, the
+way a burst of updates reaches the bot. Telegram is not called (the edits are no-ops):
+what is measured is the bot's own time, i.e. building the screens and keyboards.
+Only navigation clicks are sent; settings changes also write the user file, which would
+hide the rendering cost.
+
+The burst is run with the settings screens cache, then with the cache cleared before
+every click (every screen rebuilt, as without the cache). The latency of a click is the
+time from the start of the burst to the end of its handling (queueing included).
+
+Usage (from the project root):
+    python -m benchmarks.settings_callback_benchmark [--clicks 5000] [--users 500] [--runs 3]
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, List, Tuple
+
+os.environ.setdefault("BOT_REALTOKENS_UPDATE_ALERTS_TOKEN", "0:benchmark")
+
+from bot.handlers import user_notifications_settings
+from bot.handlers.user_notifications_settings import handle_notifications_settings_callback
+from bot.services.i18n import I18n
+from bot.services.user_manager import UserManager
+from bot.services.user_preferences import UserPreferences
+
+LANGUAGES = ("English", "Français", "Español")
+NAVIGATION = ("nav:main", "nav:types", "nav:scope", "nav:manage_wallet", "nav:digest")
+DIGESTS = ("off", "hourly", "daily")
+
+
+class _Query:
+    """Callback query with the methods used by the handler, without network calls."""
+
+    def __init__(self, user_id: int, data: str):
+        self.from_user = SimpleNamespace(id=user_id)
+        self.data = data
+
+    async def answer(self) -> None:
+        pass
+
+    async def edit_message_text(self, text, reply_markup=None, parse_mode=None) -> None:
+        pass
+
+    async def edit_message_reply_markup(self, reply_markup=None) -> None:
+        pass
+
+
+def synthetic_users(n_users: int, directory: Path) -> UserManager:
+    user_manager = UserManager(directory / "user_configurations.json")
+    rng = random.Random(1)
+    for user_id in range(1, n_users + 1):
+        wallets = [f"0x{rng.getrandbits(160):040x}" for _ in range(rng.choice((0, 0, 1, 1, 2)))]
+        user_manager.users[user_id] = UserPreferences(
+            user_id,
+            language=LANGUAGES[user_id % len(LANGUAGES)],
+            notification_types={"income_updates": True, "price_token_updates": user_id % 2 == 0, "other_updates": user_id % 3 == 0},
+            token_scope={"mode": "wallet" if wallets else "all", "wallets": wallets, "realtokens_owned": []},
+            digest=DIGESTS[user_id % len(DIGESTS)],
+        )
+    return user_manager
+
+
+def synthetic_clicks(n_clicks: int, n_users: int) -> List[Tuple[int, str]]:
+    rng = random.Random(2)
+    return [(rng.randint(1, n_users), f"{user_notifications_settings.CALLBACK_PREFIX}:{rng.choice(NAVIGATION)}")
+            for _ in range(n_clicks)]
+
+
+def clear_screen_cache() -> None:
+    for obj in vars(user_notifications_settings).values():
+        if hasattr(obj, "cache_clear"):
+            obj.cache_clear()
+
+
+def screen_cache_hits() -> Tuple[int, int]:
+    hits = misses = 0
+    for obj in vars(user_notifications_settings).values():
+        if hasattr(obj, "cache_info"):
+            info = obj.cache_info()
+            hits, misses = hits + info.hits, misses + info.misses
+    return hits, misses
+
+
+async def run_burst(clicks: List[Tuple[int, str]], bot_data: dict, before_click: Callable[[], None]) -> List[float]:
+    """Dispatch all the clicks at once; return each click's latency (seconds since the start of the burst)."""
+    context = SimpleNamespace(bot_data=bot_data, user_data={})
+    latencies: List[float] = []
+
+    async def click(user_id: int, data: str) -> None:
+        before_click()
+        await handle_notifications_settings_callback(SimpleNamespace(callback_query=_Query(user_id, data)), context)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(click(user_id, data) for user_id, data in clicks))
+    return latencies
+
+
+def report(label: str, runs: List[List[float]]) -> float:
+    total = statistics.median(max(latencies) for latencies in runs)
+    per_click = statistics.median(statistics.mean(latencies) for latencies in runs)
+    p99 = statistics.median(sorted(latencies)[int(len(latencies) * 0.99)] for latencies in runs)
+    print(f"{label:9}  burst={total * 1000:8.1f} ms  per click={total / len(runs[0]) * 1e6:7.1f} µs"
+          f"  mean latency={per_click * 1000:7.1f} ms  p99={p99 * 1000:7.1f} ms")
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clicks", type=int, default=5000, help="clicks in the burst")
+    parser.add_argument("--users", type=int, default=500, help="distinct users clicking")
+    parser.add_argument("--runs", type=int, default=3, help="runs per measurement (median reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        bot_data = {"i18n": I18n(), "user_manager": synthetic_users(args.users, Path(directory))}
+        clicks = synthetic_clicks(args.clicks, args.users)
+        print(f"{args.clicks} clicks from {args.users} users")
+
+        uncached = report("no cache", [asyncio.run(run_burst(clicks, bot_data, clear_screen_cache)) for _ in range(args.runs)])
+
+        clear_screen_cache()
+        cached = report("cache", [asyncio.run(run_burst(clicks, bot_data, lambda: None)) for _ in range(args.runs)])
+        hits, misses = screen_cache_hits()
+        print(f"speedup={uncached / cached:5.2f}x  cache hit rate={hits / max(1, hits + misses):.1%} ({misses} screens built)")
+
+
+if __name__ == "__main__":
+    main()
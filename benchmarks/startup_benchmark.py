@@ -0,0 +1,69 @@
+"""
+Startup benchmark: import time of bot.main and time-to-first-poll.
+
+Each measurement runs in a fresh Python process (cold module cache).
+Time-to-first-poll is measured from the start of the bot.main import to the
+moment main() calls app.run_polling() (patched so no Telegram connection is made).
+With a history snapshot in state/, this is the warm start path; without one, it
+includes the two API calls of the cold start.
+
+Usage (from the project root):
+    python -m benchmarks.startup_benchmark [--runs 5]
+"""
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+IMPORT_SNIPPET = """
+import time
+t = time.perf_counter()
+import bot.main
+print(time.perf_counter() - t)
+"""
+
+FIRST_POLL_SNIPPET = """
+import time
+t = time.perf_counter()
+import telegram.ext
+def _fake_run_polling(self, *args, **kwargs):
+    print(time.perf_counter() - t)
+telegram.ext.Application.run_polling = _fake_run_polling
+import bot.main
+bot.main.send_telegram_alert = lambda *a, **k: None
+bot.main.main()
+"""
+
+
+def _measure(snippet: str, runs: int) -> list[float]:
+    env = {**os.environ, "BOT_REALTOKENS_UPDATE_ALERTS_TOKEN": os.getenv("BOT_REALTOKENS_UPDATE_ALERTS_TOKEN") or "0:benchmark"}
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", snippet],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        results.append(float(out.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def _report(label: str, values: list[float]) -> None:
+    print(
+        f"{label:<20} median {statistics.median(values) * 1000:8.1f} ms"
+        f"   min {min(values) * 1000:8.1f} ms   max {max(values) * 1000:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    _report("import bot.main", _measure(IMPORT_SNIPPET, args.runs))
+    _report("time-to-first-poll", _measure(FIRST_POLL_SNIPPET, args.runs))
+
+
+if __name__ == "__main__":
+    main()
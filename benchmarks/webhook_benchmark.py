@@ -0,0 +1,171 @@
+"""
+Handler round-trip latency: long polling vs webhook mode.
+
+Telegram is simulated in-process (no network, no token needed):
+- polling: the real PTB Updater calls getUpdates on a fake bot; the long poll returns as
+  soon as updates are available, after a simulated network delay each way;
+- webhook: the fake Telegram posts each update (recorded callback query JSON) to the real
+  WebhookServer over local keep-alive HTTP connections (at most max_connections at a time),
+  after the same simulated network delay.
+
+The handler simulates the answer to the callback (one Bot API call: --rtt). The latency is
+measured from the moment Telegram receives the update to the end of the handler, for
+evenly spaced clicks ("single") and for a burst of simultaneous updates ("burst").
+
+Usage (from the project root):
+    python -m benchmarks.webhook_benchmark [--updates 50] [--rtt 0.05]
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Dict, List
+
+os.environ.setdefault("BOT_REALTOKENS_UPDATE_ALERTS_TOKEN", "0:benchmark")
+
+from telegram import Update, User
+from telegram.ext import Application, ExtBot, TypeHandler
+
+from bot.config.settings import WEBHOOK_MAX_CONCURRENT_UPDATES
+from bot.services.webhook_server import WebhookServer, SECRET_TOKEN_HEADER
+
+TOKEN = "123456:benchmark"
+SECRET = "benchmark-secret"
+
+
+def recorded_update(update_id: int) -> dict:
+    """A settings button click, as posted by Telegram."""
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": {"id": 1000 + update_id % 10, "is_bot": False, "first_name": "Bench", "language_code": "en"},
+            "chat_instance": "42",
+            "data": "uns:nav:main",
+        },
+    }
+
+
+class FakeTelegramBot(ExtBot):
+    """Bot whose getUpdates is served by the in-process fake Telegram (polling mode)."""
+
+    def __init__(self, *args, rtt: float, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._rtt = rtt
+        self._pending: asyncio.Queue = asyncio.Queue()
+
+    async def initialize(self) -> None:
+        self._bot_user = User(id=123456, is_bot=True, first_name="bench", username="bench_bot")
+        self._initialized = True
+
+    async def shutdown(self) -> None:
+        self._initialized = False
+
+    async def delete_webhook(self, *args, **kwargs) -> bool:
+        return True
+
+    async def get_updates(self, offset=None, limit=None, timeout=None, allowed_updates=None, **kwargs):
+        await asyncio.sleep(self._rtt / 2)  # request reaches Telegram
+        try:
+            first = await asyncio.wait_for(self._pending.get(), timeout=timeout or 10)
+        except asyncio.TimeoutError:
+            first = None
+        batch = [] if first is None else [first]
+        while not self._pending.empty() and len(batch) < (limit or 100):
+            batch.append(self._pending.get_nowait())
+        await asyncio.sleep(self._rtt / 2)  # response reaches the bot
+        return tuple(Update.de_json(data, self) for data in batch)
+
+
+async def _measure(mode: str, n_updates: int, spacing: float, rtt: float) -> List[float]:
+    received: Dict[int, float] = {}
+    latencies: List[float] = []
+    done = asyncio.Event()
+
+    async def handler(update: Update, context) -> None:
+        await asyncio.sleep(rtt)  # answer_callback_query / edit_message_text
+        latencies.append(time.perf_counter() - received[update.update_id])
+        if len(latencies) == n_updates:
+            done.set()
+
+    bot = FakeTelegramBot(TOKEN, rtt=rtt)
+    app = Application.builder().bot(bot).build()
+    app.add_handler(TypeHandler(Update, handler))
+    await app.initialize()
+    await app.start()
+
+    server = None
+    connections: asyncio.Queue = asyncio.Queue()
+    if mode == "polling":
+        await app.updater.start_polling(poll_interval=0.0, timeout=10)
+    else:
+        server = WebhookServer(app, SECRET, path="/webhook")
+        await server.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        for _ in range(WEBHOOK_MAX_CONCURRENT_UPDATES):  # Telegram's max_connections
+            connections.put_nowait(await asyncio.open_connection("127.0.0.1", port))
+
+    async def post(data: dict) -> None:
+        await asyncio.sleep(rtt / 2)  # Telegram -> bot
+        reader, writer = await connections.get()
+        body = json.dumps(data).encode()
+        writer.write(
+            b"POST /webhook HTTP/1.1\r\nHost: bot\r\nContent-Type: application/json\r\n"
+            + f"{SECRET_TOKEN_HEADER}: {SECRET}\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        connections.put_nowait((reader, writer))
+
+    posts = []
+    for i in range(1, n_updates + 1):
+        data = recorded_update(i)
+        received[i] = time.perf_counter()
+        if mode == "polling":
+            bot._pending.put_nowait(data)
+        else:
+            posts.append(asyncio.create_task(post(data)))
+        if spacing:
+            await asyncio.sleep(spacing)
+
+    await asyncio.wait_for(done.wait(), timeout=120)
+    await asyncio.gather(*posts)
+
+    if mode == "polling":
+        await app.updater.stop()
+    else:
+        await server.drain()
+        while not connections.empty():
+            _, writer = connections.get_nowait()
+            writer.close()
+    await app.stop()
+    await app.shutdown()
+    return latencies
+
+
+def _report(mode: str, scenario: str, latencies: List[float]) -> None:
+    ms = sorted(x * 1000 for x in latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"{mode:8} {scenario:7} n={len(ms):4}  p50={statistics.median(ms):7.1f} ms  p95={p95:7.1f} ms  max={ms[-1]:7.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=50, help="updates per scenario")
+    parser.add_argument("--rtt", type=float, default=0.05, help="simulated network round trip to Telegram, in seconds")
+    parser.add_argument("--spacing", type=float, default=0.2, help="delay between two clicks in the 'single' scenario, in seconds")
+    args = parser.parse_args()
+
+    print(f"simulated RTT {args.rtt * 1000:.0f} ms, handler = one Bot API call")
+    for scenario, spacing in (("single", args.spacing), ("burst", 0.0)):
+        for mode in ("polling", "webhook"):
+            _report(mode, scenario, asyncio.run(_measure(mode, args.updates, spacing, args.rtt)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,3 @@
 from .get_balances_of_realtokens import get_balances_of_realtokens
-from .get_balances_of_realtoken_wrapper import get_balances_of_realtoken_wrapper
\ No newline at end of file
+from .get_balances_of_realtoken_wrapper import get_balances_of_realtoken_wrapper
+from .get_realtokens_owned import get_realtokens_owned
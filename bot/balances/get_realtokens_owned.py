@@ -0,0 +1,43 @@
+from typing import Dict, List, Set
+from bot.balances.get_balances_of_realtokens import get_balances_of_realtokens
+from bot.balances.get_balances_of_realtoken_wrapper import get_balances_of_realtoken_wrapper
+from bot.services.utilities import merge_user_token_balances
+
+
+def get_realtokens_owned(
+    users_addresses: List[str],
+    realtoken_contract_addresses: List[str],
+    abis: Dict[str, List[Dict]],
+) -> Dict[str, Set[str]]:
+    """
+    Return the realtokens owned by each wallet (direct holdings + RMM V3 wrapper).
+
+    Balances below THRESHOLD_BALANCE_DEC are ignored (see merge_user_token_balances).
+
+    Args:
+        users_addresses: list of wallet addresses.
+        realtoken_contract_addresses: list of RealToken contract addresses to query.
+        abis: ABIs loaded by load_abis() (needs "realtoken", "realtoken-wrapper" and "multicall3").
+
+    Returns:
+        { wallet_lowercase: { token_lowercase, ... } }
+    """
+    balances_realtokens = get_balances_of_realtokens(
+        users_addresses=users_addresses,
+        realtoken_contract_addresses=realtoken_contract_addresses,
+        abi_realtoken=abis["realtoken"],
+        abi_multicall3=abis["multicall3"],
+    )
+
+    balances_wrapper = get_balances_of_realtoken_wrapper(
+        users_addresses=users_addresses,
+        abi_realtoken_wrapper=abis["realtoken-wrapper"],
+        abi_multicall3=abis["multicall3"],
+    )
+
+    all_balances = merge_user_token_balances([balances_realtokens, balances_wrapper])
+
+    return {
+        wallet.lower(): {token.lower() for token in tokens}
+        for wallet, tokens in all_balances.items()
+    }
@@ -10,6 +10,15 @@ load_dotenv()
 
 FRENQUENCY_CHECKING_FOR_UPDATES = 90 # in minutes
 FRENQUENCY_WALLET_UPDATE = 5760 # in minutes (5760 min = 4 days) 
+WALLET_UPDATE_SLICE_INTERVAL = 15 # in minutes, wallets are refreshed slice by slice so that each wallet is covered once per FRENQUENCY_WALLET_UPDATE
+WALLET_ACTIVE_USER_WINDOW = 1440 # in minutes, users who interacted with the bot within this window get their wallets refreshed first
+WALLET_UPDATE_MAX_PRIORITY_WALLETS = 50 # max number of wallets of active users refreshed ahead of their slice at each run
+WALLET_BALANCE_CACHE_TTL = 60 # in minutes, how long the realtokens owned by a wallet are reused without a new RPC query
+DIGEST_PERIODS = {"hourly": 60, "daily": 1440} # in minutes, delay between two digest messages for users who opted in
+DIGEST_FLUSH_CHECK_INTERVAL = 5 # in minutes, how often pending digests are checked and sent when due
+ALERT_BATCH_WINDOW = 30 # in seconds, operator alerts raised within this window are sent as one summary message
+TOKEN_CATALOGUE_MAX_AGE = 1440 # in minutes, the /token list is downloaded again at least this often (see refresh_token_catalogue)
+TOKEN_CATALOGUE_MISSING_RETRY = 60 # in minutes, how often the /token list is checked again for realtokens of the history it does not have
 
 DEFAULT_LANGUAGE = "English"  # Fallback language
 
@@ -22,6 +31,53 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 TRANSLATIONS_PATH = PROJECT_ROOT / "translations" / "translations.json"
 USER_DATA_PATH = PROJECT_ROOT / "user_configurations" / "user_configurations.json"
 LOG_DIR = PROJECT_ROOT / "logs"
+PROFILE_TRIGGER_FILE = LOG_DIR / "profile_next_cycle"  # create it to profile the next update cycle
+LOG_JSON = os.getenv("LOG_JSON", "").strip().lower() in ("1", "true", "yes")  # one JSON object per line in the log file
+STATE_DIR = PROJECT_ROOT / "state"
+HISTORY_SNAPSHOT_PATH = STATE_DIR / "history_snapshot.json.gz"
+DIGEST_PENDING_PATH = STATE_DIR / "digest_pending.json"
+OUTBOX_PATH = STATE_DIR / "outbox.sqlite3"
+UPDATE_SETS_DIR = STATE_DIR / "update_sets"
+RATE_BUDGET_PATH = STATE_DIR / "rate_budget.sqlite3"
+
+
+# Local Prometheus metrics endpoint (http://METRICS_HOST:METRICS_PORT/metrics), disabled if METRICS_PORT is 0
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0") or 0)
+# Process role: "all" (single process, default), or the split deployment sharing state/ and user_configurations/:
+# "worker" runs the update cycle and digests and queues the notifications in the outbox,
+# "frontend" handles the Telegram updates, the wallet refresh and delivers the outbox,
+# "delivery" delivers one shard of the users (see DELIVERY_SHARDS)
+BOT_ROLE = os.getenv("BOT_ROLE", "all").strip().lower() or "all"
+OUTBOX_POLL_INTERVAL = 2.0 # in seconds, how often the front-end checks the outbox when it is empty
+OUTBOX_BATCH_SIZE = 100 # max number of notifications taken from the outbox at once
+# Sharded delivery (split deployment only): with DELIVERY_SHARDS > 0, the worker publishes each cycle's update set
+# to UPDATE_SETS_DIR instead of rendering it, and DELIVERY_SHARDS processes with BOT_ROLE=delivery and
+# DELIVERY_SHARD_INDEX 0..DELIVERY_SHARDS-1 each render and send it to the users of their hash range
+DELIVERY_SHARDS = int(os.getenv("DELIVERY_SHARDS", "0") or 0)
+DELIVERY_SHARD_INDEX = int(os.getenv("DELIVERY_SHARD_INDEX", "0") or 0)
+DELIVERY_POLL_INTERVAL = 5 # in seconds, how often a delivery shard checks for a new update set
+UPDATE_SETS_KEEP = 20 # number of published update sets kept (a shard stopped for longer misses the older ones)
+TELEGRAM_NOTIFICATION_RATE = 25 # in messages per second, shared by all the delivery processes (Telegram allows ~30/s per bot)
+DELIVERY_CONCURRENCY = 4 # notifications sent at the same time while the next ones are rendered
+DELIVERY_QUEUE_SIZE = 200 # rendered notifications waiting to be sent, rendering pauses beyond that
+DELIVERY_QUEUE_PUT_TIMEOUT = 1.0 # in seconds, how often rendering checks the delivery workers are alive while the queue is full
+# Rendering of the notifications in a process pool (several cores) for large recipient sets, disabled if RENDER_POOL_WORKERS is 0
+RENDER_POOL_WORKERS = int(os.getenv("RENDER_POOL_WORKERS", "0") or 0)
+RENDER_POOL_MIN_RECIPIENTS = 1000 # recipients from which the pool is used: set it from the crossover measured by benchmarks/render_pool_benchmark.py on the target machine
+RENDER_POOL_CHUNK_SIZE = 500 # users rendered per pool task
+
+# Webhook mode (instead of long polling) when WEBHOOK_URL is set: Telegram posts updates to WEBHOOK_URL,
+# which must reach the local server on WEBHOOK_LISTEN:WEBHOOK_PORT (e.g. through a reverse proxy doing TLS)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "").strip()
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443") or 8443)
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "").strip()  # random token generated at startup if empty
+WEBHOOK_MAX_CONCURRENT_UPDATES = 16 # max number of updates processed at the same time in webhook mode
+WEBHOOK_DRAIN_TIMEOUT = 10 # in seconds, how long the updates in progress may take to complete on shutdown
+LOOP_LAG_INTERVAL = 1.0 # in seconds, period of the event loop lag measurement
+LOOP_LAG_WARNING_THRESHOLD = 0.5 # in seconds, event loop lag above which the blocking code stack is logged
+SETTINGS_SCREEN_CACHE_SIZE = 4096 # settings screens kept rendered, per language and settings state (LRU)
 
 
 MULTICALLV3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
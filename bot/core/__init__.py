@@ -1 +1,4 @@
-from .run_update_cycle_and_notify import run_update_cycle_and_notify
\ No newline at end of file
+from .run_update_cycle_and_notify import run_update_cycle_and_notify
+from .flush_digests import flush_digests
+from .notify_users import notify_users
+from .deliver_shard_updates import deliver_shard_updates
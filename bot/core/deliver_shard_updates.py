@@ -0,0 +1,57 @@
+import asyncio
+import logging
+logger = logging.getLogger(__name__)
+
+from telegram.ext import Application
+from bot.config.settings import DELIVERY_SHARDS, DELIVERY_SHARD_INDEX
+from bot.core.notify_users import notify_users
+from bot.services.cycle_stats import CycleStats
+from bot.services.delivery_shards import shard_of, list_update_sets, load_update_set, read_shard_cursor, write_shard_cursor
+from bot.services.logging_config import cycle_id_var
+
+
+async def deliver_shard_updates(app: Application, shard_index: int = DELIVERY_SHARD_INDEX, shard_count: int = DELIVERY_SHARDS) -> None:
+    """
+    Delivery shard (BOT_ROLE=delivery): render and send the update sets published by the worker
+    to the users of this shard's hash range (see shard_of), oldest first.
+    The shard's cursor is saved after each update set, so a restart neither resends nor skips one;
+    a shard starting for the first time begins with the update sets published after it started.
+    """
+    cursor = app.bot_data.get("shard_cursor")
+    if cursor is None:
+        cursor = await asyncio.to_thread(read_shard_cursor, shard_index)
+        if cursor is None:
+            published = await asyncio.to_thread(list_update_sets)
+            cursor = published[-1] if published else 0
+            await asyncio.to_thread(write_shard_cursor, shard_index, cursor)
+        app.bot_data["shard_cursor"] = cursor
+
+    seqs = await asyncio.to_thread(list_update_sets, cursor)
+    if not seqs:
+        return
+
+    user_manager = app.bot_data["user_manager"]
+    # Pick up the settings changed in the front-end process since the last update set
+    await asyncio.to_thread(user_manager.reload_if_changed)
+
+    for seq in seqs:
+        update_set = await asyncio.to_thread(load_update_set, seq)
+        if update_set is not None:
+            new_history_items_by_uuid = update_set["new_history_items_by_uuid"]
+            recipients = [
+                user_id for user_id in user_manager.get_recipients(new_history_items_by_uuid.keys())
+                if shard_of(user_id, shard_count) == shard_index
+            ]
+            logger.info(f"Update set {seq}: {len(recipients)} recipient(s) in shard {shard_index}/{shard_count}")
+
+            stats = CycleStats()
+            cycle_token = cycle_id_var.set(update_set.get("cycle_id") or str(seq))  # same ID as the worker's cycle
+            try:
+                await notify_users(app, recipients, new_history_items_by_uuid, update_set["realtokens"], update_set["realtoken_history_last"], stats)
+            finally:
+                stats.finish()
+                logger.info("Update set delivery stats: %s", stats.summary())
+                cycle_id_var.reset(cycle_token)
+
+        app.bot_data["shard_cursor"] = seq
+        await asyncio.to_thread(write_shard_cursor, shard_index, seq)
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+logger = logging.getLogger(__name__)
+
+from telegram.ext import Application
+from bot.config.settings import OUTBOX_POLL_INTERVAL, OUTBOX_BATCH_SIZE, DELIVERY_CONCURRENCY
+from bot.core.sub import deliver_message
+from bot.services.send_telegram_alert import send_telegram_alert
+
+
+async def drain_outbox(app: Application, interval: float = OUTBOX_POLL_INTERVAL, batch_size: int = OUTBOX_BATCH_SIZE) -> None:
+    """
+    Front-end side of the split deployment: deliver the notifications queued by the worker
+    (see Outbox), oldest first, forever. Start it with app.create_task(); it stops when cancelled.
+    Each batch is sent by DELIVERY_CONCURRENCY delivery workers, like the notifications of a cycle
+    (see notify_users). Each notification is acknowledged once handled (sent, or given up on an error).
+    Also records the blocked users reported by the delivery shards (sharded delivery).
+    No error ends the task: it is logged and reported to the alert group, and the next batch is taken.
+    """
+    outbox = app.bot_data["outbox"]
+    while True:
+        try:
+            await _record_blocked_reports(app, outbox)
+            try:
+                items = await asyncio.to_thread(outbox.take, batch_size)
+            except Exception as e:
+                logger.warning("Failed to read the outbox: %s", e)
+                items = []
+
+            if not items:
+                await asyncio.sleep(interval)
+                continue
+
+            queue: asyncio.Queue = asyncio.Queue()
+            for item in items:
+                queue.put_nowait(item)
+            workers = min(DELIVERY_CONCURRENCY, len(items))
+            sent = sum(await asyncio.gather(*(_delivery_worker(app, outbox, queue) for _ in range(workers))))
+            logger.info(f"Outbox: {sent}/{len(items)} notification(s) delivered")
+
+        except Exception as e:
+            # Any unexpected error: keep the task alive, the notifications not acknowledged are taken again
+            logger.exception("Unexpected error while delivering the outbox: %s", e)
+            send_telegram_alert(f"Realtoken update alert bot: Unexpected error while delivering the outbox: {e}")
+            await asyncio.sleep(interval)
+
+
+async def _delivery_worker(app: Application, outbox, queue: asyncio.Queue) -> int:
+    """Deliver and acknowledge the (item_id, user_id, text) items of the queue until it is empty. Returns the number sent."""
+    sent = 0
+    while not queue.empty():
+        item_id, user_id, text = queue.get_nowait()
+        try:
+            prefs = app.bot_data["user_manager"].users.get(user_id)
+            if prefs is not None and not prefs.is_blocked() and await deliver_message(app, user_id, text):
+                sent += 1
+        except Exception as e:
+            # Any unexpected error (e.g. saving a blocked user): give this notification up, keep delivering the others
+            logger.exception("Unexpected error for user %s, outbox notification %s given up: %s", user_id, item_id, e)
+            send_telegram_alert(f"Realtoken update alert bot: Unexpected error, outbox notification given up: {e}")
+        try:
+            await asyncio.to_thread(outbox.ack, [item_id])
+        except Exception as e:
+            # Left in the outbox: delivered again with a later batch
+            logger.warning("Failed to acknowledge outbox notification %s: %s", item_id, e)
+    return sent
+
+
+async def _record_blocked_reports(app: Application, outbox) -> None:
+    """Record the users the delivery shards found blocked (the front-end owns the user file)."""
+    try:
+        user_ids = await asyncio.to_thread(outbox.take_blocked_reports)
+    except Exception as e:
+        logger.warning("Failed to read the blocked user reports: %s", e)
+        return
+    for user_id in user_ids:
+        await asyncio.to_thread(app.bot_data["user_manager"].mark_blocked, user_id)
+    if user_ids:
+        logger.info(f"{len(user_ids)} user(s) reported as blocked by the delivery shards")
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+logger = logging.getLogger(__name__)
+
+from typing import Dict, List
+from telegram.ext import Application
+from bot.config.settings import DIGEST_PERIODS
+from bot.core.sub import build_lines_messages, filter_messages, deliver_message
+from bot.services.digest_store import LinesMessage, PendingUpdate
+from bot.services.token_catalogue import build_token_catalogue
+from bot.core.sub.split_message import BLOCK_SEPARATOR
+
+
+async def flush_digests(app: Application) -> None:
+    """
+    Send the pending digests that are due (see DigestStore): one consolidated message per user,
+    rendered in the user's current language and filtered with their current notification settings.
+    A user who switched the digest off gets their pending updates at the next run.
+    """
+    digest_store = app.bot_data.get("digest_store")
+    if digest_store is None or not len(digest_store):
+        return
+
+    user_manager = app.bot_data["user_manager"]
+    i18n = app.bot_data["i18n"]
+    # Split deployment: the worker queues, the front-end process delivers
+    outbox = app.bot_data.get("outbox") if app.bot_data.get("role") == "worker" else None
+    if user_manager.read_only:
+        await asyncio.to_thread(user_manager.reload_if_changed)
+
+    users = user_manager.users_snapshot()
+    periods = {user_id: DIGEST_PERIODS.get(prefs.digest) for user_id, prefs in users.items()}
+    due_users = digest_store.due_users(periods)
+    if not due_users:
+        return
+
+    sent = 0
+    outbox_items = []
+    for user_id in due_users:
+        updates = digest_store.pop(user_id)
+        prefs = users.get(user_id)
+        if prefs is None or prefs.is_blocked():
+            continue
+
+        try:
+            lines_messages = _render_digest_updates(updates, i18n.translator(prefs.language))
+            message = filter_messages(lines_messages, user_id, prefs.notification_types, prefs.token_scope)
+            if not (message and message.strip()):
+                continue
+
+            if prefs.digest in DIGEST_PERIODS:
+                header = i18n.translate(f"updates.digest.header.{prefs.digest}", prefs.language, count=message.count(BLOCK_SEPARATOR) + 1)
+                message = f"{header}{BLOCK_SEPARATOR}{message}"
+
+            if outbox is not None:
+                outbox_items.append((user_id, message))
+            elif await deliver_message(app, user_id, message):
+                sent += 1
+
+        except Exception as e:
+            # Any unexpected error: drop this digest but keep flushing the others
+            logger.exception("Unexpected error while sending the digest of user %s: %s", user_id, e)
+
+    if outbox_items:
+        sent += await asyncio.to_thread(outbox.put_many, outbox_items)
+
+    try:
+        await asyncio.to_thread(digest_store.save_to_file)
+    except OSError as e:
+        logger.warning("Failed to save pending digests: %s", e)
+
+    logger.info(f"Digests sent: {sent}/{len(due_users)} due, {len(digest_store)} still pending")
+
+
+def _render_digest_updates(updates: Dict[str, PendingUpdate], translate) -> List[LinesMessage]:
+    """
+    Render the pending updates of a digest (see DigestStore) with the user's bound translator:
+    each realtoken's change over the whole period, from its baseline to its last pending item.
+    """
+    new_history_items_by_uuid, realtoken_history_data_last, tokens = {}, {}, []
+    lines_messages = []
+    for key, update in updates.items():
+        if "items" not in update:
+            lines_messages.append(update)  # rendered by an older version (see DigestStore.load_from_file)
+            continue
+        new_history_items_by_uuid[key] = update["items"]
+        realtoken_history_data_last[key] = update["baseline"]
+        if update["token"] is not None:
+            tokens.append(update["token"])
+    return lines_messages + build_lines_messages(
+        new_history_items_by_uuid, build_token_catalogue(tokens), realtoken_history_data_last, translate,
+    )
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+from contextlib import aclosing
+logger = logging.getLogger(__name__)
+
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from telegram.ext import Application
+from bot.services.send_telegram_alert import send_telegram_alert
+from bot.services.cycle_stats import CycleStats
+from bot.services.digest_store import pending_updates
+from bot.config.settings import RENDER_POOL_MIN_RECIPIENTS, DELIVERY_CONCURRENCY, DELIVERY_QUEUE_SIZE, DELIVERY_QUEUE_PUT_TIMEOUT
+from bot.core.sub import deliver_message
+from bot.core.sub.render_user_notification import RenderContext, RenderedNotification, render_user_notification
+from bot.core.render_pool import get_render_pool, render_in_pool
+
+
+async def notify_users(
+    app: Application,
+    recipients: Iterable[int],
+    new_history_items_by_uuid: Dict[str, Any],
+    realtoken_data: Dict[str, Any],
+    realtoken_history_data_last: Dict[str, Any],
+    stats: Optional[CycleStats] = None,
+) -> None:
+    """
+    Render the updates of a cycle for each recipient and hand them over:
+    - digest users: queued in the digest store, sent later by the digest job;
+    - split deployment worker: queued in the outbox, delivered by the front-end;
+    - otherwise: sent by DELIVERY_CONCURRENCY delivery workers as soon as rendered, while the
+      next users are rendered, so the first users are notified right away and the cycle takes
+      about max(render, send) instead of their sum.
+    From RENDER_POOL_MIN_RECIPIENTS recipients on, rendering runs in the process pool (see render_pool).
+    Used by the update cycle and by the delivery shards (see deliver_shard_updates).
+    """
+    stats = stats if stats is not None else CycleStats()
+    digest_store = app.bot_data.get("digest_store")
+    # Split deployment: the worker queues, the front-end process delivers
+    outbox = app.bot_data.get("outbox") if app.bot_data.get("role") == "worker" else None
+
+    snapshot = app.bot_data["user_manager"].users_snapshot()  # wallet workers may add/update users during the loop
+    users = [prefs for prefs in map(snapshot.get, recipients) if prefs is not None and not prefs.is_blocked()]
+    context = RenderContext(new_history_items_by_uuid, realtoken_data, realtoken_history_data_last, with_digests=digest_store is not None)
+    outbox_items = []
+    digest_updates = None  # built on the first digest user, shared by all of them
+
+    # Pipeline: rendered messages are sent by delivery workers while the next users are rendered
+    # (bounded queue: rendering waits when delivery falls behind)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=DELIVERY_QUEUE_SIZE)
+    first_sent = {}
+    workers = [] if outbox is not None else [
+        asyncio.create_task(_delivery_worker(app, queue, stats, first_sent), name=f"notification_delivery_{i}")
+        for i in range(DELIVERY_CONCURRENCY)
+    ]
+    started = time.perf_counter()
+    try:
+        async with aclosing(_render(app, context, users, stats)) as rendered_stream:  # closed on break (pool chunks cancelled)
+            async for rendered in rendered_stream:
+                if rendered.error is not None:
+                    _report_render_error(rendered)
+                elif rendered.digest:
+                    # Digest users: keep the cycle's updates, the digest job renders and sends them on schedule
+                    if digest_updates is None:
+                        digest_updates = pending_updates(new_history_items_by_uuid, realtoken_data, realtoken_history_data_last)
+                    digest_store.add(rendered.user_id, digest_updates)
+                elif rendered.message is not None:
+                    if outbox is not None:
+                        outbox_items.append((rendered.user_id, rendered.message))
+                    elif not await _put(queue, (rendered.user_id, rendered.message), workers):
+                        logger.error("All delivery workers exited, the remaining notifications of this cycle are not sent")
+                        send_telegram_alert("Realtoken update alert bot: All delivery workers exited, notifications not sent")
+                        break
+                await asyncio.sleep(0)  # in-loop rendering never yields: let the workers send meanwhile
+
+        for _ in workers:
+            await _put(queue, None, workers)  # end of the stream, one per worker
+        await asyncio.gather(*workers)
+    finally:
+        for worker in workers:
+            worker.cancel()
+
+    if "at" in first_sent:
+        logger.info(f"First notification sent {(first_sent['at'] - started) * 1000:.0f} ms after rendering started")
+
+    if outbox_items:
+        with stats.stage("outbox") as st:
+            st.items += await asyncio.to_thread(outbox.put_many, outbox_items)
+
+    if digest_store is not None:
+        try:
+            await asyncio.to_thread(digest_store.save_to_file)
+        except OSError as e:
+            logger.warning("Failed to save pending digests: %s", e)
+
+
+async def _render(app: Application, context: RenderContext, users: List, stats: CycleStats) -> AsyncIterator[RenderedNotification]:
+    """Render the users' notifications, in the process pool for large recipient sets, in the loop otherwise."""
+    pool = get_render_pool(app) if len(users) >= RENDER_POOL_MIN_RECIPIENTS else None
+    if pool is not None:
+        # Wall time until the last chunk is handed over (includes waiting for the delivery queue)
+        with stats.stage("render_pool") as st:
+            async for rendered in render_in_pool(pool, context, users):
+                st.items += 1
+                yield rendered
+        return
+
+    i18n = app.bot_data["i18n"]
+    lines_by_language = {}  # the cycle's lines are rendered once per language
+    for prefs in users:
+        with stats.stage("render") as st:
+            rendered = render_user_notification(context, prefs, i18n, lines_by_language)
+            st.items += 1
+        yield rendered
+
+
+async def _delivery_worker(app: Application, queue: asyncio.Queue, stats: CycleStats, first_sent: Dict[str, float]) -> None:
+    """Send the (user_id, message) items of the queue until the end-of-stream marker (None)."""
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        user_id, message = item
+        try:
+            if await deliver_message(app, user_id, message, stats):
+                first_sent.setdefault("at", time.perf_counter())
+        except Exception as e:
+            # Any unexpected error (e.g. saving a blocked user): skip user but keep delivering to the others
+            logger.exception("Unexpected error for user %s, skipping user for this cycle: %s", user_id, e)
+            send_telegram_alert(f"Realtoken update alert bot: Unexpected error, skipping user for this cycle: {e}")
+
+
+async def _put(queue: asyncio.Queue, item: Any, workers: List[asyncio.Task]) -> bool:
+    """
+    Put an item in the delivery queue, waiting while it is full.
+    Returns False (item dropped) if every delivery worker has exited: nothing would ever take it.
+    """
+    while not all(worker.done() for worker in workers):
+        try:
+            await asyncio.wait_for(queue.put(item), timeout=DELIVERY_QUEUE_PUT_TIMEOUT)
+            return True
+        except asyncio.TimeoutError:
+            continue
+    return False
+
+
+def _report_render_error(rendered: RenderedNotification) -> None:
+    """Skip the user for this cycle, keep the cycle alive."""
+    if rendered.error == "ZeroDivisionError":
+        logger.warning("ZeroDivisionError for user %s, skipping user for this cycle: %s", rendered.user_id, rendered.error_message)
+        send_telegram_alert(f"Realtoken update alert bot: ZeroDivisionError, skipping user for this cycle: {rendered.error_message}")
+    else:
+        logger.error("Unexpected error for user %s, skipping user for this cycle: %s\n%s", rendered.user_id, rendered.error_message, rendered.error_traceback)
+        send_telegram_alert(f"Realtoken update alert bot: Unexpected error, skipping user for this cycle: {rendered.error_message}")
@@ -0,0 +1,94 @@
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+logger = logging.getLogger(__name__)
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from telegram.ext import Application
+from bot.config.settings import RENDER_POOL_WORKERS, RENDER_POOL_CHUNK_SIZE
+from bot.services.logging_config import CHILD_PROCESS_ENV
+from bot.core.sub.render_user_notification import RenderContext, RenderedNotification, render_user_notification
+
+# Set in each pool process by _init_worker()
+_worker_i18n = None
+# Pool process side: the context of the cycle being rendered, unpickled once per cycle (see _render_chunk)
+_worker_context: Tuple[Optional[int], Optional[RenderContext]] = (None, None)
+# Bot process side: identifies the contexts sent to the pool
+_context_ids = itertools.count(1)
+
+
+def _init_worker() -> None:
+    global _worker_i18n
+    from bot.services.i18n import I18n
+    _worker_i18n = I18n()
+
+
+def _render_chunk(context_id: int, context_data: bytes, users: Sequence) -> List[RenderedNotification]:
+    """
+    Pool process side: render the notifications of a chunk of users.
+    The context arrives pickled once for the whole cycle; a process only unpickles it for its first chunk.
+    """
+    global _worker_context
+    if _worker_context[0] != context_id:
+        _worker_context = (context_id, pickle.loads(context_data))
+    context = _worker_context[1]
+    lines_by_language = {}
+    return [render_user_notification(context, prefs, _worker_i18n, lines_by_language) for prefs in users]
+
+
+def _pool_context(context: RenderContext) -> RenderContext:
+    """The part of the context the rendering reads: the catalogue and history of the updated realtokens only."""
+    uuids = context.new_history_items_by_uuid.keys()
+    return context._replace(
+        realtoken_data={uuid: context.realtoken_data[uuid] for uuid in uuids if uuid in context.realtoken_data},
+        realtoken_history_data_last={uuid: context.realtoken_history_data_last[uuid] for uuid in uuids if uuid in context.realtoken_history_data_last},
+    )
+
+
+def get_render_pool(app: Application, workers: int = RENDER_POOL_WORKERS) -> Optional[ProcessPoolExecutor]:
+    """
+    The process pool rendering large recipient sets, created on first use (None if RENDER_POOL_WORKERS is 0).
+    Processes are spawned, not forked: the bot process runs threads (alerts, logging, wallet refresh).
+    """
+    if workers <= 0:
+        return None
+    pool = app.bot_data.get("render_pool")
+    if pool is None:
+        os.environ[CHILD_PROCESS_ENV] = "1"  # inherited by the pool processes: they do not write the log file
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker)
+        app.bot_data["render_pool"] = pool
+        logger.info(f"Render pool started with {workers} processes")
+    return pool
+
+
+def shutdown_render_pool(app: Application) -> None:
+    pool = app.bot_data.pop("render_pool", None)
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+async def render_in_pool(pool: ProcessPoolExecutor, context: RenderContext, users: Sequence,
+                         chunk_size: int = RENDER_POOL_CHUNK_SIZE) -> AsyncIterator[RenderedNotification]:
+    """
+    Render the notifications of `users` (UserPreferences) in the pool, chunk by chunk.
+    The context is reduced to the updated realtokens and pickled once (not per chunk);
+    results are yielded as soon as a chunk is done.
+    """
+    loop = asyncio.get_running_loop()
+    context_id = next(_context_ids)
+    context_data = pickle.dumps(_pool_context(context), protocol=pickle.HIGHEST_PROTOCOL)
+    futures = [
+        loop.run_in_executor(pool, _render_chunk, context_id, context_data, list(users[i:i + chunk_size]))
+        for i in range(0, len(users), chunk_size)
+    ]
+    try:
+        for future in asyncio.as_completed(futures):
+            for rendered in await future:
+                yield rendered
+    finally:
+        for future in futures:
+            future.cancel()
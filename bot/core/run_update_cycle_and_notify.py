@@ -1,88 +1,99 @@
+import asyncio
 import logging
+import uuid
 logger = logging.getLogger(__name__)
 
 from telegram.ext import Application
-from telegram.constants import ParseMode
-from telegram.error import Forbidden, TelegramError
 from bot.services.send_telegram_alert import send_telegram_alert
-from bot.services import fetch_json
-from bot.config.settings import REALTOKENS_LIST_URL, REALTOKEN_HISTORY_URL
+from bot.services.fetch_json import fetch_raw, parse_json
+from bot.services.cycle_stats import CycleStats, profile_cycle_if_requested
+from bot.services.metrics import CYCLE_DURATION
+from bot.services.history_snapshot import save_history_snapshot
+from bot.services.logging_config import cycle_id_var
+from bot.services.delivery_shards import build_update_set, publish_update_set
+from bot.config.settings import REALTOKEN_HISTORY_URL, DELIVERY_SHARDS
 from bot.services.utilities import list_to_dict_by_uuid
-from bot.core.sub import get_new_updates, build_lines_messages, build_history_state, filter_messages
+from bot.core.sub import get_new_updates, build_history_state, refresh_token_catalogue
+from bot.core.notify_users import notify_users
 
 import re
 
 async def run_update_cycle_and_notify(app: Application) -> None:
     """
     Orchestrates the process of checking for RealToken updates and sending notifications.
+    Each stage is timed (see CycleStats); the cycle can be profiled on demand (see profile_cycle_if_requested).
+    Every log record of the cycle carries its correlation ID (see logging_config.cycle_id_var).
     """
-    user_manager = app.bot_data["user_manager"]
-    i18n = app.bot_data["i18n"]
+    stats = CycleStats()
+    cycle_token = cycle_id_var.set(uuid.uuid4().hex[:8])
+    with profile_cycle_if_requested():
+        try:
+            await _run_update_cycle_and_notify(app, stats)
+        finally:
+            stats.finish()
+            CYCLE_DURATION.observe(stats.total_seconds)
+            app.bot_data["last_cycle_stats"] = stats
+            logger.info("Update cycle stats: %s", stats.summary())
+            cycle_id_var.reset(cycle_token)
 
-    ### Fetch Realtoken data and Realtoken history from community API ###
-    realtoken_data_last = app.bot_data["realtokens"]
-    realtoken_data_current = list_to_dict_by_uuid(fetch_json(REALTOKENS_LIST_URL))
-    logger.info(f"realtoken data updated: {len(realtoken_data_current) if realtoken_data_current is not None else None} realtokens fetched")
 
-    if realtoken_data_current is not None:
-        realtoken_data = realtoken_data_current
-        app.bot_data["realtokens"] = realtoken_data
-    else:
-        realtoken_data = realtoken_data_last
+async def _run_update_cycle_and_notify(app: Application, stats: CycleStats) -> None:
+    user_manager = app.bot_data["user_manager"]
+    if user_manager.read_only:
+        # Pick up the settings changed in the front-end process since the last cycle
+        await asyncio.to_thread(user_manager.reload_if_changed)
 
+    ### Fetch Realtoken history (and the Realtoken list when needed) from community API ###
     realtoken_history_data_last = app.bot_data["realtoken_history"]
     realtoken_history_state_last = app.bot_data["realtoken_history_state"]
-    realtoken_history_data_current = list_to_dict_by_uuid(fetch_json(REALTOKEN_HISTORY_URL))
+    with stats.stage("fetch_history") as st:
+        raw = await asyncio.to_thread(fetch_raw, REALTOKEN_HISTORY_URL)
+        st.bytes += len(raw or b"")
+    with stats.stage("parse_history") as st:
+        realtoken_history_data_current = list_to_dict_by_uuid(parse_json(raw, REALTOKEN_HISTORY_URL))
+        st.items += len(realtoken_history_data_current or {})
+    del raw
     
     # If API not available or parsing failed, stop the cycle gracefully
     if realtoken_history_data_current is None:
         logger.warning("Realtoken history data not fetched (API might be unavailable). Skipping update cycle.")
         return
     
-    realtoken_history_state_current = build_history_state(realtoken_history_data_current)
-    new_history_items_by_uuid = get_new_updates(app, realtoken_history_data_current, realtoken_history_state_last, realtoken_history_state_current, realtoken_data)
+    with stats.stage("build_history_state") as st:
+        realtoken_history_state_current = build_history_state(realtoken_history_data_current)
+        st.items += len(realtoken_history_state_current)
+
+    # The /token list is only downloaded when it may have changed (new realtoken, max age, validators)
+    realtoken_data = await refresh_token_catalogue(app, stats, realtoken_history_state_current.keys())
+
+    with stats.stage("get_new_updates") as st:
+        new_history_items_by_uuid = get_new_updates(app, realtoken_history_data_current, realtoken_history_state_last, realtoken_history_state_current, realtoken_data)
+        st.items += len(new_history_items_by_uuid)
      
-    # Loop over user IDs and preferences and filter messages if there is at least a new item
     if len(new_history_items_by_uuid) > 0:
-        for user_id, prefs in user_manager.users.items():
-
-            try:
-    
-                lines_messages = build_lines_messages(new_history_items_by_uuid, realtoken_data, realtoken_history_data_last, user_manager, i18n, user_id)
-        
-                message = filter_messages(lines_messages, user_id, prefs.notification_types, prefs.token_scope)
-                
-                if message and message.strip():  # ensures the string has at least one non-whitespace character
-                    try:
-                        await app.bot.send_message(
-                            chat_id=user_id,
-                            text=message,
-                            parse_mode=ParseMode.MARKDOWN_V2,
-                        )
-                    except Forbidden as e:
-                        # User blocked the bot
-                        logger.warning("User %s blocked the bot. Error: %s", user_id, e)
-                        continue
-                    except TelegramError as e:
-                        # Any other Telegram-related error should not break the whole job
-                        logger.warning("Failed to send message to user %s: %s", user_id, e)
-                        send_telegram_alert(f"Realtoken update alert bot: Failed to send message to user: {e}")
-                        continue
-            
-            except ZeroDivisionError as e:
-                # Skip this user for this cycle if a division by zero occurs
-                logger.warning("ZeroDivisionError for user %s, skipping user for this cycle: %s", user_id, e)
-                send_telegram_alert("Realtoken update alert bot: ZeroDivisionError, skipping user for this cycle: {e}")
-                continue
-    
-            except Exception as e:
-                # Any unexpected error: skip user but keep the cycle alive
-                logger.exception("Unexpected error for user %s, skipping user for this cycle: %s", user_id, e)
-                send_telegram_alert(f"Realtoken update alert bot: Unexpected error, skipping user for this cycle: {e}")
-                continue
+        if DELIVERY_SHARDS > 0:
+            # Sharded delivery: publish the update set, each delivery process renders and sends for its users
+            with stats.stage("publish") as st:
+                await asyncio.to_thread(publish_update_set, build_update_set(
+                    cycle_id_var.get(), new_history_items_by_uuid, realtoken_data, realtoken_history_data_last,
+                ))
+                st.items += len(new_history_items_by_uuid)
+        else:
+            # Only users following all realtokens or owning at least one updated realtoken
+            recipients = user_manager.get_recipients(new_history_items_by_uuid.keys())
+            logger.info(f"{len(recipients)} recipient(s) selected out of {len(user_manager.users)} users")
+            await notify_users(app, recipients, new_history_items_by_uuid, realtoken_data, realtoken_history_data_last, stats)
 
     # update new realtoken history
     app.bot_data["realtoken_history_state"] = realtoken_history_state_current
     app.bot_data["realtoken_history"] = realtoken_history_data_current
 
+    # Persist the new baseline for a warm start (in a thread: compression + file I/O)
+    try:
+        with stats.stage("save_snapshot"):
+            await asyncio.to_thread(save_history_snapshot, realtoken_data, realtoken_history_data_current, realtoken_history_state_current,
+                                    app.bot_data.get("realtokens_meta"))
+    except OSError as e:
+        logger.warning("Failed to save history snapshot: %s", e)
+
     logger.info(f"Update cycle completed: {len(new_history_items_by_uuid)} tokens updated")
\ No newline at end of file
@@ -1,4 +1,8 @@
 from .build_history_state import build_history_state
 from .get_new_updates import get_new_updates
+from .refresh_token_catalogue import refresh_token_catalogue
 from .build_lines_messages import build_lines_messages
-from .filter_messages import filter_messages
\ No newline at end of file
+from .filter_messages import filter_messages
+from .split_message import split_message
+from .deliver_message import deliver_message
+from .render_user_notification import render_user_notification
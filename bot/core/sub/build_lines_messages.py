@@ -1,7 +1,7 @@
-import re
 from datetime import datetime
 from bot.services.utilities import get_latest_value_for_key, get_first_value_for_key
 from bot.services.send_telegram_alert import send_telegram_alert
+from bot.services.markdown_v2 import escape_markdown_punctuation, escape_markdown_v2
 
 import logging
 logger = logging.getLogger(__name__)
@@ -18,33 +18,24 @@ def get_last_value(items, field):
             return entry["values"][field]
     return None
 
-def escape_markdown_punctuation(text: str) -> str:
-    return re.sub(r'([().])', r'\\\1', text)
-
-
-
-def build_lines_messages(new_history_items_by_uuid, realtoken_data, realtoken_history_data_last, user_manager, i18n, user_id):
-    
+def build_lines_messages(new_history_items_by_uuid, realtoken_data, realtoken_history_data_last, translate):
+    """
+    Render the lines of each updated realtoken, translated with `translate`,
+    the recipient's bound translator (see I18n.translator).
+    realtoken_data is the token catalogue (see token_catalogue.TokenCatalogue).
+    """
     lines_messages = []
 
-    # small helper for translations
-    def translate(key: str, **fmt):
-        return i18n.translate_for_user(key, user_id, user_manager, **fmt)
-
     for uuid, new_history_item in new_history_items_by_uuid.items():
 
-        if uuid not in realtoken_data:
+        token = realtoken_data.get(uuid)
+        if token is None:
             logger.warning(f"Realtoken uuid not found: {uuid} in API")
             send_telegram_alert(f"Realtoken update alert bot: Realtoken uuid not found: {uuid} in API")
-            realtoken_name = "unknown name"
+            header_link = escape_markdown_v2("unknown name")
         else:
-            realtoken_name = realtoken_data[uuid]['shortName']
-        
-        # Compute Realt URL for the realtoken
-        realt_url_base = "https://realt.co/product/"
-        full_name = realtoken_data[uuid]["fullName"]
-        slug = "-".join(full_name.replace(",", "").split())
-        realt_url_realtoken = f"{realt_url_base}{slug}"
+            # [short name](realt.co product page), escaped once when the catalogue is built
+            header_link = token.header_link
 
         # Use the latest date (arbitrary choice)
         date_obj = datetime.strptime(new_history_item[-1]['date'], "%Y%m%d")
@@ -60,7 +51,7 @@ def build_lines_messages(new_history_items_by_uuid, realtoken_data, realtoken_hi
         renovationReserve = get_last_value(new_history_item, "renovationReserve")
         rentedUnits = get_last_value(new_history_item, "rentedUnits")
         
-        header_line = translate("updates.header", name=f"[{realtoken_name}]({realt_url_realtoken})") # link syntax in markdown v2: [text](url)
+        header_line = translate("updates.header", name=header_link) # link syntax in markdown v2: [text](url)
 
         # Token price line
         if tokenPrice is not None:
@@ -0,0 +1,70 @@
+import asyncio
+from contextlib import nullcontext
+from typing import Optional
+from telegram.constants import ParseMode
+from telegram.error import Forbidden, RetryAfter, TelegramError
+from telegram.ext import Application
+
+from bot.core.sub.split_message import split_message
+from bot.services.cycle_stats import CycleStats, StageStats
+from bot.services.metrics import MESSAGES
+from bot.services.send_telegram_alert import send_telegram_alert
+
+import logging
+logger = logging.getLogger(__name__)
+
+SEND_MAX_ATTEMPTS = 3  # per message chunk, when Telegram answers with flood control (RetryAfter)
+
+
+async def deliver_message(app: Application, user_id: int, message: str, stats: Optional[CycleStats] = None) -> bool:
+    """
+    Send a notification to a user, split into several messages if it exceeds Telegram's limit
+    (e.g. a reserve sweep over many tokens), within the rate budget if there is one
+    (see LocalRateBudget / SharedRateBudget). Telegram errors never propagate:
+    - RetryAfter (flood control) is retried after the requested delay, up to SEND_MAX_ATTEMPTS times;
+    - Forbidden (the user blocked the bot) marks the user as blocked until their next /start;
+    - any other TelegramError is logged and reported to the alert group.
+    Returns True if the whole message was sent.
+    """
+    rate_budget = app.bot_data.get("rate_budget")  # per process, or shared by the delivery processes
+    try:
+        for chunk in split_message(message):
+            for attempt in range(1, SEND_MAX_ATTEMPTS + 1):
+                if rate_budget is not None:
+                    await rate_budget.acquire()
+                try:
+                    with (stats.stage("deliver") if stats is not None else nullcontext(StageStats())) as st:
+                        st.bytes += len(chunk.encode("utf-8"))
+                        await app.bot.send_message(
+                            chat_id=user_id,
+                            text=chunk,
+                            parse_mode=ParseMode.MARKDOWN_V2,
+                        )
+                        st.items += 1
+                    break
+                except RetryAfter as e:
+                    # Flood control: wait as long as Telegram asks, then send again
+                    if attempt == SEND_MAX_ATTEMPTS:
+                        raise
+                    logger.warning("Flood control while sending to user %s, retrying in %ss", user_id, e.retry_after)
+                    MESSAGES.inc(status="retried")
+                    await asyncio.sleep(e.retry_after)
+        # Counted per notification (like blocked / failed), not per chunk
+        MESSAGES.inc(status="sent")
+    except Forbidden as e:
+        # User blocked the bot: skip them until their next /start
+        MESSAGES.inc(status="blocked")
+        logger.warning("User %s blocked the bot, marked as blocked. Error: %s", user_id, e)
+        user_manager = app.bot_data["user_manager"]
+        await asyncio.to_thread(user_manager.mark_blocked, user_id)
+        if user_manager.read_only and app.bot_data.get("outbox") is not None:
+            # Delivery shard: the front-end owns the user file and records it
+            await asyncio.to_thread(app.bot_data["outbox"].report_blocked, user_id)
+        return False
+    except TelegramError as e:
+        # Any other Telegram-related error should not break the whole job
+        MESSAGES.inc(status="failed")
+        logger.warning("Failed to send message to user %s: %s", user_id, e)
+        send_telegram_alert(f"Realtoken update alert bot: Failed to send message to user: {e}")
+        return False
+    return True
@@ -8,6 +8,10 @@ def filter_messages(lines_messages, user_id, notification_types, token_scope):
     """
     message_parts = []
 
+    # Set lookup instead of scanning the owned list for every token
+    wallet_mode = token_scope['mode'] == 'wallet'
+    realtokens_owned = {uuid.lower() for uuid in token_scope.get('realtokens_owned', [])} if wallet_mode else set()
+
     def push(line: str) -> None:
         """Append a line only if it is a non-empty, non-whitespace string."""
         if isinstance(line, str) and line.strip():
@@ -15,7 +19,7 @@ def filter_messages(lines_messages, user_id, notification_types, token_scope):
 
     for lines_message in lines_messages:
         
-        if token_scope['mode'] == 'wallet' and lines_message['uuid'].lower() not in token_scope['realtokens_owned']:
+        if wallet_mode and lines_message['uuid'].lower() not in realtokens_owned:
             continue
 
         # Header
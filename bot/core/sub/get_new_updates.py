@@ -79,14 +79,17 @@ def get_new_updates(app: Any, current_payload: Dict[str, Any], previous_history_
     )
     
     for uuid, items in new_history_items_by_uuid.items():
-        short_name = (realtoken_data.get(uuid) or {}).get("shortName", "Unknown")
+        token = realtoken_data.get(uuid)
+        short_name = token.short_name if token is not None else "Unknown"
         logger.info(
-            f"Token change summary:\n"
-            f"  Name: {short_name}\n"
-            f"  Update(s): {len(items)}\n"
-            f"  UUID: {uuid}"
+            "Token change summary:\n"
+            "  Name: %s\n"
+            "  Update(s): %d\n"
+            "  UUID: %s",
+            short_name, len(items), uuid,
         )
-        
-    logger.debug(new_history_items_by_uuid)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("New history items: %s", new_history_items_by_uuid)
 
     return new_history_items_by_uuid
\ No newline at end of file
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from typing import AbstractSet, Any, Dict, Iterable
+from telegram.ext import Application
+
+from bot.config.settings import REALTOKENS_LIST_URL, TOKEN_CATALOGUE_MAX_AGE, TOKEN_CATALOGUE_MISSING_RETRY
+from bot.services.cycle_stats import CycleStats
+from bot.services.fetch_json import FetchResult, fetch_raw_conditional, parse_json
+from bot.services.token_catalogue import TokenCatalogue, build_token_catalogue
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+async def refresh_token_catalogue(app: Application, stats: CycleStats, history_uuids: AbstractSet[str]) -> TokenCatalogue:
+    """
+    Return the token catalogue for this cycle (app.bot_data["realtokens"]), downloading the
+    /token list only when it may have changed:
+    - a realtoken of the history is missing from the catalogue (new realtoken); a uuid the
+      /token list did not have at the last check is only asked for again every
+      TOKEN_CATALOGUE_MISSING_RETRY (the list may publish it after the history);
+    - the last download is older than TOKEN_CATALOGUE_MAX_AGE: downloaded unconditionally;
+    - otherwise, a conditional GET with the validators of the last download (ETag / Last-Modified):
+      the API answers 304 without payload when the list did not change.
+    If the API sent no validator, the cached catalogue is used until one of the first two cases.
+
+    The download time, validators and missing uuids (with the time they were last checked) are kept
+    in app.bot_data["realtokens_meta"] (saved in the history snapshot). On failure, the cached
+    catalogue is kept.
+    """
+    catalogue = app.bot_data["realtokens"]
+    meta = app.bot_data.get("realtokens_meta") or {}
+    missing = set(meta.get("missing", ()))
+    fetched_at = meta.get("fetched_at")
+    now = time.time()
+
+    unknown = [uuid for uuid in history_uuids if uuid not in catalogue and uuid not in missing]
+    missing_checked_at = meta.get("missing_checked_at") or fetched_at or 0
+    retry_missing = [uuid for uuid in history_uuids if uuid in missing and uuid not in catalogue] \
+        if now - missing_checked_at >= TOKEN_CATALOGUE_MISSING_RETRY * 60 else []
+    conditional = True
+    if fetched_at is None or now - fetched_at >= TOKEN_CATALOGUE_MAX_AGE * 60:
+        reason, conditional = "max age reached", False
+    elif unknown:
+        reason = f"{len(unknown)} unknown realtoken(s) in history"
+    elif retry_missing:
+        reason = f"{len(retry_missing)} realtoken(s) still missing from the list"
+    elif meta.get("etag") or meta.get("last_modified"):
+        reason = "validator check"
+    else:
+        logger.info(f"Token catalogue: cached ({len(catalogue)} realtokens, {(now - fetched_at) / 60:.0f} min old)")
+        return catalogue
+
+    etag = meta.get("etag") if conditional else None
+    last_modified = meta.get("last_modified") if conditional else None
+    with stats.stage("fetch_tokens") as st:
+        result = await asyncio.to_thread(fetch_raw_conditional, REALTOKENS_LIST_URL, etag, last_modified)
+        st.bytes += len(result.content or b"")
+
+    if result.not_modified:
+        # The API does not have the unknown realtokens either: do not ask again for them before the retry delay
+        if unknown or retry_missing:
+            app.bot_data["realtokens_meta"] = {**meta, "missing": sorted(missing.union(unknown)), "missing_checked_at": now}
+        logger.info(f"Token catalogue: not modified ({reason})")
+        return catalogue
+
+    with stats.stage("parse_tokens") as st:
+        # Only the fields used by the bot are kept (see token_catalogue)
+        catalogue_current = build_token_catalogue(parse_json(result.content, REALTOKENS_LIST_URL))
+        st.items += len(catalogue_current or {})
+    if catalogue_current is None:
+        logger.warning("Token catalogue: download failed, keeping the cached one")
+        return catalogue
+
+    logger.info(f"realtoken data updated: {len(catalogue_current)} realtokens fetched ({reason})")
+    app.bot_data["realtokens"] = catalogue_current
+    app.bot_data["realtokens_meta"] = token_catalogue_meta(result, catalogue_current, history_uuids, now)
+    return catalogue_current
+
+
+def token_catalogue_meta(result: FetchResult, catalogue: TokenCatalogue, history_uuids: Iterable[str], now: float) -> Dict[str, Any]:
+    """app.bot_data["realtokens_meta"] after a download of the /token list (also used by the cold start, see main)."""
+    return {
+        "fetched_at": now,
+        "etag": result.etag,
+        "last_modified": result.last_modified,
+        "missing": sorted(uuid for uuid in history_uuids if uuid not in catalogue),
+        "missing_checked_at": now,
+    }
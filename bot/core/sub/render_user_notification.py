@@ -0,0 +1,56 @@
+import traceback
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from bot.config.settings import DIGEST_PERIODS
+from bot.core.sub.build_lines_messages import build_lines_messages
+from bot.core.sub.filter_messages import filter_messages
+
+
+class RenderContext(NamedTuple):
+    """What a cycle's notifications are rendered from, identical for every recipient (picklable)."""
+    new_history_items_by_uuid: Dict[str, Any]
+    realtoken_data: Dict[str, Any]
+    realtoken_history_data_last: Dict[str, Any]
+    with_digests: bool  # False if there is no digest store: digest users get an immediate message
+
+
+class RenderedNotification(NamedTuple):
+    """Result of rendering a cycle's updates for one user."""
+    user_id: int
+    digest: bool = False           # digest user: the cycle's updates go to the digest store, rendered when sent
+    message: Optional[str] = None  # other users: final message (None if nothing to send)
+    error: Optional[str] = None    # exception type name, if rendering failed
+    error_message: Optional[str] = None
+    error_traceback: Optional[str] = None
+
+
+def render_user_notification(context: RenderContext, prefs, i18n,
+                             lines_by_language: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> RenderedNotification:
+    """
+    Render the updates of a cycle for one user: the message filtered with the user's settings,
+    or nothing for a digest user (the digest is rendered when it is sent, see flush_digests).
+    The lines only depend on the language: pass the same `lines_by_language` dict for all the
+    users of a cycle and they are rendered (and escaped) once per language instead of per user.
+    Never raises: a failure is returned in `error` so the caller can skip the user and report it.
+    """
+    user_id = prefs.user_id
+    if context.with_digests and prefs.digest in DIGEST_PERIODS:
+        return RenderedNotification(user_id, digest=True)
+    try:
+        translate = i18n.translator(prefs.language)
+        lines_messages = lines_by_language.get(translate.language) if lines_by_language is not None else None
+        if lines_messages is None:
+            lines_messages = build_lines_messages(
+                context.new_history_items_by_uuid, context.realtoken_data, context.realtoken_history_data_last,
+                translate,
+            )
+            if lines_by_language is not None:
+                lines_by_language[translate.language] = lines_messages
+
+        message = filter_messages(lines_messages, user_id, prefs.notification_types, prefs.token_scope)
+        if not (message and message.strip()):  # ensures the string has at least one non-whitespace character
+            message = None
+        return RenderedNotification(user_id, message=message)
+
+    except Exception as e:
+        return RenderedNotification(user_id, error=type(e).__name__, error_message=str(e), error_traceback=traceback.format_exc())
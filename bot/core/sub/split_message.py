@@ -0,0 +1,82 @@
+from typing import List
+from telegram.constants import MessageLimit
+
+import logging
+logger = logging.getLogger(__name__)
+
+# filter_messages() separates token blocks with two blank lines, lines of a block with one
+BLOCK_SEPARATOR = "\n\n\n"
+LINE_SEPARATOR = "\n"
+
+
+def _length(text: str) -> int:
+    """Length as counted by Telegram (UTF-16 code units: most emojis count twice)."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _hard_split(text: str, max_len: int) -> List[str]:
+    """
+    Last resort for a single line longer than max_len: cut it into pieces of at most max_len,
+    never right after an escaping backslash (a MarkdownV2 escape "\\x" stays in one piece).
+    """
+    pieces = []
+    while _length(text) > max_len:
+        cut = min(len(text), max_len)
+        while cut > 1 and _length(text[:cut]) > max_len:
+            cut -= 1
+        # An odd number of backslashes before the cut means the last one escapes the next char
+        backslashes = len(text[:cut]) - len(text[:cut].rstrip("\\"))
+        if backslashes % 2 == 1:
+            # Cut before the escape, or keep the escape "\\x" whole if it is all there is room for
+            # (each piece must consume at least one character)
+            cut = cut - 1 if cut > 1 else min(2, len(text))
+        pieces.append(text[:cut])
+        text = text[cut:]
+    if text or not pieces:
+        pieces.append(text)
+    return pieces
+
+
+def _pack(parts: List[str], separator: str, max_len: int) -> List[str]:
+    """Greedily join consecutive parts with separator into chunks of at most max_len."""
+    chunks: List[str] = []
+    current = ""
+    for part in parts:
+        candidate = f"{current}{separator}{part}" if current else part
+        if _length(candidate) <= max_len:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+        current = part
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_message(message: str, max_len: int = MessageLimit.MAX_TEXT_LENGTH) -> List[str]:
+    """
+    Split a notification built by filter_messages() into messages Telegram accepts.
+
+    Token blocks are never split unless a single block exceeds max_len, in which case it is
+    split between its lines (and a single oversize line between characters, keeping MarkdownV2
+    escapes intact). Formatting entities never span lines, so every chunk stays valid MarkdownV2.
+    """
+    if _length(message) <= max_len:
+        return [message]
+
+    parts: List[str] = []
+    for block in message.split(BLOCK_SEPARATOR):
+        if _length(block) <= max_len:
+            parts.append(block)
+            continue
+        for chunk in _pack(
+            [piece for line in block.split(LINE_SEPARATOR) for piece in _hard_split(line, max_len)],
+            LINE_SEPARATOR,
+            max_len,
+        ):
+            parts.append(chunk)
+
+    chunks = _pack(parts, BLOCK_SEPARATOR, max_len)
+    logger.info("Message of %d characters (UTF-16 units) split into %d messages", _length(message), len(chunks))
+    return chunks
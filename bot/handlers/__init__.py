@@ -8,6 +8,7 @@ from .set_language import set_language, set_language_callback
 from .health import health
 from .user_notifications_settings import start_user_notifications_settings, handle_notifications_settings_callback, handle_wallet_text, CALLBACK_PREFIX
 from .start import start
+from .activity import track_user_activity
 
 # If/when you add these, uncomment the lines below:
 # from .start import start
@@ -17,5 +18,6 @@ __all__ = [
     "set_language",
     "health",
     "start",
+    "track_user_activity",
     # "language",
 ]
\ No newline at end of file
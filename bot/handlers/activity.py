@@ -0,0 +1,14 @@
+# bot/handlers/activity.py
+from __future__ import annotations
+from telegram import Update
+from telegram.ext import ContextTypes
+
+async def track_user_activity(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """
+    Record the last interaction time of the user (any command, button or message).
+    Registered in a group before the other handlers so it never blocks them.
+    """
+    user = update.effective_user
+    if user is None:
+        return
+    context.bot_data["user_manager"].mark_active(user.id)
@@ -18,14 +18,14 @@ async def set_language(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     i18n = context.bot_data["i18n"]
 
     # Build buttons directly from loaded translation languages
-    languages = list(i18n._translations.keys())
+    languages = i18n.languages
     keyboard = [[InlineKeyboardButton(lang, callback_data=f"{CALLBACK_PREFIX}{lang}")]
                 for lang in languages]
     reply_markup = InlineKeyboardMarkup(keyboard)
 
     # Prompt in user's current language (falls back to default internally)
     user_id = update.effective_user.id
-    prompt_select_language = i18n.translate_for_user("select_language_prompt", user_id, user_manager)
+    prompt_select_language = i18n.translator_for_user(user_id, user_manager)("select_language_prompt")
     
     await update.message.reply_text(prompt_select_language, reply_markup=reply_markup)
 
@@ -77,6 +77,7 @@ async def set_language_callback(update: Update, context: ContextTypes.DEFAULT_TY
     await _apply_user_custom_menu(context, chat_id, selected_lang)
 
     # Confirm in the newly selected language
-    confirmation = i18n.translate("language_set", selected_lang)
-    prompt_ready = i18n.translate_for_user("ready", user_id, user_manager)
+    tr = i18n.translator_for_user(user_id, user_manager)
+    confirmation = tr("language_set")
+    prompt_ready = tr("ready")
     await query.edit_message_text(confirmation + "\n" + prompt_ready)
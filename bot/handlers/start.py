@@ -14,4 +14,8 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     # Log user start event
     logger.info(f"User {user_id} started the bot.")
 
+    # A user coming back after blocking the bot can be notified again
+    if user:
+        context.bot_data["user_manager"].mark_unblocked(user.id)
+
     await set_language(update, context)
\ No newline at end of file
@@ -1,63 +1,102 @@
 from __future__ import annotations
 from bot.services.logging_config import get_logger
 logger = get_logger(__name__)
+from functools import lru_cache
 from typing import Tuple, Dict, Any, List
 from telegram import InlineKeyboardMarkup, InlineKeyboardButton, Update
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 import re
 
+from bot.config.settings import SETTINGS_SCREEN_CACHE_SIZE
 from bot.task import trigger_update_realtokens_owned_single_wallet
 
 CALLBACK_PREFIX = "uns"  # user notification settings
+DIGEST_CHOICES = ("off", "hourly", "daily")  # "off" = immediate; see DIGEST_PERIODS for the others
 
 # --- UI builders -------------------------------------------------------------
+# A screen only depends on the language and a few settings: each one is rendered once per
+# (translator, settings state) and then reused, so most callbacks are a cache hit.
+# The public builders take (tr, prefs) and extract the state; the cached _screen functions
+# take the state only. Sharing an InlineKeyboardMarkup between messages is safe (immutable).
 
-def build_main_keyboard(i18n, user_id: int, user_manager) -> InlineKeyboardMarkup:
+_screen_cache = lru_cache(maxsize=SETTINGS_SCREEN_CACHE_SIZE)
+
+
+def _notification_types_state(prefs) -> Tuple[bool, bool, bool]:
+    """(income, price, other) notification flags of a user (JSON field names, with their defaults)."""
+    notification_types: Dict[str, Any] = getattr(prefs, "notification_types", {}) or {}
+    return (
+        bool(notification_types.get("income_updates", True)),
+        bool(notification_types.get("price_token_updates", True)),
+        bool(notification_types.get("other_updates", False)),
+    )
+
+
+def _scope_mode(prefs) -> str:
+    token_scope: Dict[str, Any] = getattr(prefs, "token_scope", {}) or {}
+    return token_scope.get("mode", "all")  # "all" or "wallet"
+
+
+def _wallets(prefs) -> Tuple[str, ...]:
+    token_scope: Dict[str, Any] = getattr(prefs, "token_scope", {}) or {}
+    return tuple(token_scope.get("wallets", []) or [])
+
+
+def build_main_keyboard(tr) -> InlineKeyboardMarkup:
     """
-    Build the main inline keyboard with buttons for notification types, token scope, and back/close.
+    Build the main inline keyboard with buttons for notification types, token scope, delivery (digest), and back/close.
     """
+    return _main_keyboard(tr)
+
+
+@_screen_cache
+def _main_keyboard(tr) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup([
         [InlineKeyboardButton(
-            i18n.translate_for_user("notifications.btn.types", user_id, user_manager),
+            tr("notifications.btn.types"),
             callback_data=f"{CALLBACK_PREFIX}:nav:types")],
         [InlineKeyboardButton(
-            i18n.translate_for_user("notifications.btn.scope", user_id, user_manager),
+            tr("notifications.btn.scope"),
             callback_data=f"{CALLBACK_PREFIX}:nav:scope")],
         [InlineKeyboardButton(
-            i18n.translate_for_user("notifications.btn.close", user_id, user_manager),
+            tr("notifications.btn.digest"),
+            callback_data=f"{CALLBACK_PREFIX}:nav:digest")],
+        [InlineKeyboardButton(
+            tr("notifications.btn.close"),
             callback_data=f"{CALLBACK_PREFIX}:close")],
     ])
 
-def render_main_message(i18n, user_id: int, user_manager) -> Tuple[str, InlineKeyboardMarkup]:
+def render_main_message(tr, prefs) -> Tuple[str, InlineKeyboardMarkup]:
     """
-    Reads the user's preferences via UserManager and builds the (text + inline keyboard)
+    Builds the (text + inline keyboard) from the user's preferences (translated with `tr`, see I18n.translator)
     for the main notifications settings screen. No callback logic here.
     """
-    prefs = user_manager.get_user(user_id)
-
-    notification_types: Dict[str, Any] = getattr(prefs, "notification_types", {}) or {}
-    token_scope: Dict[str, Any] = getattr(prefs, "token_scope", {}) or {}
+    digest = getattr(prefs, "digest", "off")
+    if digest not in DIGEST_CHOICES:
+        digest = "off"
+    return _main_screen(tr, _notification_types_state(prefs), _scope_mode(prefs), digest)
 
-    # JSON field names
-    income_enabled = bool(notification_types.get("income_updates", True))
-    price_enabled  = bool(notification_types.get("price_token_updates", True))
-    other_enabled  = bool(notification_types.get("other_updates", False))
 
-    mode = token_scope.get("mode", "all")  # "all" or "wallet"
+@_screen_cache
+def _main_screen(tr, types_state: Tuple[bool, bool, bool], mode: str, digest: str) -> Tuple[str, InlineKeyboardMarkup]:
+    income_enabled, price_enabled, other_enabled = types_state
     scope_label = "All" if mode == "all" else "Wallet"
 
     checked, unchecked = "☑", "☐"
 
     # Text parts via i18n
-    title        = i18n.translate_for_user("notifications.title", user_id, user_manager)
-    types_header = i18n.translate_for_user("notifications.types.header", user_id, user_manager)
-    income_label = i18n.translate_for_user("notifications.types.income", user_id, user_manager)
-    price_label  = i18n.translate_for_user("notifications.types.price", user_id, user_manager)
-    other_label  = i18n.translate_for_user("notifications.types.other", user_id, user_manager)
-    scope_header = i18n.translate_for_user("notifications.scope.header", user_id, user_manager, scope=scope_label)
-    scope_legend = i18n.translate_for_user("notifications.scope.legend", user_id, user_manager)
-    cta          = i18n.translate_for_user("notifications.cta", user_id, user_manager)
+    title        = tr("notifications.title")
+    types_header = tr("notifications.types.header")
+    income_label = tr("notifications.types.income")
+    price_label  = tr("notifications.types.price")
+    other_label  = tr("notifications.types.other")
+    scope_header = tr("notifications.scope.header", scope=scope_label)
+    scope_legend = tr("notifications.scope.legend")
+    digest_label = tr(f"notifications.digest.{digest}_short")
+    digest_header = tr("notifications.digest.header", digest=digest_label)
+    digest_legend = tr("notifications.digest.legend")
+    cta          = tr("notifications.cta")
 
     message_text = (
         f"{title}\n\n"
@@ -68,32 +107,34 @@ def render_main_message(i18n, user_id: int, user_manager) -> Tuple[str, InlineKe
         f"\n\n"
         f"{scope_header}\n"
         f"    {scope_legend}\n\n"
+        f"{digest_header}\n"
+        f"    {digest_legend}\n\n"
         f"{cta}"
     )
 
-    keyboard = build_main_keyboard(i18n, user_id, user_manager)
+    keyboard = _main_keyboard(tr)
     return message_text, keyboard
 
 
-def build_notification_types_keyboard(i18n, user_id: int, user_manager) -> InlineKeyboardMarkup:
+def build_notification_types_keyboard(tr, prefs) -> InlineKeyboardMarkup:
     """
     Build the inline keyboard for the 'Notification Types' submenu.
     Shows current on/off state with checkboxes and provides a Back button.
     """
-    prefs = user_manager.get_user(user_id)
-    notification_types = getattr(prefs, "notification_types", {}) or {}
+    return _notification_types_keyboard(tr, _notification_types_state(prefs))
+
 
-    income_enabled = bool(notification_types.get("income_updates", True))
-    price_enabled  = bool(notification_types.get("price_token_updates", True))
-    other_enabled  = bool(notification_types.get("other_updates", False))
+@_screen_cache
+def _notification_types_keyboard(tr, types_state: Tuple[bool, bool, bool]) -> InlineKeyboardMarkup:
+    income_enabled, price_enabled, other_enabled = types_state
 
     checked, unchecked = "✔", "✖"
 
     # Labels via i18n (short versions for buttons)
-    income_label = i18n.translate_for_user("notifications.types.income_short", user_id, user_manager)
-    price_label  = i18n.translate_for_user("notifications.types.price_short",  user_id, user_manager)
-    other_label  = i18n.translate_for_user("notifications.types.other_short",  user_id, user_manager)
-    back_label   = i18n.translate_for_user("notifications.btn.back",          user_id, user_manager)
+    income_label = tr("notifications.types.income_short")
+    price_label  = tr("notifications.types.price_short")
+    other_label  = tr("notifications.types.other_short")
+    back_label   = tr("notifications.btn.back")
 
     return InlineKeyboardMarkup([
         [InlineKeyboardButton(f"{checked if income_enabled else unchecked} {income_label}",
@@ -105,34 +146,40 @@ def build_notification_types_keyboard(i18n, user_id: int, user_manager) -> Inlin
         [InlineKeyboardButton(back_label, callback_data=f"{CALLBACK_PREFIX}:nav:main")],
     ])
 
-def render_notification_types_message(i18n, user_id: int, user_manager) -> Tuple[str, InlineKeyboardMarkup]:
+def render_notification_types_message(tr, prefs) -> Tuple[str, InlineKeyboardMarkup]:
     """
     Build the (text + inline keyboard) for the 'Notification Types' submenu.
     """
-    title = i18n.translate_for_user("notifications.types.screen.title", user_id, user_manager)
-    help_text = i18n.translate_for_user("notifications.types.screen.help", user_id, user_manager)
+    return _notification_types_screen(tr, _notification_types_state(prefs))
+
+
+@_screen_cache
+def _notification_types_screen(tr, types_state: Tuple[bool, bool, bool]) -> Tuple[str, InlineKeyboardMarkup]:
+    title = tr("notifications.types.screen.title")
+    help_text = tr("notifications.types.screen.help")
 
     text = f"{title}\n\n{help_text}"
-    keyboard = build_notification_types_keyboard(i18n, user_id, user_manager)
+    keyboard = _notification_types_keyboard(tr, types_state)
     return text, keyboard
 
-def build_token_scope_keyboard(i18n, user_id: int, user_manager) -> InlineKeyboardMarkup:
+def build_token_scope_keyboard(tr, prefs) -> InlineKeyboardMarkup:
     """
     Build the inline keyboard for the 'Token Scope' submenu.
     Buttons: All, Wallet, Manage Wallet, Back.
     'All' and 'Wallet' show a check ("✔") if active, a black cross (✖) if inactive.
     """
-    prefs = user_manager.get_user(user_id)
-    token_scope = getattr(prefs, "token_scope", {}) or {}
-    mode = token_scope.get("mode", "all")  # "all" | "wallet"
+    return _token_scope_keyboard(tr, _scope_mode(prefs))
 
+
+@_screen_cache
+def _token_scope_keyboard(tr, mode: str) -> InlineKeyboardMarkup:
     checked, crossed = "✔", "✖"
 
     # Short labels via i18n
-    all_label         = i18n.translate_for_user("notifications.scope.all_short",    user_id, user_manager)
-    wallet_label      = i18n.translate_for_user("notifications.scope.wallet_short", user_id, user_manager)
-    manage_wallet_lbl = i18n.translate_for_user("notifications.scope.manage_wallet", user_id, user_manager)
-    back_label        = i18n.translate_for_user("notifications.btn.back",           user_id, user_manager)
+    all_label         = tr("notifications.scope.all_short")
+    wallet_label      = tr("notifications.scope.wallet_short")
+    manage_wallet_lbl = tr("notifications.scope.manage_wallet")
+    back_label        = tr("notifications.btn.back")
 
     all_text    = f"{checked if mode == 'all' else crossed} {all_label}"
     wallet_text = f"{checked if mode == 'wallet' else crossed} {wallet_label}"
@@ -145,39 +192,84 @@ def build_token_scope_keyboard(i18n, user_id: int, user_manager) -> InlineKeyboa
     ])
 
 
-def render_token_scope_message(i18n, user_id: int, user_manager) -> tuple[str, InlineKeyboardMarkup]:
+def render_token_scope_message(tr, prefs) -> tuple[str, InlineKeyboardMarkup]:
     """
     Build the (text + inline keyboard) for the 'Token Scope' submenu.
     """
-    title = i18n.translate_for_user("notifications.scope.screen.title", user_id, user_manager)
-    help_text = i18n.translate_for_user("notifications.scope.screen.help", user_id, user_manager)
+    return _token_scope_screen(tr, _scope_mode(prefs))
+
+
+@_screen_cache
+def _token_scope_screen(tr, mode: str) -> Tuple[str, InlineKeyboardMarkup]:
+    title = tr("notifications.scope.screen.title")
+    help_text = tr("notifications.scope.screen.help")
 
     text = f"{title}\n\n{help_text}"
-    keyboard = build_token_scope_keyboard(i18n, user_id, user_manager)
+    keyboard = _token_scope_keyboard(tr, mode)
     return text, keyboard
 
 
+def build_digest_keyboard(tr, prefs) -> InlineKeyboardMarkup:
+    """
+    Build the inline keyboard for the 'Delivery' submenu.
+    Buttons: Immediate, Hourly, Daily, Back, with a check ("✔") on the active choice.
+    """
+    return _digest_keyboard(tr, getattr(prefs, "digest", "off"))
 
-def build_manage_wallet_keyboard(i18n, user_id: int, user_manager) -> InlineKeyboardMarkup:
+
+@_screen_cache
+def _digest_keyboard(tr, digest: str) -> InlineKeyboardMarkup:
+    checked, crossed = "✔", "✖"
+
+    rows = []
+    for choice in DIGEST_CHOICES:
+        label = tr(f"notifications.digest.{choice}_short")
+        rows.append([InlineKeyboardButton(f"{checked if digest == choice else crossed} {label}",
+                                          callback_data=f"{CALLBACK_PREFIX}:set_digest:{choice}")])
+    back_label = tr("notifications.btn.back")
+    rows.append([InlineKeyboardButton(back_label, callback_data=f"{CALLBACK_PREFIX}:nav:main")])
+
+    return InlineKeyboardMarkup(rows)
+
+
+def render_digest_message(tr, prefs) -> Tuple[str, InlineKeyboardMarkup]:
+    """
+    Build the (text + inline keyboard) for the 'Delivery' submenu.
+    """
+    return _digest_screen(tr, getattr(prefs, "digest", "off"))
+
+
+@_screen_cache
+def _digest_screen(tr, digest: str) -> Tuple[str, InlineKeyboardMarkup]:
+    title = tr("notifications.digest.screen.title")
+    help_text = tr("notifications.digest.screen.help")
+
+    text = f"{title}\n\n{help_text}"
+    keyboard = _digest_keyboard(tr, digest)
+    return text, keyboard
+
+
+def build_manage_wallet_keyboard(tr, prefs) -> InlineKeyboardMarkup:
     """
     Build the inline keyboard for the 'Manage Wallets' submenu.
     - One button per configured wallet
     - One 'Add a wallet' button (no action yet)
     - One 'Back' button to return to the Token Scope screen
     """
+    return _manage_wallet_keyboard(tr, _wallets(prefs))
+
+
+@_screen_cache
+def _manage_wallet_keyboard(tr, wallets: Tuple[str, ...]) -> InlineKeyboardMarkup:
     def _short_addr(addr: str) -> str:
         """Return a compact 0x address representation like 0x1234…abcd."""
         if not isinstance(addr, str) or len(addr) < 10:
             return addr
         return f"{addr[:8]}…{addr[-8:]}"
-    
-    prefs = user_manager.get_user(user_id)
-    token_scope = getattr(prefs, "token_scope", {}) or {}
-    wallets: List[str] = token_scope.get("wallets", []) or []
 
     # Labels (English text per user request for this screen)
-    add_wallet_label = i18n.translate_for_user("notifications.scope.add_wallet", user_id, user_manager)
-    back_label = i18n.translate_for_user("notifications.btn.back", user_id, user_manager)
+    add_wallet_label = tr("notifications.scope.add_wallet")
+    back_label = tr("notifications.btn.back")
 
     # One line per wallet; callback placeholders for future logic
     rows = []
@@ -191,20 +283,23 @@ def build_manage_wallet_keyboard(i18n, user_id: int, user_manager) -> InlineKeyb
 
     return InlineKeyboardMarkup(rows)
 
-def render_manage_wallet_message(i18n, user_id: int, user_manager) -> Tuple[str, InlineKeyboardMarkup]:
+def render_manage_wallet_message(tr, prefs) -> Tuple[str, InlineKeyboardMarkup]:
     """
     Build the (text + inline keyboard) for the 'Manage Wallets' submenu.
     The message description must be exactly 'Your wallets' (English).
     """
-    manage_wallet_header = i18n.translate_for_user("notifications.scope.manage_wallet", user_id, user_manager)
-    keyboard = build_manage_wallet_keyboard(i18n, user_id, user_manager)
+    return _manage_wallet_screen(tr, _wallets(prefs))
+
 
-    if len(keyboard.inline_keyboard) == 2: # if btn Add and btn Back -> no wallet yet registered for the user
-        description = i18n.translate_for_user("notifications.scope.manage_wallet.description_without_wallet", user_id, user_manager)
+@_screen_cache
+def _manage_wallet_screen(tr, wallets: Tuple[str, ...]) -> Tuple[str, InlineKeyboardMarkup]:
+    manage_wallet_header = tr("notifications.scope.manage_wallet")
+    if not wallets:
+        description = tr("notifications.scope.manage_wallet.description_without_wallet")
     else:
-        description =  i18n.translate_for_user("notifications.scope.manage_wallet.description_with_wallet", user_id, user_manager)
+        description =  tr("notifications.scope.manage_wallet.description_with_wallet")
     text = manage_wallet_header + '\n\n' + description
-    keyboard = build_manage_wallet_keyboard(i18n, user_id, user_manager)
+    keyboard = _manage_wallet_keyboard(tr, wallets)
     return text, keyboard
 
 
@@ -218,7 +313,11 @@ async def start_user_notifications_settings(update: Update, context: ContextType
     i18n = context.bot_data["i18n"]
     user_manager = context.bot_data["user_manager"]
 
-    text, keyboard = render_main_message(i18n, user_id, user_manager)
+    # Resolve the user's preferences and language once for the whole screen
+    prefs = user_manager.get_user(user_id)
+    tr = i18n.translator(prefs.language)
+
+    text, keyboard = render_main_message(tr, prefs)
     await update.message.reply_text(text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
 
 
@@ -231,6 +330,8 @@ async def handle_notifications_settings_callback(update: Update, context: Contex
     user_id = query.from_user.id
     i18n = context.bot_data["i18n"]
     user_manager = context.bot_data["user_manager"]
+    prefs = user_manager.get_user(user_id)
+    tr = i18n.translator(prefs.language)
 
     parts = (query.data or "").split(":")  # e.g. ["uns","nav","types"]
     if not parts or parts[0] != CALLBACK_PREFIX:
@@ -239,7 +340,7 @@ async def handle_notifications_settings_callback(update: Update, context: Contex
     action = parts[1] if len(parts) > 1 else ""
 
     if action == "close":
-        closed_text = i18n.translate_for_user("notifications.closed", user_id, user_manager)
+        closed_text = tr("notifications.closed")
         # Avoid parse_mode here if your text may contain unescaped Markdown characters
         await query.edit_message_text(closed_text, reply_markup=None)
         return
@@ -247,19 +348,23 @@ async def handle_notifications_settings_callback(update: Update, context: Contex
     if action == "nav":
         dest = parts[2] if len(parts) > 2 else ""
         if dest == "types":
-            text, kb = render_notification_types_message(i18n, user_id, user_manager)
+            text, kb = render_notification_types_message(tr, prefs)
             await query.edit_message_text(text, reply_markup=kb, parse_mode=ParseMode.MARKDOWN)
             return
         if dest == "scope":
-            text, kb = render_token_scope_message(i18n, user_id, user_manager)
+            text, kb = render_token_scope_message(tr, prefs)
             await query.edit_message_text(text, reply_markup=kb, parse_mode=ParseMode.MARKDOWN)
             return
         if dest == "manage_wallet":
-            text, kb = render_manage_wallet_message(i18n, user_id, user_manager)
+            text, kb = render_manage_wallet_message(tr, prefs)
+            await query.edit_message_text(text, reply_markup=kb, parse_mode=ParseMode.MARKDOWN)
+            return
+        if dest == "digest":
+            text, kb = render_digest_message(tr, prefs)
             await query.edit_message_text(text, reply_markup=kb, parse_mode=ParseMode.MARKDOWN)
             return
         if dest == "main":
-            text, kb = render_main_message(i18n, user_id, user_manager)
+            text, kb = render_main_message(tr, prefs)
             await query.edit_message_text(text, reply_markup=kb, parse_mode=ParseMode.MARKDOWN)
             return
         return
@@ -278,7 +383,6 @@ async def handle_notifications_settings_callback(update: Update, context: Contex
             return
     
         # Read current preferences
-        prefs = user_manager.get_user(user_id)
         notification_types = getattr(prefs, "notification_types", {}) or {}
     
         # Flip the target flag
@@ -289,7 +393,7 @@ async def handle_notifications_settings_callback(update: Update, context: Contex
         user_manager.update_user(user_id, notification_types=notification_types)
     
         # Rebuild only the keyboard for the Notification Types screen
-        new_kb = build_notification_types_keyboard(i18n, user_id, user_manager)
+        new_kb = build_notification_types_keyboard(tr, prefs)
         # Update markup without changing the text
         await query.edit_message_reply_markup(reply_markup=new_kb)
         return
@@ -300,19 +404,34 @@ async def handle_notifications_settings_callback(update: Update, context: Contex
         if choice not in ("all", "wallet"):
             return
 
-        # Read current preferences and token_scope (dict expected: {"mode": "...", "wallets": [...]})
-        prefs = user_manager.get_user(user_id)
-        token_scope = getattr(prefs, "token_scope", {}) or {}
+        # Update mode while preserving existing wallets and realtokens owned
+        # (atomic: a wallet worker may update realtokens_owned at the same time)
+        def _set_scope_mode(prefs) -> None:
+            token_scope = getattr(prefs, "token_scope", {}) or {}
+            prefs.token_scope = {**token_scope, "mode": choice}
 
-        # Update mode while preserving existing wallets
-        new_token_scope = {**token_scope, "mode": choice}
-        user_manager.update_user(user_id, token_scope=new_token_scope)
+        user_manager.modify_user(user_id, _set_scope_mode)
 
         # Refresh the Token Scope screen (both text and inline keyboard)
-        text, kb = render_token_scope_message(i18n, user_id, user_manager)
+        text, kb = render_token_scope_message(tr, prefs)
         await query.edit_message_text(text, reply_markup=kb, parse_mode=ParseMode.MARKDOWN)
         return
 
+    if action == "set_digest":
+        # parts: ["uns", "set_digest", "off" | "hourly" | "daily"]
+        choice = (parts[2] if len(parts) > 2 else "").lower()
+        if choice not in DIGEST_CHOICES:
+            return
+        if getattr(prefs, "digest", "off") == choice:
+            return  # unchanged: editing the message with the same keyboard would fail
+
+        user_manager.update_user(user_id, digest=choice)
+
+        # Rebuild only the keyboard for the Delivery screen
+        new_kb = build_digest_keyboard(tr, prefs)
+        await query.edit_message_reply_markup(reply_markup=new_kb)
+        return
+
     if action == "wallet":
         sub = parts[2] if len(parts) > 2 else ""
 
@@ -321,7 +440,7 @@ async def handle_notifications_settings_callback(update: Update, context: Contex
             # Flag that we expect the next text message to be a wallet address
             context.user_data["awaiting_wallet_address"] = True
 
-            text_enter_wallet = i18n.translate_for_user("notifications.scope.manage_wallet.enter_new_wallet", user_id, user_manager)
+            text_enter_wallet = tr("notifications.scope.manage_wallet.enter_new_wallet")
             # As requested, message must be exactly this (and remove inline keyboards)
             await query.edit_message_text(text_enter_wallet, reply_markup=None)
             return
@@ -332,38 +451,42 @@ async def handle_notifications_settings_callback(update: Update, context: Contex
         except ValueError:
             return
 
-        # Load current wallets
-        prefs = user_manager.get_user(user_id)
-        token_scope = getattr(prefs, "token_scope", {}) or {}
-        wallets = list(token_scope.get("wallets", []) or [])
-    
-        # Bounds check and delete
         real_index = idx - 1  # convert to 0-based
-        if 0 <= real_index < len(wallets):
+
+        def _delete_wallet(prefs) -> None:
+            # Load current wallets
+            token_scope = getattr(prefs, "token_scope", {}) or {}
+            wallets = list(token_scope.get("wallets", []) or [])
+
+            # Bounds check and delete
+            if not 0 <= real_index < len(wallets):
+                return
             wallet_to_delete = wallets[real_index]
             del wallets[real_index]
             new_token_scope = {**token_scope, "wallets": wallets}
-        
-        # If no wallets remain, clear realtokens_owned
-        if not wallets:
-            new_token_scope["realtokens_owned"] = []
-            new_token_scope["mode"] = 'all'
-            logger.info(
-                f"User {user_id} deleted the last wallet ({wallet_to_delete});"
-                f"reset token_scope['realtokens_owned'] to empty list."
-                f"reset token_scope['mode'] to all."
-            )
-        else:
-            logger.info(
-                f"User {user_id} deleted wallet address {wallet_to_delete}; "
-                f"{len(wallets)} wallet(s) remain."
-            )
-    
-        # Persist changes in a single update
-        user_manager.update_user(user_id, token_scope=new_token_scope)
+
+            # If no wallets remain, clear realtokens_owned
+            if not wallets:
+                new_token_scope["realtokens_owned"] = []
+                new_token_scope["mode"] = 'all'
+                logger.info(
+                    f"User {user_id} deleted the last wallet ({wallet_to_delete});"
+                    f"reset token_scope['realtokens_owned'] to empty list."
+                    f"reset token_scope['mode'] to all."
+                )
+            else:
+                logger.info(
+                    f"User {user_id} deleted wallet address {wallet_to_delete}; "
+                    f"{len(wallets)} wallet(s) remain."
+                )
+
+            prefs.token_scope = new_token_scope
+
+        # Persist changes in a single atomic update
+        user_manager.modify_user(user_id, _delete_wallet)
 
         # Refresh the Manage Wallets screen (text + keyboard may change)
-        text, kb = render_manage_wallet_message(i18n, user_id, user_manager)
+        text, kb = render_manage_wallet_message(tr, prefs)
         await query.edit_message_text(text, reply_markup=kb, parse_mode=ParseMode.MARKDOWN)
         return
 
@@ -391,14 +514,16 @@ async def handle_wallet_text(update: Update, context: ContextTypes.DEFAULT_TYPE)
     user_id = update.effective_user.id
     i18n = context.bot_data["i18n"]
     user_manager = context.bot_data["user_manager"]
+    prefs = user_manager.get_user(user_id)
+    tr = i18n.translator(prefs.language)
 
     addr = (update.message.text or "").strip()
 
     # Validate EVM address
     if not is_valid_evm_address(addr):
         # Keep waiting; re-prompt user with a short validation hint
-        invalid_wallet = i18n.translate_for_user("notifications.scope.manage_wallet.invalid_address", user_id, user_manager)
-        text_enter_wallet = i18n.translate_for_user("notifications.scope.manage_wallet.enter_new_wallet", user_id, user_manager)
+        invalid_wallet = tr("notifications.scope.manage_wallet.invalid_address")
+        text_enter_wallet = tr("notifications.scope.manage_wallet.enter_new_wallet")
         await update.message.reply_text(
             f"{invalid_wallet}\n{text_enter_wallet}"
         )
@@ -407,23 +532,24 @@ async def handle_wallet_text(update: Update, context: ContextTypes.DEFAULT_TYPE)
     # Normalize address storage (lowercase is fine unless you enforce EIP-55 checksums)
     addr_norm = addr.lower()
 
-    # Append to the user's wallets (avoid duplicates)
-    prefs = user_manager.get_user(user_id)
-    token_scope = getattr(prefs, "token_scope", {}) or {}
-    wallets: List[str] = list(token_scope.get("wallets", []) or [])
-    if addr_norm not in wallets:
-        wallets.append(addr_norm)
-    
+    # Append to the user's wallets (avoid duplicates), atomically
+    def _add_wallet(prefs) -> None:
+        token_scope = getattr(prefs, "token_scope", {}) or {}
+        wallets: List[str] = list(token_scope.get("wallets", []) or [])
+        if addr_norm not in wallets:
+            wallets.append(addr_norm)
+
+        new_token_scope = {**token_scope, "wallets": wallets}
+        new_token_scope["mode"] = "wallet"
+        prefs.token_scope = new_token_scope
 
-    new_token_scope = {**token_scope, "wallets": wallets}
-    new_token_scope["mode"] = "wallet"
-    user_manager.update_user(user_id, token_scope=new_token_scope)
+    user_manager.modify_user(user_id, _add_wallet)
 
     # Clear the awaiting flag
     context.user_data["awaiting_wallet_address"] = False
 
     # Return to Manage Wallets screen
-    text, kb = render_manage_wallet_message(i18n, user_id, user_manager)
+    text, kb = render_manage_wallet_message(tr, prefs)
     await update.message.reply_text(text, reply_markup=kb, parse_mode=ParseMode.MARKDOWN)
 
     # Fire-and-forget background task to update owned RealTokens
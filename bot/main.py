@@ -1,20 +1,31 @@
 from __future__ import annotations
+import time
+_STARTUP_STARTED_AT = time.perf_counter()  # before any heavy import, for the time-to-first-poll log
+
+import asyncio
 from datetime import timedelta
 
 from bot.services.logging_config import get_logger
 logger = get_logger("bot.main")
 
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, JobQueue, MessageHandler, filters
+from telegram import Update
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, JobQueue, MessageHandler, TypeHandler, filters
 
 from bot.core.sub import build_history_state
-
-from bot.config.settings import get_settings, REALTOKENS_LIST_URL, REALTOKEN_HISTORY_URL, FRENQUENCY_CHECKING_FOR_UPDATES, FRENQUENCY_WALLET_UPDATE
-from bot.services import I18n, UserManager, fetch_json
-from bot.services.utilities import list_to_dict_by_uuid, load_abis
+from bot.core.sub.refresh_token_catalogue import token_catalogue_meta
+
+from bot.config.settings import get_settings, REALTOKENS_LIST_URL, REALTOKEN_HISTORY_URL, FRENQUENCY_CHECKING_FOR_UPDATES, WALLET_UPDATE_SLICE_INTERVAL, DIGEST_FLUSH_CHECK_INTERVAL, WEBHOOK_URL, BOT_ROLE, DIGEST_PENDING_PATH, DELIVERY_SHARDS, DELIVERY_SHARD_INDEX, DELIVERY_POLL_INTERVAL
+from bot.services import I18n, UserManager, WalletBalanceCache, DigestStore, Outbox, LocalRateBudget, SharedRateBudget, fetch_json
+from bot.services.app_lifecycle import run_application
+from bot.services.fetch_json import fetch_raw_conditional, parse_json
+from bot.services.utilities import list_to_dict_by_uuid
+from bot.services.token_catalogue import build_token_catalogue
 from bot.services.error_handler import global_error_handler
 from bot.services.send_telegram_alert import send_telegram_alert
 from bot.services.on_post_shutdown import on_post_shutdown
-from bot.task.job import job_update_and_notify, job_update_realtoken_owned
+from bot.services.on_post_init import on_post_init
+from bot.services.history_snapshot import load_history_snapshot
+from bot.task.job import job_update_and_notify, job_update_realtoken_owned, job_flush_digests, job_deliver_shard_updates
 from bot.handlers import (
     health,
     start,
@@ -23,14 +34,25 @@ from bot.handlers import (
     start_user_notifications_settings,
     handle_notifications_settings_callback,
     handle_wallet_text,
+    track_user_activity,
     CALLBACK_PREFIX
 )
 
 def main() -> None:
     settings = get_settings()
 
+    # "all": single process; "worker" / "frontend" (/ "delivery"): split deployment (see BOT_ROLE in settings)
+    role = BOT_ROLE
+    if role not in ("all", "worker", "frontend", "delivery"):
+        raise RuntimeError(f"Invalid BOT_ROLE '{role}': expected all, worker, frontend or delivery.")
+    if DELIVERY_SHARDS > 0 and role == "all":
+        raise RuntimeError("DELIVERY_SHARDS requires the split deployment (BOT_ROLE worker / frontend / delivery).")
+    if role == "delivery" and not 0 <= DELIVERY_SHARD_INDEX < DELIVERY_SHARDS:
+        raise RuntimeError(f"Invalid DELIVERY_SHARD_INDEX {DELIVERY_SHARD_INDEX}: expected 0 to DELIVERY_SHARDS-1 ({DELIVERY_SHARDS - 1}).")
+
     # Create the UserManager instance and load all user data
-    user_manager = UserManager()  # default path = USER_DATA_PATH
+    # (the worker and the delivery shards only read the file written by the front-end)
+    user_manager = UserManager(read_only=(role in ("worker", "delivery")))  # default path = USER_DATA_PATH
     
     # Create the I18n instance and load translations from JSON
     i18n = I18n()
@@ -41,54 +63,133 @@ def main() -> None:
         Application.builder()
         .token(settings.bot_token)
         .job_queue(jq)
+        .post_init(on_post_init)
         .post_shutdown(on_post_shutdown)
         .build()
     )
 
-    # Fetch RealToken data (as-is from the API)
-    realtoken_data = list_to_dict_by_uuid(fetch_json(REALTOKENS_LIST_URL) or [])
-    realtoken_history_data = list_to_dict_by_uuid(fetch_json(REALTOKEN_HISTORY_URL) or [])
-
-    # Loads ABIs
-    abis = load_abis()
+    # Warm start: reuse the state saved after the last cycle, so that the first cycle diffs
+    # against it (updates published while the bot was down are notified) and no API call blocks startup
+    snapshot = load_history_snapshot() if role != "delivery" else None
+    if role == "delivery":
+        # Delivery shards get the realtoken data of each update set from the worker
+        realtoken_data, realtoken_history_data, realtoken_history_state = {}, {}, {}
+        realtokens_meta = {}
+        first_cycle_delay = None
+    elif snapshot is not None:
+        realtoken_data = snapshot["realtokens"]
+        realtokens_meta = snapshot.get("realtokens_meta") or {}  # older snapshots: downloaded again at the first cycle
+        realtoken_history_data = snapshot["realtoken_history"]
+        realtoken_history_state = snapshot["realtoken_history_state"]
+        first_cycle_delay = timedelta(seconds=5)
+    else:
+        # Cold start: fetch RealToken data (as-is from the API) as the baseline
+        tokens = fetch_raw_conditional(REALTOKENS_LIST_URL)
+        realtoken_data = build_token_catalogue(parse_json(tokens.content, REALTOKENS_LIST_URL))
+        realtoken_history_data = list_to_dict_by_uuid(fetch_json(REALTOKEN_HISTORY_URL) or [])
+        # Download time and validators: the first cycle only sends a conditional request (failed: downloaded again)
+        realtokens_meta = token_catalogue_meta(tokens, realtoken_data, realtoken_history_data, time.time()) if realtoken_data is not None else {}
+        realtoken_data = realtoken_data or {}
+        realtoken_history_state = build_history_state(realtoken_history_data)
+        first_cycle_delay = timedelta(seconds=60)
 
     # Store services in bot_data so all handlers can access them
     app.bot_data["user_manager"] = user_manager
     app.bot_data["i18n"] = i18n
     app.bot_data["realtokens"] = realtoken_data
+    app.bot_data["realtokens_meta"] = realtokens_meta
     app.bot_data["realtoken_history"] = realtoken_history_data
-    app.bot_data["realtoken_history_state"] = build_history_state(realtoken_history_data)
-    app.bot_data["abis"] = abis   
-
-    # Register handlers 
-    app.add_handler(CommandHandler("health", health)) # check if the bot is running
-    app.add_handler(CommandHandler("start", start))
-    app.add_handler(CommandHandler("setlanguage", set_language))
-    app.add_handler(CommandHandler("notification_settings", start_user_notifications_settings))
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_wallet_text))
-
-    # Resgister callback
-    app.add_handler(CallbackQueryHandler(set_language_callback, pattern=r"^lang_.+"))
-    app.add_handler(CallbackQueryHandler(handle_notifications_settings_callback, pattern=f"^{CALLBACK_PREFIX}:"))
+    app.bot_data["realtoken_history_state"] = realtoken_history_state
+    app.bot_data["startup_started_at"] = _STARTUP_STARTED_AT
+    app.bot_data["wallet_balance_cache"] = WalletBalanceCache()
+    app.bot_data["role"] = role
+    if role == "delivery":
+        # Each delivery shard keeps the pending digests of its own users
+        app.bot_data["digest_store"] = DigestStore(DIGEST_PENDING_PATH.with_name(f"digest_pending.shard{DELIVERY_SHARD_INDEX}.json"))
+    elif role != "frontend":
+        app.bot_data["digest_store"] = DigestStore()
+    if role != "all":
+        # Notifications rendered by the worker, delivered by the front-end (+ blocked users reported by the shards)
+        app.bot_data["outbox"] = Outbox()
+    if DELIVERY_SHARDS > 0 and role in ("frontend", "delivery"):
+        # All the processes sending notifications share Telegram's rate limit
+        app.bot_data["rate_budget"] = SharedRateBudget()
+    elif role in ("all", "frontend"):
+        # Notifications are sent concurrently: keep them under Telegram's rate limit
+        app.bot_data["rate_budget"] = LocalRateBudget()
 
     # Register the global error handler
     app.add_error_handler(global_error_handler)
 
-    # register job to trigger run_update_cycle_and_notify every FRENQUENCY_CHECKING_FOR_UPDATES 
-    app.job_queue.run_repeating(
-        job_update_and_notify,
-        interval=timedelta(minutes=FRENQUENCY_CHECKING_FOR_UPDATES),
-        first=timedelta(seconds=60),
-        name="realtoken_update_and_notify_cycle",
-    )
-    # register job to update users' realtoken owned every FRENQUENCY_WALLET_UPDATE 
-    app.job_queue.run_repeating(
-        job_update_realtoken_owned,
-        interval=timedelta(minutes=FRENQUENCY_WALLET_UPDATE),
-        first=timedelta(seconds=300),
-        name="realtoken_in_wallet_update",
-    )
-    
+    if role in ("all", "frontend"):
+        # Track user activity (group -1: runs before, and independently of, the handlers below)
+        app.add_handler(TypeHandler(Update, track_user_activity), group=-1)
+
+        # Register handlers 
+        app.add_handler(CommandHandler("health", health)) # check if the bot is running
+        app.add_handler(CommandHandler("start", start))
+        app.add_handler(CommandHandler("setlanguage", set_language))
+        app.add_handler(CommandHandler("notification_settings", start_user_notifications_settings))
+        app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_wallet_text))
+
+        # Resgister callback
+        app.add_handler(CallbackQueryHandler(set_language_callback, pattern=r"^lang_.+"))
+        app.add_handler(CallbackQueryHandler(handle_notifications_settings_callback, pattern=f"^{CALLBACK_PREFIX}:"))
+
+        # register job to update users' realtoken owned, one slice of wallets every WALLET_UPDATE_SLICE_INTERVAL
+        # (all wallets are covered once per FRENQUENCY_WALLET_UPDATE)
+        app.job_queue.run_repeating(
+            job_update_realtoken_owned,
+            interval=timedelta(minutes=WALLET_UPDATE_SLICE_INTERVAL),
+            first=timedelta(seconds=300),
+            name="realtoken_in_wallet_update",
+        )
+
+    if role in ("all", "worker"):
+        # register job to trigger run_update_cycle_and_notify every FRENQUENCY_CHECKING_FOR_UPDATES 
+        app.job_queue.run_repeating(
+            job_update_and_notify,
+            interval=timedelta(minutes=FRENQUENCY_CHECKING_FOR_UPDATES),
+            first=first_cycle_delay,
+            name="realtoken_update_and_notify_cycle",
+        )
+
+    if role == "delivery":
+        # register job to deliver the update sets published by the worker to this shard's users
+        app.job_queue.run_repeating(
+            job_deliver_shard_updates,
+            interval=timedelta(seconds=DELIVERY_POLL_INTERVAL),
+            first=timedelta(seconds=1),
+            name="shard_delivery",
+        )
+
+    if role != "frontend":
+        # register job to send the digests of users who opted in, once their period has elapsed
+        app.job_queue.run_repeating(
+            job_flush_digests,
+            interval=timedelta(minutes=DIGEST_FLUSH_CHECK_INTERVAL),
+            first=timedelta(minutes=DIGEST_FLUSH_CHECK_INTERVAL),
+            name="digest_flush",
+        )
+
+    if role in ("worker", "delivery"):
+        # Worker / delivery shard: no Telegram updates to receive, only the jobs
+        name = "worker" if role == "worker" else f"delivery shard {DELIVERY_SHARD_INDEX}/{DELIVERY_SHARDS}"
+        logger.info(f"Starting bot {name}…")
+        print(f"Starting bot {name}…")
+        send_telegram_alert(f"realtoken update alert bot: Starting bot {name}…")
+        asyncio.run(run_application(app))
+        return
+
+    if WEBHOOK_URL:
+        # Webhook mode: Telegram posts the updates to the local webhook server
+        from bot.services.webhook_server import run_webhook
+        logger.info("Starting bot webhook…")
+        print("Starting bot webhook…")
+        send_telegram_alert("realtoken update alert bot: Starting bot webhook…")
+        run_webhook(app)
+        return
+
     logger.info("Starting bot polling…")
     print("Starting bot polling…")
     send_telegram_alert("realtoken update alert bot: Starting bot polling…")
@@ -4,6 +4,10 @@ This package contains reusable services such as:
 - I18n: Translation handling
 - UserManager: User preferences storage and persistence
 - UserPreferences: Data structure for a single user's settings
+- WalletBalanceCache: Shared cache of the realtokens owned by each wallet
+- DigestStore: Pending updates of the users who opted in to a digest
+- Outbox: Notifications queued by the worker for the front-end (split deployment)
+- LocalRateBudget / SharedRateBudget: Telegram rate limit of the notifications, per process or shared by the delivery processes
 """
 
 from .i18n import I18n
@@ -11,11 +15,20 @@ from .user_manager import UserManager
 from .user_preferences import UserPreferences
 from .fetch_json import fetch_json
 from .w3_handler import w3_handler
+from .wallet_balance_cache import WalletBalanceCache
+from .digest_store import DigestStore
+from .outbox import Outbox
+from .rate_budget import LocalRateBudget, SharedRateBudget
 
 __all__ = [
     "I18n",
     "UserManager",
     "UserPreferences",
     "fetch_json",
-    "w3_handler"
+    "w3_handler",
+    "WalletBalanceCache",
+    "DigestStore",
+    "Outbox",
+    "LocalRateBudget",
+    "SharedRateBudget"
 ]
\ No newline at end of file
@@ -0,0 +1,47 @@
+# bot/services/app_lifecycle.py
+from __future__ import annotations
+import asyncio
+import signal
+from typing import Awaitable, Callable, Optional
+
+from telegram.ext import Application
+
+from bot.services.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+Hook = Optional[Callable[[], Awaitable[None]]]
+
+
+async def run_application(app: Application, on_started: Hook = None, on_stopping: Hook = None) -> None:
+    """
+    Run the application until SIGINT/SIGTERM without long polling, mirroring the lifecycle of
+    app.run_polling(): initialize, post_init, start (job queue), ..., stop, shutdown, post_shutdown.
+    `on_started` runs once the application is started (e.g. start a server, register a webhook),
+    `on_stopping` before it is stopped (e.g. finish the updates in progress).
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    await app.initialize()
+    try:
+        if app.post_init:
+            await app.post_init(app)
+        await app.start()
+        if on_started is not None:
+            await on_started()
+        await stop.wait()
+        logger.info("Stop signal received")
+    finally:
+        if on_stopping is not None:
+            await on_stopping()
+        if app.running:
+            await app.stop()
+        await app.shutdown()
+        if app.post_shutdown:
+            await app.post_shutdown(app)
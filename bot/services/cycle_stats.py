@@ -0,0 +1,141 @@
+# bot/services/cycle_stats.py
+from __future__ import annotations
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, Iterator
+
+from bot.config.settings import LOG_DIR, PROFILE_TRIGGER_FILE
+from bot.services.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class StageStats:
+    """Accumulated measurements of one stage of the update cycle."""
+    seconds: float = 0.0
+    calls: int = 0
+    items: int = 0
+    bytes: int = 0
+
+
+class CycleStats:
+    """
+    Per-stage instrumentation of one update cycle (durations, item counts, bytes).
+
+    Usage:
+        stats = CycleStats()
+        with stats.stage("fetch_history") as st:
+            raw = fetch_raw(url)
+            st.bytes += len(raw)
+        logger.info(stats.summary())
+
+    A stage entered several times (e.g. once per user) accumulates its measurements.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.total_seconds = 0.0
+        self.stages: Dict[str, StageStats] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """Time the enclosed block and account it to stage `name`; yields the stage record to fill counts."""
+        st = self.stages.setdefault(name, StageStats())
+        started = time.perf_counter()
+        try:
+            yield st
+        finally:
+            st.seconds += time.perf_counter() - started
+            st.calls += 1
+
+    def finish(self) -> None:
+        """Freeze the total duration of the cycle."""
+        self.total_seconds = time.perf_counter() - self._started
+
+    def summary(self) -> str:
+        """One-line, human readable summary for the logs."""
+        parts = []
+        for name, st in self.stages.items():
+            part = f"{name}={st.seconds * 1000:.0f}ms"
+            if st.calls > 1:
+                part += f" x{st.calls}"
+            if st.items:
+                part += f" items={st.items}"
+            if st.bytes:
+                part += f" bytes={st.bytes}"
+            parts.append(part)
+        return f"total={self.total_seconds * 1000:.0f}ms | " + " | ".join(parts)
+
+    def as_dict(self) -> dict:
+        """Serializable view (e.g. for metrics)."""
+        return {
+            "started_at": self.started_at,
+            "total_seconds": self.total_seconds,
+            "stages": {name: asdict(st) for name, st in self.stages.items()},
+        }
+
+
+@contextmanager
+def profile_cycle_if_requested() -> Iterator[None]:
+    """
+    Opt-in profiling of a single update cycle.
+
+    Create the trigger file (PROFILE_TRIGGER_FILE, in the logs directory) to profile the next cycle.
+    Its content selects the profiler: "cprofile", "tracemalloc" or empty for both.
+    The trigger file is removed and the reports are written to the logs directory:
+      - cycle_profile_<timestamp>.prof (pstats binary) and .txt (top functions by cumulative time)
+      - cycle_tracemalloc_<timestamp>.txt (top allocation sites)
+    Note: cProfile sees everything running on the event loop during the cycle, including handlers.
+    """
+    if not PROFILE_TRIGGER_FILE.exists():
+        yield
+        return
+
+    try:
+        mode = PROFILE_TRIGGER_FILE.read_text(encoding="utf-8").strip().lower()
+        PROFILE_TRIGGER_FILE.unlink()
+    except OSError as e:
+        logger.warning(f"Could not read profiling trigger file {PROFILE_TRIGGER_FILE}: {e}")
+        yield
+        return
+
+    use_cprofile = mode in ("", "cprofile")
+    use_tracemalloc = mode in ("", "tracemalloc") and not tracemalloc.is_tracing()
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    logger.info(f"Profiling this update cycle (cprofile={use_cprofile}, tracemalloc={use_tracemalloc})")
+
+    profiler = cProfile.Profile() if use_cprofile else None
+    if use_tracemalloc:
+        tracemalloc.start(25)
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            prof_path = LOG_DIR / f"cycle_profile_{stamp}.prof"
+            profiler.dump_stats(prof_path)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(40)
+            prof_path.with_suffix(".txt").write_text(out.getvalue(), encoding="utf-8")
+            logger.info(f"cProfile report written to {prof_path}")
+
+        if use_tracemalloc:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines = [f"current={current} bytes peak={peak} bytes", ""]
+            lines += [str(stat) for stat in snapshot.statistics("lineno")[:30]]
+            mem_path = LOG_DIR / f"cycle_tracemalloc_{stamp}.txt"
+            mem_path.write_text("\n".join(lines), encoding="utf-8")
+            logger.info(f"tracemalloc report written to {mem_path}")
@@ -0,0 +1,122 @@
+# bot/services/delivery_shards.py
+from __future__ import annotations
+import gzip
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from bot.config.settings import UPDATE_SETS_DIR, UPDATE_SETS_KEEP
+from bot.services.logging_config import get_logger
+from bot.services.token_catalogue import catalogue_from_json, catalogue_to_json
+
+logger = get_logger(__name__)
+
+UPDATE_SET_VERSION = 1
+UPDATE_SET_SUFFIX = ".json.gz"
+
+
+def shard_of(user_id: int, shard_count: int) -> int:
+    """
+    Delivery shard owning a user: the 64-bit hash space is cut into shard_count equal ranges.
+    Stable across processes and restarts (unlike hash()), and spreads consecutive IDs evenly.
+    """
+    digest = hashlib.blake2b(str(user_id).encode("ascii"), digest_size=8).digest()
+    return (int.from_bytes(digest, "big") * shard_count) >> 64
+
+
+def build_update_set(
+    cycle_id: str,
+    new_history_items_by_uuid: Dict[str, Any],
+    realtoken_data: Dict[str, Any],
+    realtoken_history_data_last: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Everything the delivery shards need to render a cycle's updates (only the updated realtokens)."""
+    uuids = new_history_items_by_uuid.keys()
+    return {
+        "version": UPDATE_SET_VERSION,
+        "cycle_id": cycle_id,
+        "published_at": int(time.time()),
+        "new_history_items_by_uuid": new_history_items_by_uuid,
+        "realtokens": catalogue_to_json({uuid: realtoken_data[uuid] for uuid in uuids if uuid in realtoken_data}),
+        "realtoken_history_last": {uuid: realtoken_history_data_last[uuid] for uuid in uuids if uuid in realtoken_history_data_last},
+    }
+
+
+def _path(seq: int, directory: Path) -> Path:
+    return directory / f"{seq:015d}{UPDATE_SET_SUFFIX}"
+
+
+def list_update_sets(after_seq: int = 0, directory: Path = UPDATE_SETS_DIR) -> List[int]:
+    """Sequence numbers of the published update sets newer than after_seq, oldest first."""
+    seqs = []
+    for path in directory.glob(f"*{UPDATE_SET_SUFFIX}"):
+        try:
+            seq = int(path.name[: -len(UPDATE_SET_SUFFIX)])
+        except ValueError:
+            continue
+        if seq > after_seq:
+            seqs.append(seq)
+    return sorted(seqs)
+
+
+def publish_update_set(update_set: Dict[str, Any], directory: Path = UPDATE_SETS_DIR, keep: int = UPDATE_SETS_KEEP) -> int:
+    """
+    Write a cycle's update set for the delivery shards (atomic write) and prune the oldest ones
+    beyond `keep`. Returns its sequence number (epoch in ms, strictly increasing).
+    Blocking: call it through asyncio.to_thread from async code.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    existing = list_update_sets(0, directory)
+    seq = max(time.time_ns() // 1_000_000, existing[-1] + 1 if existing else 0)
+
+    path = _path(seq, directory)
+    tmp_path = path.with_name(path.name + ".tmp")  # not matched by list_update_sets()
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(update_set, f, ensure_ascii=False, separators=(",", ":"))
+    tmp_path.replace(path)
+
+    for old_seq in existing[: max(0, len(existing) + 1 - keep)]:
+        _path(old_seq, directory).unlink(missing_ok=True)
+
+    logger.info(f"Update set {seq} published: {len(update_set['new_history_items_by_uuid'])} realtoken(s) updated")
+    return seq
+
+
+def load_update_set(seq: int, directory: Path = UPDATE_SETS_DIR) -> Optional[Dict[str, Any]]:
+    """Load a published update set. Returns None if it is gone (pruned) or cannot be used."""
+    path = _path(seq, directory)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            update_set = json.load(f)
+    except (OSError, EOFError, json.JSONDecodeError) as e:
+        logger.warning(f"Update set {path} could not be read, skipping it: {e}")
+        return None
+
+    if not isinstance(update_set, dict) or update_set.get("version") != UPDATE_SET_VERSION:
+        logger.warning(f"Update set {path} has an unexpected format, skipping it")
+        return None
+    update_set["realtokens"] = catalogue_from_json(update_set["realtokens"])
+    return update_set
+
+
+def _cursor_path(shard_index: int, directory: Path) -> Path:
+    return directory / f"shard_{shard_index}.cursor"
+
+
+def read_shard_cursor(shard_index: int, directory: Path = UPDATE_SETS_DIR) -> Optional[int]:
+    """Sequence number of the last update set handled by a delivery shard, None if it never ran."""
+    try:
+        return int(_cursor_path(shard_index, directory).read_text(encoding="ascii").strip())
+    except (OSError, ValueError):
+        return None
+
+
+def write_shard_cursor(shard_index: int, seq: int, directory: Path = UPDATE_SETS_DIR) -> None:
+    """Record that a delivery shard handled the update sets up to seq (atomic write)."""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = _cursor_path(shard_index, directory)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(str(seq), encoding="ascii")
+    tmp_path.replace(path)
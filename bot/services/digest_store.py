@@ -0,0 +1,165 @@
+# bot/services/digest_store.py
+from __future__ import annotations
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from bot.config.settings import DIGEST_PENDING_PATH
+from bot.services.logging_config import get_logger
+from bot.services.token_catalogue import TokenCatalogue, catalogue_to_json
+
+logger = get_logger(__name__)
+
+LinesMessage = Dict[str, Any]  # one item of build_lines_messages(): uuid, header_line, <field>_line...
+# The updates of a realtoken pending in a digest, as JSON:
+# - "items": the new history items of the period, oldest first;
+# - "baseline": the realtoken's history record before the first of them (see compact_history_record);
+# - "token": the realtoken's catalogue entry (catalogue_to_json() form), None if unknown.
+PendingUpdate = Dict[str, Any]
+
+
+def compact_history_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Keep only the history entries holding the first or the latest value of a field: the ones
+    get_first_value_for_key() / get_latest_value_for_key() read, so they return the same values.
+    """
+    history = sorted(record.get("history") or [], key=lambda h: h.get("date") or "", reverse=True)
+    kept = set()
+    for entries in (history, history[::-1]):  # latest value of each field, then first value
+        seen = set()
+        for entry in entries:
+            new_keys = (entry.get("values") or {}).keys() - seen
+            if new_keys:
+                kept.add(id(entry))
+                seen.update(new_keys)
+    return {**record, "history": [entry for entry in record.get("history") or [] if id(entry) in kept]}
+
+
+def pending_updates(new_history_items_by_uuid: Dict[str, Any], realtoken_data: TokenCatalogue,
+                    realtoken_history_data_last: Dict[str, Any]) -> Dict[str, PendingUpdate]:
+    """The updates of a cycle in DigestStore form, built once for all the digest users."""
+    return {
+        uuid: {
+            "items": list(items),
+            "baseline": compact_history_record(realtoken_history_data_last[uuid]),
+            "token": catalogue_to_json({uuid: realtoken_data[uuid]})[uuid] if uuid in realtoken_data else None,
+        }
+        for uuid, items in new_history_items_by_uuid.items()
+    }
+
+
+def merge_pending_update(previous: PendingUpdate, new: PendingUpdate) -> PendingUpdate:
+    """
+    Merge two updates of the same realtoken: the items are appended and the baseline of the
+    first one is kept, so the digest shows the change over the whole period (first old value
+    -> last new value). The most recent catalogue entry wins.
+    """
+    return {
+        "items": previous["items"] + new["items"],
+        "baseline": previous["baseline"],
+        "token": new["token"] or previous["token"],
+    }
+
+
+class DigestStore:
+    """
+    Pending updates of the users who opted in to a digest (see UserPreferences.digest).
+
+    Each update cycle adds its raw updates (see pending_updates) for every digest user, merged
+    per realtoken uuid; the digest job pops them once the user's period has elapsed since the
+    first pending update, renders them in the user's current language, filters them with the
+    user's current settings and sends one consolidated message.
+    Persisted to a JSON file so pending digests survive a restart.
+    """
+
+    def __init__(self, json_path: Path = DIGEST_PENDING_PATH):
+        self.json_path = json_path
+        self.pending: Dict[int, Dict[str, PendingUpdate]] = {}  # user_id -> uuid -> pending update
+        self.pending_since: Dict[int, float] = {}                # user_id -> epoch of the first pending update
+        self._lock = threading.Lock()
+        # The update cycle and the digest job may save concurrently: _version orders the writes
+        self._file_lock = threading.Lock()
+        self._version = 0
+        self._saved_version = 0
+        self.load_from_file()
+
+    def add(self, user_id: int, updates: Dict[str, PendingUpdate], now: Optional[float] = None) -> None:
+        """Queue a cycle's updates (see pending_updates) for a user, merged with the ones already pending."""
+        if not updates:
+            return
+        with self._lock:
+            by_uuid = self.pending.setdefault(user_id, {})
+            self.pending_since.setdefault(user_id, time.time() if now is None else now)
+            for uuid, update in updates.items():
+                previous = by_uuid.get(uuid)
+                by_uuid[uuid] = update if previous is None else merge_pending_update(previous, update)
+
+    def due_users(self, period_minutes_by_user: Dict[int, Optional[int]], now: Optional[float] = None) -> List[int]:
+        """
+        Return the users whose digest must be sent now.
+        A user missing from period_minutes_by_user, or with a None period (digest turned off), is due at once.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            due = []
+            for user_id, since in self.pending_since.items():
+                period = period_minutes_by_user.get(user_id)
+                if period is None or now - since >= period * 60:
+                    due.append(user_id)
+            return due
+
+    def pop(self, user_id: int) -> Dict[str, PendingUpdate]:
+        """Remove and return the pending updates of a user, by uuid (in the order they were first queued)."""
+        with self._lock:
+            self.pending_since.pop(user_id, None)
+            return self.pending.pop(user_id, {})
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.pending)
+
+    # --- Persistence -----------------------------------------------------------
+
+    def load_from_file(self) -> None:
+        """Load the pending digests saved by save_to_file() (a missing or unreadable file means none)."""
+        if not self.json_path.exists():
+            return
+        try:
+            with open(self.json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Files saved by older versions hold rendered lines (LinesMessage): kept under their own key, sent as is
+            pending = {
+                int(user_id): {(key if "items" in update else f"{key}:rendered"): update for key, update in by_uuid.items()}
+                for user_id, by_uuid in data["pending"].items()
+            }
+            pending_since = {int(user_id): float(since) for user_id, since in data["pending_since"].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Pending digests {self.json_path} could not be read, ignoring them: {e}")
+            return
+
+        with self._lock:
+            self.pending = pending
+            self.pending_since = pending_since
+        logger.info(f"{len(pending)} pending digest(s) loaded from {self.json_path}")
+
+    def save_to_file(self) -> None:
+        """Persist the pending digests (atomic write). Blocking: call it through asyncio.to_thread from async code."""
+        with self._lock:
+            content = json.dumps({
+                "pending": {str(user_id): by_uuid for user_id, by_uuid in self.pending.items()},
+                "pending_since": {str(user_id): since for user_id, since in self.pending_since.items()},
+            }, ensure_ascii=False)
+            self._version += 1
+            version = self._version
+
+        with self._file_lock:
+            if version < self._saved_version:
+                return  # a newer state has already been written
+            self.json_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.json_path.with_suffix(self.json_path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            tmp_path.replace(self.json_path)
+            self._saved_version = version
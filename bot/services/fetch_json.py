@@ -1,11 +1,23 @@
+import json
 import requests, time
-from typing import Any, Optional
+from typing import Any, NamedTuple, Optional
 from bot.services.logging_config import get_logger
 from bot.services.send_telegram_alert import send_telegram_alert
 logger = get_logger(__name__)
 
-def fetch_json(url: str, timeout: int = 20) -> Optional[Any]:
-    """Fetch JSON with basic cache-busting to avoid stale CDN responses."""
+class FetchResult(NamedTuple):
+    """Result of fetch_raw_conditional()."""
+    content: Optional[bytes]            # None if the request failed or the resource is not modified
+    etag: Optional[str] = None          # validators of the response, for the next conditional request
+    last_modified: Optional[str] = None
+    not_modified: bool = False          # 304: unchanged since the validators sent
+
+def fetch_raw_conditional(url: str, etag: Optional[str] = None, last_modified: Optional[str] = None, timeout: int = 20) -> FetchResult:
+    """
+    Fetch a JSON endpoint as raw bytes, with basic cache-busting to avoid stale CDN responses.
+    With the validators of a previous response (conditional GET), an unchanged resource is
+    answered with 304 Not Modified and no payload.
+    """
     try:
         headers = {
             "Cache-Control": "no-cache",
@@ -13,11 +25,36 @@ def fetch_json(url: str, timeout: int = 20) -> Optional[Any]:
             "Accept": "application/json",
             "User-Agent": "RealtokenUpdateAlertsBot/1.0",
         }
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
         params = {"_": str(int(time.time()))}  # cache-buster
         resp = requests.get(url, headers=headers, params=params, timeout=timeout)
+        if resp.status_code == 304:
+            return FetchResult(None, etag, last_modified, not_modified=True)
         resp.raise_for_status()
-        return resp.json()
+        return FetchResult(resp.content, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
     except requests.RequestException as e:
         logger.warning("Failed to fetch JSON from %s: %s", url, e)
         send_telegram_alert(f"realtoken update alert bot: Failed to fetch JSON from {url}: {e}")
+        return FetchResult(None)
+
+def fetch_raw(url: str, timeout: int = 20) -> Optional[bytes]:
+    """Fetch a JSON endpoint as raw bytes, with basic cache-busting to avoid stale CDN responses."""
+    return fetch_raw_conditional(url, timeout=timeout).content
+
+def parse_json(raw: Optional[bytes], url: str = "") -> Optional[Any]:
+    """Parse a payload returned by fetch_raw(). Returns None if there is no payload or if it is not valid JSON."""
+    if raw is None:
         return None
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        logger.warning("Invalid JSON received from %s: %s", url, e)
+        send_telegram_alert(f"realtoken update alert bot: Invalid JSON received from {url}: {e}")
+        return None
+
+def fetch_json(url: str, timeout: int = 20) -> Optional[Any]:
+    """Fetch JSON with basic cache-busting to avoid stale CDN responses."""
+    return parse_json(fetch_raw(url, timeout=timeout), url)
@@ -0,0 +1,81 @@
+# bot/services/history_snapshot.py
+from __future__ import annotations
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from bot.config.settings import HISTORY_SNAPSHOT_PATH
+from bot.services.logging_config import get_logger
+from bot.services.token_catalogue import catalogue_from_json, catalogue_to_json
+
+logger = get_logger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def save_history_snapshot(
+    realtoken_data: Dict[str, Any],
+    realtoken_history_data: Dict[str, Any],
+    realtoken_history_state: Dict[str, Dict[str, Any]],
+    realtokens_meta: Optional[Dict[str, Any]] = None,
+    path: Path = HISTORY_SNAPSHOT_PATH,
+) -> None:
+    """
+    Persist the last realtoken catalogue (with its download time and validators), history and history
+    state to a gzip-compressed JSON file (atomic write), so that the next start can diff against them.
+    Blocking: call it through asyncio.to_thread from async code.
+    """
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": int(time.time()),
+        "realtokens": catalogue_to_json(realtoken_data),
+        "realtokens_meta": realtokens_meta or {},  # download time and validators (see refresh_token_catalogue)
+        "realtoken_history": realtoken_history_data,
+        "realtoken_history_state": realtoken_history_state,
+    }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+    tmp_path.replace(path)
+
+    logger.info(f"History snapshot saved to {path} ({path.stat().st_size} bytes)")
+
+
+def load_history_snapshot(path: Path = HISTORY_SNAPSHOT_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Load the snapshot written by save_history_snapshot().
+    Returns None if there is no snapshot or if it cannot be used (corrupted, other version).
+    """
+    if not path.exists():
+        return None
+
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, EOFError, json.JSONDecodeError) as e:
+        logger.warning(f"History snapshot {path} could not be read, ignoring it: {e}")
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        logger.warning(f"History snapshot {path} has an unexpected format, ignoring it")
+        return None
+
+    if not all(isinstance(snapshot.get(key), dict) for key in ("realtokens", "realtoken_history", "realtoken_history_state")):
+        logger.warning(f"History snapshot {path} is incomplete, ignoring it")
+        return None
+
+    snapshot["realtokens"] = catalogue_from_json(snapshot["realtokens"])
+    logger.info(f"History snapshot loaded from {path} (saved at {snapshot.get('saved_at')})")
+    return snapshot
+
+
+def history_snapshot_mtime(path: Path = HISTORY_SNAPSHOT_PATH) -> Optional[int]:
+    """Modification time (ns) of the snapshot, None if there is none: used to reload it only when it changed."""
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
@@ -1,20 +1,46 @@
 # bot/services/i18n.py
 from __future__ import annotations
 import json
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from bot.config.settings import TRANSLATIONS_PATH, DEFAULT_LANGUAGE
 
 
+class Translator:
+    """
+    Translations of one language, bound once: translate(key, **fmt).
+    The default-language fallback is already merged in, so a lookup is a single dict access,
+    and str.format only runs when there is something to format.
+    """
+
+    __slots__ = ("language", "_templates")
+
+    def __init__(self, language: str, templates: Dict[str, str]):
+        self.language = language
+        self._templates = templates
+
+    def __call__(self, key: str, **fmt: Any) -> str:
+        try:
+            text = self._templates[key]
+        except KeyError:
+            # Not found anywhere -> raise
+            raise KeyError(
+                f"Missing translation for key='{key}' in lang='{self.language}' "
+                f"and in default='{DEFAULT_LANGUAGE}'"
+            ) from None
+        return text.format_map(fmt) if fmt else text
+
+
 class I18n:
     """Loads translations and resolves keys by language with default-language fallback."""
 
     def __init__(self):
         self._translations: Dict[str, Dict[str, str]] = {}
+        self._translators: Dict[str, Translator] = {}
         self._load()
 
     def _load(self) -> None:
-        """Load the translations JSON into memory."""
+        """Load the translations JSON into memory and build one translator per language."""
         if not TRANSLATIONS_PATH.exists():
             raise FileNotFoundError(f"Translations file not found at {TRANSLATIONS_PATH}")
 
@@ -30,41 +56,43 @@ class I18n:
         # Expected shape: { "English": { "KEY": "text" }, "Français": { ... } }
         self._translations = data
 
+        # Each language's keys over the default language's ones (missing keys fall back)
+        default_map = data.get(DEFAULT_LANGUAGE, {})
+        self._translators = {
+            language: Translator(language, {**default_map, **lang_map})
+            for language, lang_map in data.items()
+        }
+        if DEFAULT_LANGUAGE not in self._translators:
+            self._translators[DEFAULT_LANGUAGE] = Translator(DEFAULT_LANGUAGE, dict(default_map))
+
+    @property
+    def languages(self) -> List[str]:
+        """Languages available in the translations file."""
+        return list(self._translations.keys())
+
+    def translator(self, lang: Optional[str] = None) -> Translator:
+        """
+        Bound translator for a language (the default language if unknown or None).
+        Resolve it once per request / user and call it for every string.
+        """
+        translator = self._translators.get(lang or DEFAULT_LANGUAGE)
+        return translator if translator is not None else self._translators[DEFAULT_LANGUAGE]
+
+    def translator_for_user(self, user_id: int, user_manager) -> Translator:
+        """Bound translator for a user's language (never creates the user, see UserManager.get_language)."""
+        return self.translator(user_manager.get_language(user_id))
+
     def translate(self, key: str, lang: Optional[str] = None, **fmt: Any) -> str:
         """
         Translate a key using the provided language, falling back to the default language.
         Raises KeyError if the key does not exist in the target language nor in the default language.
         """
-        language = lang or DEFAULT_LANGUAGE
-        text = self._resolve_key(key, language)
-        return text.format(**fmt) if fmt else text
+        return self.translator(lang)(key, **fmt)
 
     def translate_for_user(self, key: str, user_id: int, user_manager, **fmt: Any) -> str:
         """
         Translate a key using a user's language obtained from UserManager.
-        Falls back to the default language if the key is missing in the user's language.
+        Prefer translator_for_user() when translating several strings for the same user.
         Raises KeyError if the key is missing everywhere.
         """
-        prefs = user_manager.get_user(user_id)
-        return self.translate(key, prefs.language, **fmt)
-
-    def _resolve_key(self, key: str, lang: str) -> str:
-        """
-        Return the translation for `key` in `lang`, or fallback to DEFAULT_LANGUAGE.
-        Raise KeyError if the key is not present in either.
-        """
-        # Try the requested language first
-        lang_map = self._translations.get(lang, {})
-        if key in lang_map:
-            return lang_map[key]
-
-        # Fallback to default language
-        default_map = self._translations.get(DEFAULT_LANGUAGE, {})
-        if key in default_map:
-            return default_map[key]
-
-        # Not found anywhere -> raise
-        raise KeyError(
-            f"Missing translation for key='{key}' in lang='{lang}' "
-            f"and in default='{DEFAULT_LANGUAGE}'"
-        )
+        return self.translator_for_user(user_id, user_manager)(key, **fmt)
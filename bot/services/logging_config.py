@@ -1,9 +1,15 @@
 # logging_config.py
 from __future__ import annotations
+import atexit
+import contextvars
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from bot.config.settings import LOG_DIR
+from bot.config.settings import LOG_DIR, LOG_JSON
 
 # --- Toggle Development Mode -------------------------------------------------
 # Set this variable to True to also show INFO and WARNING logs in the console.
@@ -14,19 +20,65 @@ DEVELOPMENT = False
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 log_file = LOG_DIR / "realtoken-update-alerts-bot.log"
 
+# --- Correlation ID ----------------------------------------------------------
+# Set for the duration of an update cycle (see bot.core.run_update_cycle_and_notify), every
+# record logged meanwhile - including from worker threads started with asyncio.to_thread,
+# which copy the context - carries it.
+cycle_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("cycle_id", default=None)
+
+
+class CycleIdFilter(logging.Filter):
+    """Attach the current cycle ID to the record (captured in the thread that logs)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        cycle_id = cycle_id_var.get()
+        record.cycle_id = cycle_id
+        record.cycle_tag = f"[cycle {cycle_id}] " if cycle_id else ""
+        return True
+
+
 # --- Formatters --------------------------------------------------------------
-LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(cycle_tag)s%(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, cycle_id, message (+ exc_info)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "cycle_id": getattr(record, "cycle_id", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
 formatter = logging.Formatter(LOG_FORMAT)
 
+# --- Child processes ---------------------------------------------------------
+# The render pool processes (spawned, see bot.core.render_pool) import this module too, before
+# multiprocessing tells them apart: the bot process sets CHILD_PROCESS_ENV in the environment
+# they inherit. Only the bot process writes and rotates the log file: a child logs errors to
+# the console only (its rendering failures are returned to the bot process, which logs them).
+CHILD_PROCESS_ENV = "BOT_LOGGING_CHILD_PROCESS"
+IS_CHILD_PROCESS = os.environ.get(CHILD_PROCESS_ENV) == "1"
+
 # --- File handler (always on, INFO/WARNING/ERROR) ----------------------------
-file_handler = RotatingFileHandler(
+file_handler = None if IS_CHILD_PROCESS else RotatingFileHandler(
     log_file,
     maxBytes=3 * 1024 * 1024,  # 3 MB
     backupCount=10,
     encoding="utf-8",
 )
-file_handler.setLevel(logging.INFO)  # File captures INFO and above
-file_handler.setFormatter(formatter)
+if file_handler is not None:
+    file_handler.setLevel(logging.INFO)  # File captures INFO and above
+    file_handler.setFormatter(JsonFormatter() if LOG_JSON else formatter)
 
 # --- Console handler for ERROR (always on) -----------------------------------
 console_errors = logging.StreamHandler()
@@ -38,16 +90,39 @@ console_dev = logging.StreamHandler()
 console_dev.setLevel(logging.INFO)  # Show INFO and above (INFO/WARNING/ERROR)
 console_dev.setFormatter(formatter)
 
-# --- Root logger setup -------------------------------------------------------
-handlers = [file_handler, console_errors]
+handlers = [console_errors] if file_handler is None else [file_handler, console_errors]
 
 if DEVELOPMENT:
     # Add dev console handler only when DEVELOPMENT mode is enabled
     handlers.append(console_dev)
 
+
+# --- Queue pipeline ----------------------------------------------------------
+# The root logger only puts records on a queue; the file I/O, rotation and console output
+# run in the QueueListener thread, so logging never blocks the event loop.
+class _RecordQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the default prepare(), keep exc_info/stack_info so that the listener's
+        # formatters (text or JSON) render them; only merge the arguments into the message
+        # (they may not be picklable/thread-safe to format later).
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = _RecordQueueHandler(log_queue)
+queue_handler.addFilter(CycleIdFilter())
+
+listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)  # drain the queue before the process exits
+
+# --- Root logger setup -------------------------------------------------------
 logging.basicConfig(
     level=logging.INFO,
-    handlers=handlers,
+    handlers=[queue_handler],
 )
 
 def get_logger(name: str) -> logging.Logger:
@@ -59,6 +134,8 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 
 # Log that the config is initialized
 get_logger(__name__).info(
-    "Logging initialized: file=INFO+, console=ERROR"
+    "Logging initialized: file=INFO+"
+    + (" (JSON)" if LOG_JSON else "")
+    + ", console=ERROR"
     + ("+INFO/WARNING (DEV MODE)" if DEVELOPMENT else "")
-)
\ No newline at end of file
+)
@@ -0,0 +1,91 @@
+# bot/services/loop_monitor.py
+from __future__ import annotations
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from bot.config.settings import LOOP_LAG_INTERVAL, LOOP_LAG_WARNING_THRESHOLD
+from bot.services.logging_config import get_logger
+from bot.services.metrics import EVENT_LOOP_LAG, EVENT_LOOP_LAG_LAST, EVENT_LOOP_STALLS
+
+logger = get_logger(__name__)
+
+
+class EventLoopWatchdog:
+    """
+    Background thread detecting event loop stalls while they happen.
+
+    The lag monitor task calls beat() every LOOP_LAG_INTERVAL seconds. If no beat arrives
+    for longer than interval + threshold, the loop is blocked: the watchdog captures the
+    current stack of the event loop thread (i.e. the blocking code) and logs it once per stall.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, threshold: float = LOOP_LAG_WARNING_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._reported_heartbeat: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start watching the event loop of the calling thread (call it from the loop)."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="event-loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def beat(self) -> bool:
+        """
+        Called from the event loop: the loop is alive.
+        Returns True if the watchdog reported the stall that ended with this beat.
+        """
+        reported = self._reported_heartbeat == self._heartbeat
+        self._heartbeat = time.monotonic()
+        return reported
+
+    def _run(self) -> None:
+        check_every = max(0.05, self.threshold / 2)
+        while not self._stop.wait(check_every):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.threshold or self._reported_heartbeat == heartbeat:
+                continue
+
+            self._reported_heartbeat = heartbeat
+            EVENT_LOOP_STALLS.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<no frame>"
+            logger.warning(
+                f"Event loop blocked for more than {stalled:.2f}s. Stack of the blocking code:\n{stack}"
+            )
+
+
+async def monitor_event_loop_lag(
+    interval: float = LOOP_LAG_INTERVAL,
+    watchdog: Optional[EventLoopWatchdog] = None,
+) -> None:
+    """
+    Measure the event loop lag forever: sleep `interval` seconds and record how late the wake-up is.
+    A large lag means a coroutine blocked the loop (synchronous I/O, heavy CPU work).
+    Start it with app.create_task(); it stops when cancelled.
+    """
+    while True:
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - expected)
+        EVENT_LOOP_LAG.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
+        reported = watchdog.beat() if watchdog is not None else False
+        if lag >= LOOP_LAG_WARNING_THRESHOLD:
+            # Stall already reported by the watchdog (with the stack): don't warn twice.
+            # The watchdog checks periodically, so it may miss stalls just above the threshold.
+            logger.log(logging.DEBUG if reported else logging.WARNING, f"Event loop lag: {lag:.2f}s")
@@ -0,0 +1,43 @@
+# bot/services/markdown_v2.py
+"""
+Escaping for Telegram's MarkdownV2 parse mode (https://core.telegram.org/bots/api#markdownv2-style).
+
+Outside of entities, each of the characters _ * [ ] ( ) ~ ` > # + - = | { } . ! and the backslash
+itself must be preceded by a backslash. The (character, escaped) tables are built once at import
+and applied with str.replace, skipping the characters the text does not contain: on the short,
+mostly non-ASCII texts sent by the bot (emojis, arrows) this is several times faster than
+str.translate, which maps non-ASCII strings character by character.
+"""
+from __future__ import annotations
+from typing import Tuple
+
+MARKDOWN_V2_SPECIAL_CHARS = "_*[]()~`>#+-=|{}.!"
+
+# The backslash comes first: the ones added by the other escapes must not be escaped again
+_ESCAPE_ALL: Tuple[Tuple[str, str], ...] = tuple((ch, "\\" + ch) for ch in "\\" + MARKDOWN_V2_SPECIAL_CHARS)
+
+# The notification templates already hold their formatting (*bold*, __underline__):
+# only the punctuation coming from the values and plain text is escaped
+_ESCAPE_PUNCTUATION: Tuple[Tuple[str, str], ...] = tuple((ch, "\\" + ch) for ch in "().")
+
+
+def _escape(text: str, table: Tuple[Tuple[str, str], ...]) -> str:
+    for ch, escaped in table:
+        if ch in text:
+            text = text.replace(ch, escaped)
+    return text
+
+
+def escape_markdown_v2(text) -> str:
+    """Escape every MarkdownV2 special character: the text is shown as is, without formatting."""
+    return _escape(str(text), _ESCAPE_ALL)
+
+
+def escape_markdown_punctuation(text: str) -> str:
+    """Escape ( ) and . only, keeping the MarkdownV2 formatting of a rendered notification line."""
+    return _escape(text, _ESCAPE_PUNCTUATION)
+
+
+def escape_markdown_v2_url(url: str) -> str:
+    """Escape the URL of an inline link [text](url): inside the parentheses, only ) and the backslash are escaped."""
+    return url.replace("\\", "\\\\").replace(")", "\\)")
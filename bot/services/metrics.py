@@ -0,0 +1,198 @@
+# bot/services/metrics.py
+"""
+Minimal in-process metrics registry rendered in the Prometheus text exposition format.
+No external dependency; thread-safe (RPC calls are recorded from worker threads).
+"""
+from __future__ import annotations
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter."""
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def replace(self, values: Dict[LabelValues, float]) -> None:
+        """Replace every series at once (for gauges computed at scrape time)."""
+        with self._lock:
+            self._values = dict(values)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets."""
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float], labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[LabelValues, Tuple[List[int], float, int]] = {}  # counts per bucket, sum, count
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._series.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._series[key] = (counts, total + value, count + 1)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s, n)) for k, (c, s, n) in self._series.items())
+        lines = self._header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the metrics and the collectors refreshing scrape-time gauges."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, buckets: Iterable[float], labelnames: Sequence[str] = ()) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets, labelnames))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callable run before each rendering (e.g. to set gauges from the app state)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# --- Metrics -----------------------------------------------------------------
+
+CYCLE_DURATION = REGISTRY.histogram(
+    "realtoken_bot_cycle_duration_seconds", "Duration of the update cycles.",
+    buckets=(1, 2, 5, 10, 30, 60, 120, 300, 600, 1800),
+)
+CYCLE_STAGE_SECONDS = REGISTRY.gauge(
+    "realtoken_bot_cycle_stage_seconds", "Duration of each stage of the last update cycle.", ("stage",),
+)
+MESSAGES = REGISTRY.counter(
+    "realtoken_bot_messages_total", "Update messages by delivery status (sent, failed, blocked, retried).", ("status",),
+)
+RPC_DURATION = REGISTRY.histogram(
+    "realtoken_bot_rpc_duration_seconds", "Duration of the RPC calls per endpoint (successful and failed).",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30), labelnames=("endpoint",),
+)
+RPC_ERRORS = REGISTRY.counter(
+    "realtoken_bot_rpc_errors_total", "Failed RPC calls per endpoint.", ("endpoint",),
+)
+RPC_COOLDOWN_SECONDS = REGISTRY.gauge(
+    "realtoken_bot_rpc_cooldown_remaining_seconds", "Remaining cooldown of each RPC endpoint (0 = available).", ("endpoint",),
+)
+USERS = REGISTRY.gauge(
+    "realtoken_bot_users", "Number of users by token scope (\"blocked\" for users who blocked the bot).", ("scope",),
+)
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "realtoken_bot_event_loop_lag_seconds", "Event loop lag (delay of a periodic wake-up).",
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+EVENT_LOOP_LAG_LAST = REGISTRY.gauge(
+    "realtoken_bot_event_loop_lag_last_seconds", "Last measured event loop lag.",
+)
+EVENT_LOOP_STALLS = REGISTRY.counter(
+    "realtoken_bot_event_loop_stalls_total", "Event loop stalls longer than LOOP_LAG_WARNING_THRESHOLD.",
+)
@@ -0,0 +1,92 @@
+# bot/services/metrics_server.py
+from __future__ import annotations
+import asyncio
+from typing import Optional
+
+from telegram.ext import Application
+
+from bot.config.settings import METRICS_HOST, METRICS_PORT
+from bot.services.logging_config import get_logger
+from bot.services.metrics import REGISTRY, CYCLE_STAGE_SECONDS, RPC_COOLDOWN_SECONDS, USERS
+
+logger = get_logger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _register_app_collectors(app: Application) -> None:
+    """Gauges computed from the application state at scrape time."""
+
+    def collect_users() -> None:
+        user_manager = app.bot_data.get("user_manager")
+        if user_manager is None:
+            return
+        counts = {"all": 0, "wallet": 0, "blocked": 0}
+        for prefs in user_manager.users_snapshot().values():
+            mode = "blocked" if prefs.is_blocked() else (prefs.token_scope or {}).get("mode", "all")
+            counts[mode] = counts.get(mode, 0) + 1
+        USERS.replace({(mode,): n for mode, n in counts.items()})
+
+    def collect_last_cycle() -> None:
+        stats = app.bot_data.get("last_cycle_stats")
+        if stats is None:
+            return
+        CYCLE_STAGE_SECONDS.replace({(name, ): st.seconds for name, st in stats.stages.items()})
+
+    def collect_rpc_cooldowns() -> None:
+        try:
+            from bot.services.w3_handler import get_rpc_cooldowns, rpc_endpoint_label
+            cooldowns = get_rpc_cooldowns()
+        except RuntimeError:
+            return  # RPC_URLS not configured
+        RPC_COOLDOWN_SECONDS.replace({(rpc_endpoint_label(url),): left for url, left in cooldowns.items()})
+
+    REGISTRY.add_collector(collect_users)
+    REGISTRY.add_collector(collect_last_cycle)
+    REGISTRY.add_collector(collect_rpc_cooldowns)
+
+
+async def _handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Serve a single HTTP/1.0-style request: GET /metrics, anything else is 404."""
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        # Drain headers
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout=5)
+            if line in (b"\r\n", b"\n", b""):
+                break
+
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+            try:
+                status, body, content_type = "200 OK", REGISTRY.render().encode("utf-8"), CONTENT_TYPE
+            except Exception as e:
+                # A failing collector must not leave the scraper without an answer
+                logger.exception("Failed to render the metrics: %s", e)
+                status, body, content_type = "500 Internal Server Error", b"Internal Server Error\n", "text/plain"
+        else:
+            status, body, content_type = "404 Not Found", b"Not Found\n", "text/plain"
+
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError) as e:
+        logger.debug(f"Metrics connection dropped: {e}")
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(app: Application, host: str = METRICS_HOST, port: int = METRICS_PORT) -> Optional[asyncio.AbstractServer]:
+    """
+    Start the local Prometheus endpoint (http://host:port/metrics) on the running event loop.
+    Disabled (returns None) when port is 0.
+    """
+    if not port:
+        return None
+
+    _register_app_collectors(app)
+    server = await asyncio.start_server(_handle_connection, host, port)
+    logger.info(f"Metrics endpoint listening on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,31 @@
+import logging
+import asyncio
+import time
+from telegram.ext import Application
+from bot.services.warm_up import warm_up_balance_stack
+from bot.services.loop_monitor import monitor_event_loop_lag, EventLoopWatchdog
+from bot.services.metrics_server import start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+async def on_post_init(app: Application) -> None:
+    started = app.bot_data.get("startup_started_at")
+    if started is not None:
+        # Time from process start (bot.main import) to the first getUpdates call
+        logger.info(f"Startup completed: time-to-first-poll {time.perf_counter() - started:.2f}s")
+
+    role = app.bot_data.get("role", "all")
+    if role in ("all", "frontend"):
+        # Load web3 / ABIs in the background instead of blocking startup
+        app.create_task(asyncio.to_thread(warm_up_balance_stack), name="balance_stack_warm_up")
+    if role == "frontend":
+        # Deliver the notifications queued by the worker process
+        from bot.core.drain_outbox import drain_outbox
+        app.create_task(drain_outbox(app), name="outbox_drain")
+
+    # Event loop lag measurement, blocking-call watchdog + local metrics endpoint (if METRICS_PORT is set)
+    watchdog = EventLoopWatchdog()
+    watchdog.start()
+    app.bot_data["event_loop_watchdog"] = watchdog
+    app.create_task(monitor_event_loop_lag(watchdog=watchdog), name="event_loop_lag_monitor")
+    app.bot_data["metrics_server"] = await start_metrics_server(app)
@@ -1,13 +1,24 @@
 import logging
 import asyncio
 from telegram.ext import Application
-from bot.services.send_telegram_alert import send_telegram_alert
+from bot.services.send_telegram_alert import send_telegram_alert, flush_telegram_alerts
+from bot.core.render_pool import shutdown_render_pool
 
 logger = logging.getLogger(__name__)
 
 async def on_post_shutdown(app: Application) -> None:
-    logger.info("PTB app stopped -> sending shutdown alert (sync wrapper)")
-    await asyncio.to_thread(
-        send_telegram_alert,
-        "Realtoken Update Alerts bot: Telegram bot stopped."
-    )
\ No newline at end of file
+    watchdog = app.bot_data.get("event_loop_watchdog")
+    if watchdog is not None:
+        watchdog.stop()
+
+    metrics_server = app.bot_data.get("metrics_server")
+    if metrics_server is not None:
+        metrics_server.close()
+        await metrics_server.wait_closed()
+
+    shutdown_render_pool(app)
+
+    logger.info("PTB app stopped -> sending shutdown alert")
+    send_telegram_alert("Realtoken Update Alerts bot: Telegram bot stopped.")
+    # Alerts are sent in the background: make sure the pending ones leave before exit
+    await asyncio.to_thread(flush_telegram_alerts)
@@ -0,0 +1,103 @@
+# bot/services/outbox.py
+from __future__ import annotations
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+from bot.config.settings import OUTBOX_PATH
+from bot.services.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+OutboxItem = Tuple[int, int, str]  # (id, user_id, text)
+
+
+class Outbox:
+    """
+    Notifications waiting to be delivered, shared between processes through SQLite (WAL mode).
+
+    In the split deployment (BOT_ROLE=worker / frontend), the worker renders the notifications
+    and put_many() them; the front-end take()s them in order, sends them and ack()s them.
+    Delivery is at-least-once: a message taken but not acknowledged (front-end stopped while
+    sending) is taken again at the next start.
+    The delivery shards also report here the users who blocked the bot (report_blocked()), so that
+    the front-end, which owns the user file, records it (take_blocked_reports()).
+    Blocking (SQLite I/O): call it through asyncio.to_thread from async code.
+    """
+
+    def __init__(self, db_path: Path = OUTBOX_PATH):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " user_id INTEGER NOT NULL,"
+            " text TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blocked_reports ("
+            " user_id INTEGER PRIMARY KEY,"
+            " reported_at REAL NOT NULL)"
+        )
+
+    def put_many(self, items: Iterable[Tuple[int, str]]) -> int:
+        """Queue (user_id, text) notifications in one transaction. Returns the number queued."""
+        now = time.time()
+        rows = [(user_id, text, now) for user_id, text in items]
+        if not rows:
+            return 0
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany("INSERT INTO outbox (user_id, text, created_at) VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    def take(self, limit: int = 100) -> List[OutboxItem]:
+        """Return the oldest queued notifications (they stay queued until ack())."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, user_id, text FROM outbox ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+
+    def ack(self, ids: Iterable[int]) -> None:
+        """Remove delivered (or given up) notifications."""
+        ids = [(i,) for i in ids]
+        if not ids:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany("DELETE FROM outbox WHERE id = ?", ids)
+
+    def report_blocked(self, user_id: int) -> None:
+        """Report a user who blocked the bot (seen by a process that cannot write the user file)."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO blocked_reports (user_id, reported_at) VALUES (?, ?)", (user_id, time.time())
+                )
+
+    def take_blocked_reports(self) -> List[int]:
+        """Return and remove the reported blocked users."""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                user_ids = [row[0] for row in self._conn.execute("SELECT user_id FROM blocked_reports").fetchall()]
+                self._conn.execute("DELETE FROM blocked_reports")
+        return user_ids
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
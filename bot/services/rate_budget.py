@@ -0,0 +1,99 @@
+# bot/services/rate_budget.py
+from __future__ import annotations
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from bot.config.settings import RATE_BUDGET_PATH, TELEGRAM_NOTIFICATION_RATE
+from bot.services.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class LocalRateBudget:
+    """
+    Token bucket for a single process (same interface as SharedRateBudget): notifications sent
+    concurrently stay under Telegram's bot rate limit. Messages wait for a token, none is refused.
+    """
+
+    def __init__(self, rate: float = TELEGRAM_NOTIFICATION_RATE, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+
+    async def acquire(self, n: float = 1) -> None:
+        """Wait until n tokens are available and take them."""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens >= n:
+                self._tokens -= n
+                return
+            await asyncio.sleep((n - self._tokens) / self.rate)
+
+
+class SharedRateBudget:
+    """
+    Token bucket shared by every process sending notifications (delivery shards, front-end),
+    stored in SQLite so that together they stay under Telegram's global bot rate limit.
+
+    The bucket refills at `rate` messages per second up to `burst`; each message takes one token.
+    A message that finds the bucket empty waits for the next token instead of being refused,
+    so the processes share the budget rather than racing for it.
+    """
+
+    def __init__(self, db_path: Path = RATE_BUDGET_PATH, rate: float = TELEGRAM_NOTIFICATION_RATE,
+                 burst: Optional[float] = None):
+        self.db_path = db_path
+        self.rate = rate
+        self.burst = burst if burst is not None else rate  # at most one second worth of messages at once
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_budget ("
+            " id INTEGER PRIMARY KEY CHECK (id = 1),"
+            " tokens REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("INSERT OR IGNORE INTO rate_budget (id, tokens, updated_at) VALUES (1, ?, ?)",
+                           (self.burst, time.time()))
+
+    def try_acquire(self, n: float = 1) -> float:
+        """
+        Take n tokens if available and return 0, otherwise take nothing and return the number
+        of seconds to wait before they are. Blocking (SQLite I/O): see acquire() for async code.
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                tokens, updated_at = self._conn.execute(
+                    "SELECT tokens, updated_at FROM rate_budget WHERE id = 1"
+                ).fetchone()
+                now = time.time()  # wall clock: shared by the processes, unlike time.monotonic()
+                tokens = min(self.burst, tokens + max(0.0, now - updated_at) * self.rate)
+                wait = 0.0
+                if tokens >= n:
+                    tokens -= n
+                else:
+                    wait = (n - tokens) / self.rate
+                self._conn.execute("UPDATE rate_budget SET tokens = ?, updated_at = ? WHERE id = 1", (tokens, now))
+        return wait
+
+    async def acquire(self, n: float = 1) -> None:
+        """Wait until n tokens are available and take them."""
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire, n)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,30 +1,30 @@
 import os
 import time
+import atexit
+import queue
 import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 import requests
 from dotenv import load_dotenv
 
+from bot.services.logging_config import get_logger
+from bot.config.settings import ALERT_BATCH_WINDOW
+from bot.services.markdown_v2 import escape_markdown_v2
+
+logger = get_logger(__name__)
+
 load_dotenv()
 BOT_TOKEN = os.getenv("TELEGRAM_ALERT_BOT_TOKEN")
 GROUP_ID = os.getenv("TELEGRAM_ALERT_GROUP_ID")
 
 TELEGRAM_MAX_LEN = 4096
 
-# --- No-repeat cache (process-local) ---
-_SENT_CACHE = {}  # key -> last_sent_epoch_seconds
-_SENT_CACHE_LOCK = threading.Lock()
+SENT_CACHE_MAX_ENTRIES = 1000    # max number of distinct messages remembered by the no-repeat cache
 
-
-def escape_markdown_v2(text: str) -> str:
-    # Characters that must be escaped in Telegram MarkdownV2
-    special = r'_\*\[\]\(\)~`>#+\-=|{}.!'
-    out = []
-    for ch in str(text):
-        if ch in special:
-            out.append("\\" + ch)
-        else:
-            out.append(ch)
-    return "".join(out)
+# --- No-repeat cache (process-local, bounded, oldest first) ---
+_SENT_CACHE: "OrderedDict[Tuple[str, str], float]" = OrderedDict()  # key -> last_sent_epoch_seconds
+_SENT_CACHE_LOCK = threading.Lock()
 
 
 def _cleanup_cache(now: float, max_age_seconds: float) -> None:
@@ -32,40 +32,35 @@ def _cleanup_cache(now: float, max_age_seconds: float) -> None:
     to_del = [k for k, t in _SENT_CACHE.items() if (now - t) > max_age_seconds]
     for k in to_del:
         del _SENT_CACHE[k]
+    # Hard cap on the number of distinct messages
+    while len(_SENT_CACHE) > SENT_CACHE_MAX_ENTRIES:
+        _SENT_CACHE.popitem(last=False)
 
 
-def send_telegram_alert(
-    message,
-    group_id=GROUP_ID,
-    bot_token=BOT_TOKEN,
-    *,
-    no_repeat: bool = True,
-    repeat_window_minutes: int = 5,
-):
-    if not bot_token or not group_id:
-        return None
+def _recently_sent(group_id: str, msg_raw: str, repeat_window_minutes: int) -> bool:
+    """Check and update the no-repeat cache. Returns True if the message must be skipped."""
+    window_s = max(0, int(repeat_window_minutes)) * 60
+    now = time.time()
+    cache_key = (str(group_id), msg_raw)
 
-    msg_raw = str(message)
+    with _SENT_CACHE_LOCK:
+        last = _SENT_CACHE.get(cache_key)
+        if last is not None and (now - last) < window_s:
+            return True  # Message already sent recently → skip sending
 
-    # Anti-repeat logic (based on raw message content + chat)
-    if no_repeat:
-        window_s = max(0, int(repeat_window_minutes)) * 60
-        now = time.time()
-        cache_key = (str(group_id), msg_raw)
+        _SENT_CACHE[cache_key] = now
+        _SENT_CACHE.move_to_end(cache_key)
 
-        with _SENT_CACHE_LOCK:
-            last = _SENT_CACHE.get(cache_key)
-            if last is not None and (now - last) < window_s:
-                return None  # Message already sent recently → skip sending
+        # Periodic cleanup of expired cache entries
+        _cleanup_cache(now, max_age_seconds=max(window_s, 30 * 60))
+    return False
 
-            _SENT_CACHE[cache_key] = now
-
-            # Periodic cleanup of expired cache entries
-            _cleanup_cache(now, max_age_seconds=max(window_s, 30 * 60))
 
+def _post_alert(message: str, group_id: str, bot_token: str) -> Optional[requests.Response]:
+    """Blocking send of one alert message (runs in the dispatcher thread)."""
     url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
 
-    msg = msg_raw
+    msg = message
     if len(msg) > TELEGRAM_MAX_LEN:
         msg = msg[:4000] + "\n…(truncated)…"
 
@@ -78,5 +73,139 @@ def send_telegram_alert(
         "parse_mode": "MarkdownV2",
     }
 
-    resp = requests.post(url, json=payload, timeout=10)
-    return resp
+    try:
+        return requests.post(url, json=payload, timeout=10)
+    except requests.RequestException as e:
+        logger.warning("Failed to send Telegram alert: %s", e)
+        return None
+
+
+class _AlertDispatcher:
+    """
+    Background thread sending operator alerts.
+
+    send_telegram_alert() only enqueues. The dispatcher waits ALERT_BATCH_WINDOW after the
+    first alert, then groups what arrived by destination and by message: a single alert is sent
+    as-is, several ones are coalesced into one summary ("37 alerts: 30x ..., 7x ...").
+    The no-repeat cache is applied per distinct message when the batch is sent.
+    """
+
+    def __init__(self, window_seconds: float = ALERT_BATCH_WINDOW):
+        self.window_seconds = window_seconds
+        self._queue: "queue.Queue[Tuple[str, str, str, bool, int]]" = queue.Queue()
+        # Alerts submitted and not sent yet: flush() waits for it to reach 0. A flush request stays
+        # set until then, so a request arriving while a batch is being sent still skips the next window.
+        self._pending = 0
+        self._pending_changed = threading.Condition()
+        self._flush_requested = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, message: str, group_id: str, bot_token: str, no_repeat: bool, repeat_window_minutes: int) -> None:
+        self._ensure_started()
+        with self._pending_changed:
+            self._pending += 1
+        self._queue.put((message, str(group_id), bot_token, no_repeat, repeat_window_minutes))
+
+    def flush(self, timeout: float = 15.0) -> None:
+        """Send pending alerts now and wait (at most `timeout` seconds) until they are sent."""
+        with self._pending_changed:
+            if self._pending == 0:
+                return
+            self._flush_requested.set()
+            self._pending_changed.wait_for(lambda: self._pending == 0, timeout)
+
+    def _ensure_started(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="telegram-alert-dispatcher", daemon=True)
+                self._thread.start()
+
+    def _collect_batch(self) -> List[Tuple[str, str, str, bool, int]]:
+        """Block until an alert arrives, then gather everything raised within the batch window."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window_seconds
+        while not self._flush_requested.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, 0.5)))
+            except queue.Empty:
+                continue
+        # Also take whatever is already queued
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            try:
+                self._send_batch(batch)
+            except Exception as e:  # never let the dispatcher thread die
+                logger.exception("Telegram alert dispatcher failed: %s", e)
+            with self._pending_changed:
+                self._pending -= len(batch)
+                if self._pending == 0:
+                    self._flush_requested.clear()
+                self._pending_changed.notify_all()
+
+    def _send_batch(self, batch: List[Tuple[str, str, str, bool, int]]) -> None:
+        # (group_id, bot_token) -> message -> [count, no_repeat, repeat_window_minutes] (insertion ordered)
+        grouped: Dict[Tuple[str, str], Dict[str, list]] = {}
+        for message, group_id, bot_token, no_repeat, repeat_window_minutes in batch:
+            by_message = grouped.setdefault((group_id, bot_token), {})
+            entry = by_message.setdefault(message, [0, no_repeat, repeat_window_minutes])
+            entry[0] += 1
+
+        for (group_id, bot_token), by_message in grouped.items():
+            to_send = [
+                (message, count)
+                for message, (count, no_repeat, repeat_window_minutes) in by_message.items()
+                if not (no_repeat and _recently_sent(group_id, message, repeat_window_minutes))
+            ]
+            if not to_send:
+                continue
+
+            if len(to_send) == 1 and to_send[0][1] == 1:
+                text = to_send[0][0]
+            else:
+                total = sum(count for _, count in to_send)
+                lines = [f"Realtoken update alert bot: {total} alerts in the last {int(self.window_seconds)}s"]
+                lines += [f"- {count}x {message}" for message, count in to_send]
+                text = "\n".join(lines)
+
+            _post_alert(text, group_id, bot_token)
+
+
+_DISPATCHER = _AlertDispatcher()
+atexit.register(_DISPATCHER.flush)
+
+
+def send_telegram_alert(
+    message,
+    group_id=GROUP_ID,
+    bot_token=BOT_TOKEN,
+    *,
+    no_repeat: bool = True,
+    repeat_window_minutes: int = 5,
+):
+    """
+    Queue an operator alert; it is sent in the background (never blocks the caller).
+    Alerts raised within ALERT_BATCH_WINDOW are coalesced into a single summary message,
+    and a message already sent within `repeat_window_minutes` is skipped when `no_repeat` is set.
+    """
+    if not bot_token or not group_id:
+        return None
+
+    _DISPATCHER.submit(str(message), group_id, bot_token, no_repeat, repeat_window_minutes)
+    return None
+
+
+def flush_telegram_alerts(timeout: float = 15.0) -> None:
+    """Send the queued alerts immediately and wait until they are sent (e.g. before shutdown)."""
+    _DISPATCHER.flush(timeout)
@@ -0,0 +1,68 @@
+# bot/services/token_catalogue.py
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from bot.services.markdown_v2 import escape_markdown_v2, escape_markdown_v2_url
+
+REALT_PRODUCT_URL = "https://realt.co/product/"
+
+
+class TokenInfo(NamedTuple):
+    """
+    The fields of a realtoken (/token API item) used by the bot, and its display fields
+    computed once when the catalogue is built instead of for every notification.
+    """
+    uuid: str
+    short_name: str
+    full_name: str
+    gnosis_contract: Optional[str]
+    url: str          # realt.co product page
+    header_link: str  # MarkdownV2 link [short name](url), escaped, for the notification header
+
+
+# realtoken uuid -> TokenInfo (app.bot_data["realtokens"])
+TokenCatalogue = Dict[str, TokenInfo]
+
+
+def token_info(item: Dict[str, Any]) -> TokenInfo:
+    """Build the catalogue record of a /token API item (or of its to_json() form)."""
+    short_name = item.get("shortName") or ""
+    full_name = item.get("fullName") or ""
+    slug = "-".join(full_name.replace(",", "").split())
+    url = f"{REALT_PRODUCT_URL}{slug}"
+    return TokenInfo(
+        uuid=item["uuid"],
+        short_name=short_name,
+        full_name=full_name,
+        gnosis_contract=item.get("gnosisContract"),
+        url=url,
+        header_link=f"[{escape_markdown_v2(short_name)}]({escape_markdown_v2_url(url)})",
+    )
+
+
+def build_token_catalogue(items: Optional[Iterable[Dict[str, Any]]]) -> Optional[TokenCatalogue]:
+    """
+    Build the catalogue from the /token API items (None if items is None, e.g. fetch failed).
+    Items without a uuid are ignored, as in list_to_dict_by_uuid().
+    """
+    if items is None:
+        return None
+    return {item["uuid"]: token_info(item) for item in items if item.get("uuid")}
+
+
+def catalogue_to_json(catalogue: TokenCatalogue) -> Dict[str, Dict[str, Any]]:
+    """JSON form of a catalogue (snapshot, update sets), with the API field names: build_token_catalogue() reads it back."""
+    return {
+        uuid: {"uuid": token.uuid, "shortName": token.short_name, "fullName": token.full_name, "gnosisContract": token.gnosis_contract}
+        for uuid, token in catalogue.items()
+    }
+
+
+def catalogue_from_json(data: Dict[str, Dict[str, Any]]) -> TokenCatalogue:
+    """Inverse of catalogue_to_json(); also reads the full /token items saved by older versions."""
+    return build_token_catalogue(data.values())
+
+
+def tokens_with_contract(catalogue: TokenCatalogue) -> List[str]:
+    """Uuids of the realtokens deployed on Gnosis (the ones a wallet balance can be read for)."""
+    return [uuid for uuid, token in catalogue.items() if token.gnosis_contract is not None]
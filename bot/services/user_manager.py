@@ -1,34 +1,73 @@
 # bot/services/user_manager.py
 from __future__ import annotations
 import json
-from typing import Dict
+import threading
+import time
+from typing import Callable, Dict, Iterable, Set, TypeVar
 from pathlib import Path
 
-from bot.config.settings import USER_DATA_PATH
+from bot.config.settings import USER_DATA_PATH, DEFAULT_LANGUAGE
 from bot.services.user_preferences import UserPreferences
 
+T = TypeVar("T")
+
 
 class UserManager:
-    """Manages all users' preferences in memory and persists them to a JSON file."""
+    """
+    Manages all users' preferences in memory and persists them to a JSON file.
+
+    Thread-safe: handlers run on the event loop while wallet workers run in threads.
+    - Every read-modify-write goes through the internal lock (update_user, modify_user, ...).
+    - Code iterating over users must use users_snapshot() instead of `users` directly.
+    - File writes are serialised and never overwrite a newer state with an older one.
+
+    In the split deployment, the worker process opens the file read-only and picks up the
+    front-end's changes with reload_if_changed().
+    """
 
-    def __init__(self, json_path: Path = USER_DATA_PATH):
+    def __init__(self, json_path: Path = USER_DATA_PATH, read_only: bool = False):
         """
         Initialize the manager.
 
         Args:
             json_path: Path to the JSON file where user configurations are persisted.
+            read_only: Never write the file (another process owns it).
         """
         self.json_path = json_path
+        self.read_only = read_only
+        self._loaded_mtime_ns: int | None = None
         self.users: Dict[int, UserPreferences] = {}
+
+        # Recipient indexes (derived from users, never persisted):
+        # - token_owners: realtoken uuid (lowercase) -> user IDs in "wallet" mode owning it
+        # - all_scope_users: user IDs following all realtokens
+        # Users who blocked the bot are in neither index.
+        self.token_owners: Dict[str, Set[int]] = {}
+        self.all_scope_users: Set[int] = set()
+        self._indexed_tokens: Dict[int, Set[str]] = {}
+
+        # Last interaction time per user (epoch seconds, in memory only)
+        self.last_active: Dict[int, float] = {}
+
+        # _lock guards users and indexes (re-entrant: update_user -> get_user -> save_to_file)
+        # _file_lock serialises file writes; _version orders them
+        self._lock = threading.RLock()
+        self._file_lock = threading.Lock()
+        self._version = 0
+        self._saved_version = 0
+
         self.load_from_file()
 
     def load_from_file(self) -> None:
         """Load all users from the JSON file into memory."""
         if not self.json_path.exists():
-            self.users = {}
+            with self._lock:
+                self.users = {}
+                self.rebuild_token_index()
             return
 
         try:
+            mtime_ns = self.json_path.stat().st_mtime_ns
             with open(self.json_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
         except json.JSONDecodeError as e:
@@ -37,33 +76,77 @@ class UserManager:
         if not isinstance(data, dict):
             raise ValueError(f"Unexpected JSON structure in {self.json_path}: expected an object at root.")
 
-        self.users = {
-            int(user_id): UserPreferences.from_dict(int(user_id), prefs)
-            for user_id, prefs in data.items()
-        }
+        with self._lock:
+            self.users = {
+                int(user_id): UserPreferences.from_dict(int(user_id), prefs)
+                for user_id, prefs in data.items()
+            }
+            self.rebuild_token_index()
+            self._loaded_mtime_ns = mtime_ns
+
+    def reload_if_changed(self) -> bool:
+        """Reload the users if the file was modified (by another process) since the last load. Returns True if reloaded."""
+        try:
+            mtime_ns = self.json_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime_ns == self._loaded_mtime_ns:
+            return False
+        self.load_from_file()
+        return True
 
     def save_to_file(self) -> None:
-        """Save the current state of all users to the JSON file (atomic write)."""
-        serializable_data = {
-            str(user_id): prefs.to_storage_dict()   # <-- exclude inner user_id
-            for user_id, prefs in self.users.items()
-        }
-
-        self.json_path.parent.mkdir(parents=True, exist_ok=True)
-        tmp_path = self.json_path.with_suffix(self.json_path.suffix + ".tmp")
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            json.dump(serializable_data, f, ensure_ascii=False, indent=2)
-        tmp_path.replace(self.json_path)
+        """Save the current state of all users to the JSON file (atomic write). No-op when read-only."""
+        if self.read_only:
+            return
+        # Serialise under the lock (consistent state), write outside of it (slow I/O)
+        with self._lock:
+            serializable_data = {
+                str(user_id): prefs.to_storage_dict()   # <-- exclude inner user_id
+                for user_id, prefs in self.users.items()
+            }
+            content = json.dumps(serializable_data, ensure_ascii=False, indent=2)
+            self._version += 1
+            version = self._version
+
+        with self._file_lock:
+            if version < self._saved_version:
+                return  # a newer state has already been written
+
+            self.json_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.json_path.with_suffix(self.json_path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            tmp_path.replace(self.json_path)
+            self._saved_version = version
+
+    def users_snapshot(self) -> Dict[int, UserPreferences]:
+        """Return a shallow copy of the users dict, safe to iterate while other threads add users."""
+        with self._lock:
+            return dict(self.users)
 
     def get_user(self, user_id: int) -> UserPreferences:
         """
         Retrieve a user's preferences from memory.
         If the user does not exist yet, create them with default preferences.
         """
-        if user_id not in self.users:
-            self.users[user_id] = UserPreferences(user_id=user_id)
+        with self._lock:
+            if user_id not in self.users:
+                self.users[user_id] = UserPreferences(user_id=user_id)
+                self.reindex_user(user_id)
+                created = True
+            else:
+                created = False
+            user = self.users[user_id]
+
+        if created:
             self.save_to_file()
-        return self.users[user_id]
+        return user
+
+    def get_language(self, user_id: int) -> str:
+        """A user's language, the default language for an unknown user (who is not created)."""
+        prefs = self.users.get(user_id)
+        return prefs.language if prefs is not None else DEFAULT_LANGUAGE
 
     def update_user(self, user_id: int, **kwargs) -> None:
         """
@@ -72,11 +155,116 @@ class UserManager:
         Raises:
             AttributeError: if a provided key is not a valid attribute of UserPreferences.
         """
-        user = self.get_user(user_id)
+        with self._lock:
+            user = self.get_user(user_id)
+
+            for key, value in kwargs.items():
+                if not hasattr(user, key):
+                    raise AttributeError(f"Unknown user preference: {key}")
+                setattr(user, key, value)
+
+            if "token_scope" in kwargs:
+                self.reindex_user(user_id)
+
+        self.save_to_file()
+
+    def modify_user(self, user_id: int, fn: Callable[[UserPreferences], T]) -> T:
+        """
+        Atomically apply `fn` to a user's preferences (read-modify-write), then persist.
+        Use this instead of get_user() + update_user() when the new value depends on the current one.
+        """
+        with self._lock:
+            user = self.get_user(user_id)
+            result = fn(user)
+            self.reindex_user(user_id)
+
+        self.save_to_file()
+        return result
+
+    def modify_users(self, fn: Callable[[UserPreferences], None]) -> None:
+        """Atomically apply `fn` to every user's preferences, then rebuild the indexes and persist once."""
+        with self._lock:
+            for prefs in self.users.values():
+                fn(prefs)
+            self.rebuild_token_index()
+
+        self.save_to_file()
+
+    def mark_active(self, user_id: int) -> None:
+        """Record that a user just interacted with the bot."""
+        self.last_active[user_id] = time.time()
+
+    def mark_blocked(self, user_id: int) -> None:
+        """Record that a user blocked the bot: they are dropped from the recipient indexes."""
+        with self._lock:
+            prefs = self.users.get(user_id)
+            if prefs is None or prefs.is_blocked():
+                return
+            prefs.set_blocked()
+            self.reindex_user(user_id)
+
+        self.save_to_file()
 
-        for key, value in kwargs.items():
-            if not hasattr(user, key):
-                raise AttributeError(f"Unknown user preference: {key}")
-            setattr(user, key, value)
+    def mark_unblocked(self, user_id: int) -> None:
+        """Record that a previously blocked user is reachable again (e.g. on /start)."""
+        with self._lock:
+            prefs = self.users.get(user_id)
+            if prefs is None or not prefs.is_blocked():
+                return
+            prefs.set_active()
+            self.reindex_user(user_id)
 
         self.save_to_file()
+
+    # --- Recipient indexes ---------------------------------------------------
+
+    def _unindex_user(self, user_id: int) -> None:
+        """Remove a user from every recipient index (lock must be held)."""
+        self.all_scope_users.discard(user_id)
+        for uuid in self._indexed_tokens.pop(user_id, set()):
+            owners = self.token_owners.get(uuid)
+            if owners is None:
+                continue
+            owners.discard(user_id)
+            if not owners:
+                del self.token_owners[uuid]
+
+    def reindex_user(self, user_id: int) -> None:
+        """Refresh the recipient indexes for a single user from its current token_scope."""
+        with self._lock:
+            self._unindex_user(user_id)
+
+            prefs = self.users.get(user_id)
+            if prefs is None or prefs.is_blocked():
+                return
+
+            token_scope = prefs.token_scope or {}
+            if token_scope.get("mode", "all") != "wallet":
+                self.all_scope_users.add(user_id)
+                return
+
+            owned = {uuid.lower() for uuid in token_scope.get("realtokens_owned", []) or []}
+            for uuid in owned:
+                self.token_owners.setdefault(uuid, set()).add(user_id)
+            self._indexed_tokens[user_id] = owned
+
+    def rebuild_token_index(self) -> None:
+        """Rebuild the recipient indexes from scratch (e.g. after a bulk update of realtokens_owned)."""
+        with self._lock:
+            self.token_owners = {}
+            self.all_scope_users = set()
+            self._indexed_tokens = {}
+            for user_id in self.users:
+                self.reindex_user(user_id)
+
+    def get_recipients(self, uuids: Iterable[str]) -> Set[int]:
+        """
+        Return the IDs of users that may be notified about at least one of the given realtokens:
+        every user following all realtokens, plus wallet-mode users owning one of the uuids.
+        Users who blocked the bot are never returned.
+        """
+        with self._lock:
+            recipients = set(self.all_scope_users)
+            for uuid in uuids:
+                recipients |= self.token_owners.get(uuid.lower(), set())
+        return recipients
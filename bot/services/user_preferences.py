@@ -1,10 +1,12 @@
+from datetime import datetime, timezone
 from bot.config.settings import DEFAULT_LANGUAGE
 
 class UserPreferences:
     """Represents a single user's preferences."""
 
     def __init__(self, user_id: int, language: str = DEFAULT_LANGUAGE,
-                 notification_types=None, token_scope=None):
+                 notification_types=None, token_scope=None, delivery_status=None,
+                 digest: str = "off"):
         self.user_id = user_id
         self.language = language
 
@@ -22,12 +24,40 @@ class UserPreferences:
             "realtokens_owned": []
         }
 
+        # Delivery status: "blocked" once Telegram refuses our messages (user blocked the bot),
+        # back to "active" when the user sends /start again
+        self.delivery_status = delivery_status or {
+            "status": "active",  # "active" or "blocked"
+            "blocked_since": None
+        }
+
+        # Digest: "off" (one message per update cycle), "hourly" or "daily" (see DIGEST_PERIODS)
+        self.digest = digest or "off"
+
+    def is_blocked(self) -> bool:
+        """True if the user blocked the bot (no notification nor wallet refresh for them)."""
+        return (self.delivery_status or {}).get("status") == "blocked"
+
+    def set_blocked(self) -> None:
+        """Mark the user as blocked, keeping the date of the first refusal."""
+        if not self.is_blocked():
+            self.delivery_status = {
+                "status": "blocked",
+                "blocked_since": datetime.now(timezone.utc).isoformat(timespec="seconds")
+            }
+
+    def set_active(self) -> None:
+        """Mark the user as reachable again."""
+        self.delivery_status = {"status": "active", "blocked_since": None}
+
     def to_storage_dict(self) -> dict:
         """Dict for JSON storage (exclude the primary key user_id)."""
         return {
             "language": self.language,
             "notification_types": self.notification_types,
-            "token_scope": self.token_scope
+            "token_scope": self.token_scope,
+            "delivery_status": self.delivery_status,
+            "digest": self.digest
         }
 
     @classmethod
@@ -38,5 +68,7 @@ class UserPreferences:
             user_id=user_id,
             language=data.get("language", DEFAULT_LANGUAGE),
             notification_types=data.get("notification_types"),
-            token_scope=data.get("token_scope")
+            token_scope=data.get("token_scope"),
+            delivery_status=data.get("delivery_status"),
+            digest=data.get("digest", "off")
         )
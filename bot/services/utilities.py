@@ -1,4 +1,5 @@
 import json
+from functools import lru_cache
 from typing import Any, Dict, List, Iterable, Optional
 from bot.config.settings import THRESHOLD_BALANCE_DEC
 from bot.services.logging_config import get_logger
@@ -157,6 +158,15 @@ def load_abis(path: str = "ressources/abi.json") -> Dict[str, Any]:
         logger.error("Unexpected error while loading ABIs from %s: %s", path, e)
         raise
 
+@lru_cache(maxsize=1)
+def get_abis() -> Dict[str, Any]:
+    """
+    Return the contract ABIs, loaded from the default ABI file on first use and cached.
+    Loaded in the background at startup (see bot.services.warm_up).
+    """
+    return load_abis()
+
+
 User   = str   # checksum address
 Token  = str   # checksum address
 Amount = int
@@ -3,12 +3,17 @@ from __future__ import annotations
 from bot.services.logging_config import get_logger
 logger = get_logger(__name__)
 
-from typing import Callable, Any, List, Dict
+from typing import Callable, Any, List, Dict, TYPE_CHECKING
 from functools import lru_cache
-from web3 import Web3
+from urllib.parse import urlparse
 import time
 import os
 
+from bot.services.metrics import RPC_DURATION, RPC_ERRORS
+
+if TYPE_CHECKING:
+    from web3 import Web3
+
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -36,6 +41,8 @@ def _load_rpc_urls() -> List[str]:
 @lru_cache(maxsize=1)
 def _build_w3_list() -> List[Web3]:
     """Build and cache Web3 objects once for all decorated calls."""
+    from web3 import Web3  # heavy import, deferred until the first RPC call (or the warm-up)
+
     urls = _load_rpc_urls()
     return [Web3(Web3.HTTPProvider(u)) for u in urls]
 
@@ -44,6 +51,22 @@ def _build_w3_list() -> List[Web3]:
 _RPC_COOLDOWN_UNTIL: Dict[str, float] = {}
 
 
+def rpc_endpoint_label(url: str) -> str:
+    """
+    Label identifying an RPC URL in outputs such as metrics.
+    Only the host is kept: RPC URLs often embed an API key in their path.
+    """
+    urls = _load_rpc_urls()
+    index = urls.index(url) if url in urls else -1
+    return f"{index}:{urlparse(url).netloc}"
+
+
+def get_rpc_cooldowns() -> Dict[str, float]:
+    """Return {url: remaining cooldown in seconds (0 if available)} for every configured RPC URL."""
+    now = time.time()
+    return {url: max(0.0, _RPC_COOLDOWN_UNTIL.get(url, 0.0) - now) for url in _load_rpc_urls()}
+
+
 # -----------------------------
 # The decorator
 # -----------------------------
@@ -84,10 +107,16 @@ def w3_handler(
                         continue
 
                     any_tried = True
+                    endpoint = rpc_endpoint_label(url)
                     for attempt in range(1, attempts_per_w3 + 1):
+                        started = time.perf_counter()
                         try:
-                            return fn(w3, *args, **kwargs)
+                            result = fn(w3, *args, **kwargs)
+                            RPC_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
+                            return result
                         except Exception as e:
+                            RPC_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
+                            RPC_ERRORS.inc(endpoint=endpoint)
                             if attempt < attempts_per_w3:
                                 logger.warning(
                                     f"[w3_handler] RPC {url} failed (attempt {attempt}/{attempts_per_w3}): {e}. "
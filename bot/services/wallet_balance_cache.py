@@ -0,0 +1,137 @@
+# bot/services/wallet_balance_cache.py
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from bot.config.settings import WALLET_BALANCE_CACHE_TTL, FRENQUENCY_WALLET_UPDATE
+from bot.services.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# fetcher: list of lowercase wallets -> { wallet_lowercase: { token_lowercase, ... } }
+Fetcher = Callable[[List[str]], Dict[str, Set[str]]]
+
+
+class WalletBalanceCache:
+    """
+    Process-wide cache of the realtokens owned by each wallet, shared by all users.
+
+    - Entries are fresh for `ttl_seconds` (served without RPC query), and kept for
+      `retention_seconds` so that the holdings of a wallet refreshed in another time slice
+      can still be read with peek(). The entry of a wallet whose last fetch failed is kept
+      past the retention period: its last known holdings stay readable until a fetch succeeds.
+    - Concurrent requests for the same wallet are coalesced: only the first caller
+      queries the blockchain, the others wait for its result.
+    - Thread-safe: used from the event loop (through asyncio.to_thread) and from background threads.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = WALLET_BALANCE_CACHE_TTL * 60,
+        retention_seconds: float = 2 * FRENQUENCY_WALLET_UPDATE * 60,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.retention_seconds = max(ttl_seconds, retention_seconds)
+        self._entries: Dict[str, Tuple[float, Set[str]]] = {}  # wallet -> (fetched_at, tokens)
+        self._in_flight: Dict[str, threading.Event] = {}       # wallet -> set when fetch is done
+        self._failed: Set[str] = set()                          # wallets whose last fetch failed
+        self._lock = threading.Lock()
+
+    def _get_fresh(self, wallet: str, now: float, max_age: float) -> Optional[Set[str]]:
+        """Return the cached tokens of a wallet if younger than max_age (lock must be held)."""
+        entry = self._entries.get(wallet)
+        if entry is None or (now - entry[0]) >= max_age:
+            return None
+        return entry[1]
+
+    def _prune(self, now: float) -> None:
+        """Drop entries older than the retention period, except the last known holdings of failing wallets (lock must be held)."""
+        expired = [
+            w for w, (fetched_at, _) in self._entries.items()
+            if (now - fetched_at) >= self.retention_seconds and w not in self._failed
+        ]
+        for w in expired:
+            del self._entries[w]
+
+    def get_many(self, wallets: Iterable[str], fetcher: Fetcher, *, max_age: Optional[float] = None) -> Dict[str, Set[str]]:
+        """
+        Return { wallet_lowercase: tokens_owned } for the requested wallets.
+
+        Fresh entries are served from the cache, wallets already being fetched by another caller
+        are awaited, and the remaining ones are fetched in a single `fetcher` call.
+        Wallets whose fetch failed are missing from the result.
+        """
+        max_age = self.ttl_seconds if max_age is None else max_age
+        requested = {w.lower() for w in wallets if w}
+
+        result: Dict[str, Set[str]] = {}
+        to_fetch: List[str] = []
+        to_wait: Dict[str, threading.Event] = {}
+
+        with self._lock:
+            now = time.time()
+            for wallet in requested:
+                cached = self._get_fresh(wallet, now, max_age)
+                if cached is not None:
+                    result[wallet] = set(cached)
+                elif wallet in self._in_flight:
+                    to_wait[wallet] = self._in_flight[wallet]
+                else:
+                    self._in_flight[wallet] = threading.Event()
+                    to_fetch.append(wallet)
+
+        logger.info(
+            f"Wallet balance cache: {len(result)} hit(s), {len(to_wait)} coalesced, {len(to_fetch)} to fetch"
+        )
+
+        if to_fetch:
+            try:
+                fetched = fetcher(to_fetch)
+                with self._lock:
+                    now = time.time()
+                    for wallet in to_fetch:
+                        if wallet in fetched:
+                            tokens = set(fetched[wallet])
+                            self._entries[wallet] = (now, tokens)
+                            result[wallet] = set(tokens)
+            finally:
+                # Always release waiters, even if the fetch failed
+                with self._lock:
+                    for wallet in to_fetch:
+                        if wallet in result:
+                            self._failed.discard(wallet)
+                        else:
+                            self._failed.add(wallet)
+                        self._in_flight.pop(wallet).set()
+                    self._prune(time.time())
+
+        for wallet, event in to_wait.items():
+            event.wait()
+            with self._lock:
+                entry = self._entries.get(wallet)
+            if entry is not None:
+                result[wallet] = set(entry[1])
+
+        return result
+
+    def get(self, wallet: str, fetcher: Fetcher, *, max_age: Optional[float] = None) -> Optional[Set[str]]:
+        """Single-wallet variant of get_many(). Returns None if the fetch failed."""
+        return self.get_many([wallet], fetcher, max_age=max_age).get(wallet.lower())
+
+    def peek(self, wallet: str) -> Optional[Set[str]]:
+        """Return the last known holdings of a wallet whatever their age, without fetching."""
+        with self._lock:
+            entry = self._entries.get(wallet.lower())
+        return set(entry[1]) if entry is not None else None
+
+    def is_fresh(self, wallet: str) -> bool:
+        """Return True if the holdings of a wallet are cached and younger than the TTL."""
+        with self._lock:
+            return self._get_fresh(wallet.lower(), time.time(), self.ttl_seconds) is not None
+
+    def invalidate(self, wallet: str) -> None:
+        """Forget the cached holdings of a wallet."""
+        with self._lock:
+            self._entries.pop(wallet.lower(), None)
+            self._failed.discard(wallet.lower())
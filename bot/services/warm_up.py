@@ -0,0 +1,30 @@
+# bot/services/warm_up.py
+from __future__ import annotations
+import time
+
+from bot.services.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def warm_up_balance_stack() -> None:
+    """
+    Load the modules and objects only needed for wallet balances (web3, eth_abi, ABIs, Web3 providers).
+    They are deferred at startup so polling starts sooner; this runs in a background thread
+    right after startup so the first wallet refresh does not pay for them.
+    Blocking: call it through asyncio.to_thread.
+    """
+    started = time.perf_counter()
+    try:
+        import bot.balances  # noqa: F401  (imports web3 + eth_abi)
+        from bot.services.utilities import get_abis
+        from bot.services.w3_handler import _build_w3_list
+
+        get_abis()
+        _build_w3_list()
+    except Exception as e:
+        # Not fatal: the wallet tasks will load them (and report errors) on first use
+        logger.warning(f"Balance stack warm-up failed: {e}")
+        return
+
+    logger.info(f"Balance stack warmed up in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,196 @@
+# bot/services/webhook_server.py
+from __future__ import annotations
+import asyncio
+import hmac
+import json
+import secrets
+from typing import Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from telegram import Update
+from telegram.ext import Application
+
+from bot.config.settings import (
+    WEBHOOK_URL,
+    WEBHOOK_LISTEN,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET_TOKEN,
+    WEBHOOK_MAX_CONCURRENT_UPDATES,
+    WEBHOOK_DRAIN_TIMEOUT,
+)
+from bot.services.app_lifecycle import run_application
+from bot.services.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SECRET_TOKEN_HEADER = "x-telegram-bot-api-secret-token"
+MAX_BODY_BYTES = 1024 * 1024  # a Telegram update is a few KB
+READ_TIMEOUT = 30  # in seconds, idle keep-alive connections are closed after this delay
+
+
+class WebhookServer:
+    """
+    Minimal HTTP/1.1 server receiving the updates Telegram posts to the webhook.
+
+    - Only POST requests on `path` carrying the secret token header are accepted (403 otherwise).
+    - At most `max_concurrent` updates are processed at the same time: when they are all busy,
+      the response is delayed until a slot frees up, so Telegram slows down instead of the
+      bot piling up tasks.
+    - drain() stops accepting connections and waits for the updates in progress.
+
+    Updates are handed to Application.process_update(), so handlers, handler groups and
+    the error handler behave exactly as in polling mode.
+    """
+
+    def __init__(self, app: Application, secret_token: str, path: str = "/",
+                 max_concurrent: int = WEBHOOK_MAX_CONCURRENT_UPDATES):
+        self.app = app
+        self.secret_token = secret_token
+        self.path = path or "/"
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._tasks: Set[asyncio.Task] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._accepting = True
+
+    async def start(self, host: str = WEBHOOK_LISTEN, port: int = WEBHOOK_PORT) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        logger.info(f"Webhook server listening on http://{host}:{port}{self.path}")
+
+    @property
+    def sockets(self):
+        return self._server.sockets if self._server is not None else ()
+
+    async def drain(self, timeout: float = WEBHOOK_DRAIN_TIMEOUT) -> None:
+        """Stop accepting updates, then wait (at most `timeout` seconds) for the ones in progress."""
+        self._accepting = False
+        if self._server is not None:
+            self._server.close()
+        if self._tasks:
+            logger.info(f"Webhook server: waiting for {len(self._tasks)} update(s) in progress")
+            _, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+            if pending:
+                logger.warning(f"Webhook server: {len(pending)} update(s) still in progress after {timeout}s, cancelling")
+                for task in pending:
+                    task.cancel()
+        logger.info("Webhook server stopped")
+
+    # --- HTTP ------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve the requests of one (keep-alive) connection."""
+        try:
+            while self._accepting:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, length, body = request
+                status, keep_alive = await self._handle_request(method, path, headers, length, body)
+                keep_alive = keep_alive and self._accepting and headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Length: 0\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError) as e:
+            logger.debug(f"Webhook connection dropped: {e}")
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], Optional[int], bytes]]:
+        """
+        Read one request (None on a cleanly closed connection).
+        The body length is None if the Content-Length header is invalid (body not read).
+        """
+        request_line = await asyncio.wait_for(reader.readline(), timeout=READ_TIMEOUT)
+        if not request_line:
+            return None
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout=READ_TIMEOUT)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        parts = request_line.decode("latin-1").split()
+        method, path = (parts[0], parts[1].split("?")[0]) if len(parts) >= 2 else ("", "")
+
+        length = _parse_content_length(headers.get("content-length", ""))
+        if length is None or length > MAX_BODY_BYTES:
+            return method, path, headers, length, b""  # rejected in _handle_request, body never read
+        body = await asyncio.wait_for(reader.readexactly(length), timeout=READ_TIMEOUT) if length else b""
+        return method, path, headers, length, body
+
+    async def _handle_request(self, method: str, path: str, headers: Dict[str, str], length: Optional[int], body: bytes) -> Tuple[str, bool]:
+        """Return the HTTP status line and whether the connection can be kept open."""
+        if length is None:
+            return "400 Bad Request", False  # the body cannot be delimited: close the connection
+        if path != self.path:
+            return "404 Not Found", True
+        if method != "POST":
+            return "405 Method Not Allowed", True
+        if not hmac.compare_digest(headers.get(SECRET_TOKEN_HEADER, ""), self.secret_token):
+            logger.warning("Webhook request rejected: invalid secret token")
+            return "403 Forbidden", False
+        if length > MAX_BODY_BYTES:
+            return "413 Payload Too Large", False
+        if not self._accepting:
+            return "503 Service Unavailable", False  # Telegram retries later
+
+        try:
+            update = Update.de_json(json.loads(body), self.app.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Webhook request rejected: invalid update ({e})")
+            return "400 Bad Request", True
+
+        # Bounded concurrency: wait for a free slot before acknowledging the update
+        await self._slots.acquire()
+        task = asyncio.create_task(self._process_update(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return "200 OK", True
+
+    async def _process_update(self, update: Update) -> None:
+        try:
+            await self.app.process_update(update)
+        finally:
+            self._slots.release()
+
+
+def _parse_content_length(value: str) -> Optional[int]:
+    """Content-Length header value: 0 if absent, None if not a non-negative integer."""
+    value = value.strip()
+    if not value:
+        return 0
+    if not (value.isascii() and value.isdigit()):
+        return None
+    return int(value)
+
+
+async def _serve_webhook(app: Application, url: str, host: str, port: int, secret_token: str) -> None:
+    server = WebhookServer(app, secret_token, path=urlparse(url).path or "/")
+
+    async def on_started() -> None:
+        await server.start(host, port)
+        await app.bot.set_webhook(
+            url=url,
+            secret_token=secret_token,
+            allowed_updates=Update.ALL_TYPES,
+            max_connections=WEBHOOK_MAX_CONCURRENT_UPDATES,
+        )
+        logger.info(f"Webhook set to {url}")
+
+    # Graceful shutdown: finish the updates in progress before the application stops
+    await run_application(app, on_started=on_started, on_stopping=server.drain)
+
+
+def run_webhook(app: Application, url: str = WEBHOOK_URL, host: str = WEBHOOK_LISTEN, port: int = WEBHOOK_PORT,
+                secret_token: str = WEBHOOK_SECRET_TOKEN) -> None:
+    """
+    Run the bot in webhook mode until SIGINT/SIGTERM (blocking, like app.run_polling()).
+    Without WEBHOOK_SECRET_TOKEN, a random token is generated: it is registered with set_webhook at each start.
+    """
+    asyncio.run(_serve_webhook(app, url, host, port, secret_token or secrets.token_urlsafe(32)))
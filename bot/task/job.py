@@ -1,7 +1,9 @@
 from __future__ import annotations
+import asyncio
 from telegram.ext import Application
-from bot.core import run_update_cycle_and_notify
-from bot.task.update_realtoken_owned import update_realtoken_owned
+from bot.services.history_snapshot import load_history_snapshot, history_snapshot_mtime
+from bot.core import run_update_cycle_and_notify, flush_digests, deliver_shard_updates
+from bot.task.update_realtoken_owned import update_realtoken_owned, get_current_slice, WALLET_UPDATE_SLICE_COUNT
 
 async def job_update_and_notify(context) -> None:
     """JobQueue wrapper that calls the business logic orchestrator."""
@@ -9,6 +11,31 @@ async def job_update_and_notify(context) -> None:
     await run_update_cycle_and_notify(app)
 
 async def job_update_realtoken_owned(context) -> None:
-    """JobQueue wrapper that calls the business logic orchestrator."""
+    """JobQueue wrapper that refreshes the wallets of the current time slice."""
+    app: Application = context.application
+    if app.bot_data.get("role") == "frontend":
+        await refresh_realtokens_from_snapshot(app)
+    await update_realtoken_owned(app, slice_index=get_current_slice(), slice_count=WALLET_UPDATE_SLICE_COUNT)
+
+async def job_flush_digests(context) -> None:
+    """JobQueue wrapper that sends the digests that are due."""
     app: Application = context.application
-    await update_realtoken_owned(app)
\ No newline at end of file
+    await flush_digests(app)
+
+async def job_deliver_shard_updates(context) -> None:
+    """JobQueue wrapper that delivers the new update sets to this delivery shard's users."""
+    app: Application = context.application
+    await deliver_shard_updates(app)
+
+async def refresh_realtokens_from_snapshot(app: Application) -> None:
+    """
+    Split deployment: the front-end does not run the update cycle, it takes the realtoken list
+    (contract addresses for the wallet refresh) from the snapshot saved by the worker, when it changed.
+    """
+    mtime = history_snapshot_mtime()
+    if mtime is None or mtime == app.bot_data.get("realtokens_snapshot_mtime"):
+        return
+    snapshot = await asyncio.to_thread(load_history_snapshot)
+    if snapshot is not None:
+        app.bot_data["realtokens"] = snapshot["realtokens"]
+        app.bot_data["realtokens_snapshot_mtime"] = mtime
\ No newline at end of file
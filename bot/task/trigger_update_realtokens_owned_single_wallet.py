@@ -1,69 +1,52 @@
 from __future__ import annotations
 import asyncio
-from web3 import Web3
+from functools import partial
 from telegram.ext import ContextTypes
-from bot.balances import get_balances_of_realtokens, get_balances_of_realtoken_wrapper
-from bot.config.settings import THRESHOLD_BALANCE_DEC
+from bot.services.utilities import get_abis
+from bot.services.token_catalogue import tokens_with_contract
 
 def update_realtokens_owned_single_wallet(context: ContextTypes.DEFAULT_TYPE, addr_norm: str, user_id: int, user_manager) -> None:
     """
     Synchronous worker that will run in a background thread.
-    For now, it simply prints 'OK'. Later, you'll put the RealToken logic here.
+    Fetches the realtokens owned by the new wallet (through the shared wallet balance cache)
+    and merges them into the user's realtokens_owned.
     """
 
-    abis = context.application.bot_data['abis']
-    realtokens_list = context.application.bot_data['realtokens']
+    # Deferred import: bot.balances pulls web3 (see bot.services.warm_up)
+    from bot.balances import get_realtokens_owned
 
-    realtokens_uuid = [
-        uuid
-        for uuid, data in realtokens_list.items()
-        if data.get("gnosisContract") is not None
-    ]
+    abis = get_abis()
+    realtokens_list = context.application.bot_data['realtokens']
+    wallet_balance_cache = context.application.bot_data['wallet_balance_cache']
 
-    balances_realtokens = get_balances_of_realtokens(
-        users_addresses=[addr_norm],
-        realtoken_contract_addresses=realtokens_uuid,
-        abi_realtoken=abis["realtoken"],
-        abi_multicall3=abis["multicall3"],
-    )
+    realtokens_uuid = tokens_with_contract(realtokens_list)
 
-    balances_wrapper = get_balances_of_realtoken_wrapper(
-        users_addresses=[addr_norm],
-        abi_realtoken_wrapper=abis["realtoken-wrapper"],
-        abi_multicall3=abis["multicall3"],
+    # Served from the cache if another user already tracks this wallet
+    new_realtokens_owned = wallet_balance_cache.get(
+        addr_norm,
+        partial(get_realtokens_owned, realtoken_contract_addresses=realtokens_uuid, abis=abis),
     )
+    if new_realtokens_owned is None:
+        return
 
-    new_realtokens_owned = set()
-
-    addr_checksum = Web3.to_checksum_address(addr_norm)
-
-    for realtoken, balance in balances_realtokens[addr_checksum].items():
-        if balance > THRESHOLD_BALANCE_DEC * 10**18:
-            new_realtokens_owned.add(realtoken)
-    
-    for realtoken, balance in balances_wrapper[addr_checksum].items():
-        if balance > THRESHOLD_BALANCE_DEC * 10**18:
-            new_realtokens_owned.add(realtoken)
-
-    # Fetch user preferences object
-    user_prefs = user_manager.get_user(user_id)
-    current_scope = user_prefs.token_scope
+    def _merge_realtokens_owned(user_prefs) -> None:
+        current_scope = user_prefs.token_scope
 
-    # Normalize everything to lowercase
-    new_realtokens_owned = {rt.lower() for rt in new_realtokens_owned}
-    previous_realtokens_owned = {rt.lower() for rt in current_scope.setdefault("realtokens_owned", [])}
+        # Normalize everything to lowercase
+        previous_realtokens_owned = {rt.lower() for rt in current_scope.setdefault("realtokens_owned", [])}
 
-    # Merge and save back
-    merged_realtokens_owned = list(previous_realtokens_owned.union(new_realtokens_owned))
+        # Merge and save back
+        merged_realtokens_owned = list(previous_realtokens_owned.union(new_realtokens_owned))
 
-    # Build updated scope
-    new_token_scope = {
-        **current_scope,
-        "realtokens_owned": merged_realtokens_owned
-    }
+        # Build updated scope
+        user_prefs.token_scope = {
+            **current_scope,
+            "realtokens_owned": merged_realtokens_owned
+        }
 
-    # Update via manager (persists to file automatically)
-    user_manager.update_user(user_id, token_scope=new_token_scope)
+    # Read-modify-write under the manager lock: the user may edit its settings meanwhile
+    # (persists to file automatically)
+    user_manager.modify_user(user_id, _merge_realtokens_owned)
 
 
 def trigger_update_realtokens_owned_single_wallet(
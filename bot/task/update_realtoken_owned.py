@@ -1,68 +1,144 @@
-from typing import List
+import asyncio
+import heapq
+import time
+from functools import partial
+from typing import Dict, List, Optional, Set
 from telegram.ext import Application
-from bot.balances import get_balances_of_realtokens, get_balances_of_realtoken_wrapper
-from bot.services.utilities import merge_user_token_balances
-
-from web3 import Web3
+from bot.services.utilities import get_abis
+from bot.services.token_catalogue import tokens_with_contract
+from bot.config.settings import (
+    FRENQUENCY_WALLET_UPDATE,
+    WALLET_UPDATE_SLICE_INTERVAL,
+    WALLET_ACTIVE_USER_WINDOW,
+    WALLET_UPDATE_MAX_PRIORITY_WALLETS,
+)
 
 from bot.services.logging_config import get_logger
 logger = get_logger(__name__)
 
-async def update_realtoken_owned(app: Application) -> None:
+# Number of time slices covering FRENQUENCY_WALLET_UPDATE
+WALLET_UPDATE_SLICE_COUNT = max(1, FRENQUENCY_WALLET_UPDATE // WALLET_UPDATE_SLICE_INTERVAL)
+
+
+def get_wallet_slice(wallet: str, slice_count: int = WALLET_UPDATE_SLICE_COUNT) -> int:
+    """Return the time slice of a wallet (addresses are already uniformly distributed hashes)."""
+    return int(wallet.lower(), 16) % slice_count
+
+
+def get_current_slice(now: Optional[float] = None, slice_count: int = WALLET_UPDATE_SLICE_COUNT) -> int:
     """
-    Collect all unique wallets from all users' token_scope.
+    Return the slice to refresh now, derived from the wall clock so that the rotation
+    carries on across restarts without any persisted state.
     """
-    user_manager = app.bot_data["user_manager"]
-    abis = app.bot_data['abis']
-    realtokens_list = app.bot_data['realtokens']
+    now = time.time() if now is None else now
+    return int(now // (WALLET_UPDATE_SLICE_INTERVAL * 60)) % slice_count
 
-    # Build a set to guarantee uniqueness
-    wallets_set = set()
 
-    for user in user_manager.users.values():
-        token_scope = getattr(user, "token_scope", None)
-        if not token_scope:
+def select_wallets_to_refresh(
+    user_manager,
+    wallet_balance_cache,
+    slice_index: Optional[int],
+    slice_count: int,
+    now: Optional[float] = None,
+) -> Set[str]:
+    """
+    Select the wallets worth an RPC query in this run.
+
+    - Only wallets of users in "wallet" mode are considered: realtokens_owned is not used
+      for users following all realtokens. Users who blocked the bot are skipped.
+    - Wallets of the current slice are refreshed (all of them when slice_index is None), with
+      the other wallets of their users whose holdings are unknown (e.g. after a restart): a
+      user's holdings are only recomputed from the holdings of all their wallets.
+    - Wallets of recently active users whose cached holdings are stale are refreshed ahead
+      of their slice, most recently active first, up to WALLET_UPDATE_MAX_PRIORITY_WALLETS.
+    """
+    now = time.time() if now is None else now
+    active_since = now - WALLET_ACTIVE_USER_WINDOW * 60
+
+    selected: Set[str] = set()
+    priority: Dict[str, float] = {}  # wallet -> last activity of its most recently active owner
+
+    for user_id, prefs in user_manager.users_snapshot().items():
+        token_scope = getattr(prefs, "token_scope", None) or {}
+        if token_scope.get("mode") != "wallet" or prefs.is_blocked():
             continue
 
-        wallets: List[str] = token_scope.get("wallets", [])
+        last_active = user_manager.last_active.get(user_id, 0.0)
+        wallets = [w.lower() for w in token_scope.get("wallets", []) or [] if w]
+        in_slice = [w for w in wallets if slice_index is None or get_wallet_slice(w, slice_count) == slice_index]
+        if in_slice:
+            selected.update(in_slice)
+            selected.update(w for w in wallets if wallet_balance_cache.peek(w) is None)
         for w in wallets:
-            if w:
-                wallets_set.add(w)
+            if w not in selected and last_active >= active_since:
+                priority[w] = max(priority.get(w, 0.0), last_active)
+
+    stale_priority = [w for w in priority if w not in selected and not wallet_balance_cache.is_fresh(w)]
+    selected.update(heapq.nlargest(WALLET_UPDATE_MAX_PRIORITY_WALLETS, stale_priority, key=priority.__getitem__))
+
+    return selected
+
+
+async def update_realtoken_owned(app: Application, slice_index: Optional[int] = None, slice_count: int = 1) -> None:
+    """
+    Refresh the realtokens owned of the wallets selected by select_wallets_to_refresh().
+
+    Args:
+        slice_index: if set, only wallets of this slice (see get_wallet_slice) are refreshed.
+        slice_count: total number of slices.
+    """
+    user_manager = app.bot_data["user_manager"]
+    abis = get_abis()
+    realtokens_list = app.bot_data['realtokens']
+    wallet_balance_cache = app.bot_data['wallet_balance_cache']
+
+    # Wallets of the current slice + stale wallets of active users (wallet mode only)
+    wallets_set = select_wallets_to_refresh(user_manager, wallet_balance_cache, slice_index, slice_count)
 
     # Convert back to list if needed
     unique_wallets: List[str] = list(wallets_set)
+    if not unique_wallets:
+        return
 
-    realtokens_uuid = [
-        uuid
-        for uuid, data in realtokens_list.items()
-        if data.get("gnosisContract") is not None
-    ]
-
-    balances_realtokens = get_balances_of_realtokens(
-        users_addresses=unique_wallets,
-        realtoken_contract_addresses=realtokens_uuid,
-        abi_realtoken=abis["realtoken"],
-        abi_multicall3=abis["multicall3"],
-    )
+    # Deferred import: bot.balances pulls web3 (see bot.services.warm_up)
+    from bot.balances import get_realtokens_owned
 
-    balances_wrapper = get_balances_of_realtoken_wrapper(
-        users_addresses=unique_wallets,
-        abi_realtoken_wrapper=abis["realtoken-wrapper"],
-        abi_multicall3=abis["multicall3"],
-    )
+    realtokens_uuid = tokens_with_contract(realtokens_list)
 
-    all_balances = merge_user_token_balances([balances_realtokens, balances_wrapper])
+    # Wallets fetched recently (e.g. just added by a user) are served from the shared cache.
+    # Run in a thread: RPC calls are blocking and the cache may wait on an in-flight fetch.
+    owned_by_wallet = await asyncio.to_thread(
+        wallet_balance_cache.get_many,
+        unique_wallets,
+        partial(get_realtokens_owned, realtoken_contract_addresses=realtokens_uuid, abis=abis),
+    )
 
-    for user_id, prefs in user_manager.users.items():
+    def _update_user_realtokens_owned(prefs) -> None:
+        wallets = [w.lower() for w in prefs.token_scope["wallets"]]
+        if not wallets_set.intersection(wallets):
+            return
 
         realtoken_owned_user = set()
-        for wallet in prefs.token_scope["wallets"]:
+        complete = True
+        for wallet in wallets:
+            # Wallets of other slices, or whose fetch failed: reuse their last known holdings
+            tokens = owned_by_wallet[wallet] if wallet in owned_by_wallet else wallet_balance_cache.peek(wallet)
+            if tokens is None:
+                complete = False
+                continue
+            realtoken_owned_user |= tokens
+
+        if not complete:
+            # Holdings of a wallet were never fetched successfully since start: only add tokens
+            realtoken_owned_user |= {rt.lower() for rt in prefs.token_scope.get("realtokens_owned", [])}
 
-            wallet = Web3.to_checksum_address(wallet)
-            for token in all_balances[wallet].keys():
-                realtoken_owned_user.add(token.lower())
         prefs.token_scope["realtokens_owned"] = list(realtoken_owned_user)
-    
-    user_manager.save_to_file()
 
-    logger.info(f'Realtoken owned updated for {len(unique_wallets)} wallets')
+    # Applied atomically (wallet workers may update users at the same time), then the
+    # token -> users index is rebuilt and users are persisted once (in a thread: file I/O)
+    await asyncio.to_thread(user_manager.modify_users, _update_user_realtokens_owned)
+
+    logger.info(
+        f'Realtoken owned updated for {len(unique_wallets)} wallets'
+        + (f' (slice {slice_index + 1}/{slice_count})' if slice_index is not None else '')
+    )